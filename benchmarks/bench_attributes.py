@@ -0,0 +1,46 @@
+"""Time dumping a model with many attributes.
+
+The "attrs.create" line is the same attributes written one at a time
+through h5py's AttributeManager, as h5pydantic used to, to a file with
+the same format version as dump uses, so only the writes are compared.
+
+Usage: python benchmarks/bench_attributes.py [attribute count]
+"""
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+from pydantic import create_model
+
+from h5pydantic import H5Group, H5Int32, H5Int64
+
+TYPES = [(H5Int64, 1), (H5Int32, 2), (float, 3.5), (str, "value")]
+
+
+def attributes_model(count: int) -> H5Group:
+    fields = {f"attr{i}": (TYPES[i % len(TYPES)][0], ...) for i in range(count)}
+    Attributes = create_model("Attributes", __base__=H5Group, **fields)
+    return Attributes(**{f"attr{i}": TYPES[i % len(TYPES)][1] for i in range(count)})
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    model = attributes_model(count)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "bench.hdf"
+
+        def attrs_create():
+            with H5Group._dump_file(path, track_order=False) as h5file:
+                for key, value in model:
+                    h5file.attrs.create(key, value)
+
+        for name, func in [("attrs.create", attrs_create), ("dump", lambda: model.dump(path)),
+                           ("dump tracked", lambda: model.dump(path, track_order=True))]:
+            best = min(timeit.repeat(func, number=1, repeat=3))
+            print(f"{name:14} {count} attributes {best * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
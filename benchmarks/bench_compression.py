@@ -0,0 +1,64 @@
+"""Time writing a gzip compressed stack of frames, against the number of compression workers.
+
+The "serial" line is the same frames written through h5py, where libhdf5
+compresses every chunk on the writing thread.
+
+Usage: python benchmarks/bench_compression.py [frames] [frame size]
+"""
+import os
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+import numpy
+
+from h5pydantic import H5Dataset, H5Group
+from h5pydantic.types import H5UInt16
+
+
+def stack_model(frames: int, size: int) -> H5Group:
+    class Stack(H5Dataset, shape=(frames, size, size), dtype=H5UInt16, chunks="frames", compression="gzip",
+                compression_opts=4, shuffle=True):
+        pass
+
+    class Experiment(H5Group):
+        stack: Stack = Stack()
+
+    return Experiment()
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 4096
+    model = stack_model(frames, size)
+
+    # Detector like data: a smooth background with Poisson noise compresses realistically.
+    rng = numpy.random.default_rng(0)
+    data = rng.poisson(100, size=(frames, size, size)).astype(numpy.uint16)
+    megabytes = data.nbytes / 1e6
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "bench.hdf"
+
+        def serial():
+            with model.dumper(path):
+                model.stack[()] = data
+
+        def chunked(workers: int):
+            with model.dumper(path):
+                model.stack.write_chunks(data, workers=workers)
+
+        runs = [("serial", serial)]
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            runs.append((f"{workers} workers", lambda workers=workers: chunked(workers)))
+            workers *= 2
+
+        for name, func in runs:
+            best = min(timeit.repeat(func, number=1, repeat=3))
+            print(f"{name:12} {frames}x{size}x{size} {megabytes / best:9.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Time building and validating model trees, as load does, for the models of bench_plan.py.
+
+"construct" rebuilds each tree bottom up from its field values, like load
+does from the values read from the file, so it is only the pydantic
+validation and model construction, without any HDF5 I/O. "load" is the
+whole load, for comparison.
+
+Usage: python benchmarks/bench_construct.py
+"""
+import tempfile
+from pathlib import Path
+
+import pydantic
+
+from h5pydantic import H5Group
+
+from bench_plan import MODELS, best
+
+
+def rebuild(node: H5Group) -> H5Group:
+    """A copy of node, built and validated from its field values."""
+    values = {}
+    for key, value in node:
+        if isinstance(value, H5Group):
+            value = rebuild(value)
+        elif isinstance(value, list) and value and isinstance(value[0], H5Group):
+            value = [rebuild(elem) for elem in value]
+        values[key] = value
+    return type(node)(**values)
+
+
+def main():
+    print(f"pydantic {pydantic.VERSION}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "bench.hdf"
+        for name, build in MODELS.items():
+            model = build()
+            model.dump(path)
+
+            construct = best(lambda: rebuild(model), 5)
+            load = best(lambda: type(model).load(path).close(), 5)
+            print(f"{name:6} construct {construct * 1000:8.2f} ms   load {load * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Time loading a directory of files, serially and with load_many, against the number of workers.
+
+Usage: python benchmarks/bench_load_many.py [file count]
+"""
+import os
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+from pydantic import create_model
+
+from h5pydantic import H5Group, H5Int64
+
+Element = create_model("Element", __base__=H5Group, **{f"attr{i}": (H5Int64, ...) for i in range(10)})
+
+
+class Experiment(H5Group):
+    scan: H5Int64
+    elements: list[Element]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = [Path(tmpdir) / f"scan{i}.hdf" for i in range(count)]
+        for i, path in enumerate(paths):
+            Experiment(scan=i, elements=[Element(**{f"attr{j}": j for j in range(10)}) for _ in range(20)]).dump(path)
+
+        def serial():
+            for path in paths:
+                Experiment.load(path).close()
+
+        runs = [("serial", serial)]
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            runs.append((f"{workers} workers", lambda workers=workers: list(Experiment.load_many(paths, workers))))
+            workers *= 2
+
+        for name, func in runs:
+            best = min(timeit.repeat(func, number=1, repeat=3))
+            print(f"{name:12} {count} files {count / best:9.1f} files/s")
+
+
+if __name__ == "__main__":
+    main()
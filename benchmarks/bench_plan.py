@@ -0,0 +1,106 @@
+"""Time load and dump of wide and deep models, to measure per-field Python overhead.
+
+The same attribute reads and writes are also timed using h5py directly
+(the "raw" columns), the difference is the overhead of h5pydantic
+itself, including pydantic validation.
+
+Usage: python benchmarks/bench_plan.py [output.hdf]
+"""
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+import h5py
+
+from pydantic import create_model
+
+from h5pydantic import H5Group, H5Int64
+
+
+def wide_model(width: int):
+    """A single group with width attributes."""
+    Wide = create_model("Wide", __base__=H5Group, **{f"attr{i}": (H5Int64, ...) for i in range(width)})
+    return Wide(**{f"attr{i}": i for i in range(width)})
+
+
+def deep_model(depth: int, width: int):
+    """A chain of depth nested groups, each with width attributes."""
+    fields = {f"attr{i}": (H5Int64, ...) for i in range(width)}
+    values = {f"attr{i}": i for i in range(width)}
+    klass = create_model("Level0", __base__=H5Group, **fields)
+    model = klass(**values)
+    for level in range(1, depth):
+        klass = create_model(f"Level{level}", __base__=H5Group, child=(klass, ...), **fields)
+        model = klass(child=model, **values)
+    return model
+
+
+def list_model(length: int, width: int):
+    """A group with a list of length groups, each with width attributes."""
+    Element = create_model("Element", __base__=H5Group, **{f"attr{i}": (H5Int64, ...) for i in range(width)})
+    Container = create_model("Container", __base__=H5Group, elements=(list[Element], ...))
+    return Container(elements=[Element(**{f"attr{i}": i for i in range(width)}) for _ in range(length)])
+
+
+MODELS = {
+    "wide": lambda: wide_model(1000),
+    "deep": lambda: deep_model(50, 20),
+    "list": lambda: list_model(1000, 10),
+}
+
+
+def raw_dump(model: H5Group, group: h5py.Group):
+    """Write the same groups and attributes as model.dump, using h5py directly."""
+    for key, value in model:
+        if isinstance(value, H5Group):
+            raw_dump(value, group.require_group(key))
+        elif isinstance(value, list):
+            for i, elem in enumerate(value):
+                raw_dump(elem, group.require_group(f"{key}/{i}"))
+        else:
+            group.attrs.create(key, value)
+
+
+def raw_load(group: h5py.Group):
+    """Read all the groups and attributes in the file, using h5py directly."""
+    attrs = group.attrs
+    for name in attrs:
+        attrs[name]
+    for child in group.values():
+        raw_load(child)
+
+
+def best(func, number: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+def bench(name: str, model, path: Path, number: int = 5):
+    def raw_dump_file():
+        # The same file format version as dump, so only the writes are compared.
+        with H5Group._dump_file(path, track_order=False) as h5file:
+            raw_dump(model, h5file)
+
+    def raw_load_file():
+        with h5py.File(path, "r") as h5file:
+            raw_load(h5file)
+
+    def load():
+        type(model).load(path).close()
+
+    dump, dump_raw = best(lambda: model.dump(path), number), best(raw_dump_file, number)
+    load_time, load_raw = best(load, number), best(raw_load_file, number)
+
+    print(f"{name:6} dump {dump * 1000:8.2f} ms (raw {dump_raw * 1000:8.2f}, overhead {(dump - dump_raw) * 1000:8.2f})"
+          f"   load {load_time * 1000:8.2f} ms (raw {load_raw * 1000:8.2f}, overhead {(load_time - load_raw) * 1000:8.2f})")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(tmpdir) / "bench.hdf"
+        for name, build in MODELS.items():
+            bench(name, build(), path)
+
+
+if __name__ == "__main__":
+    main()
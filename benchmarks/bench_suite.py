@@ -0,0 +1,189 @@
+"""Time load, dump and dataset I/O across generated models, and save the results as JSON.
+
+Each case runs in its own process, so its peak RSS is its own. The group
+cases (wide, deep, list, enums, and a list of datasets stored as datasets
+or as a stack) time dump and load. The dataset cases
+(frames, compressed) time writing frame by frame in dumper(), load, and
+slice reads, both of single frames and across frames.
+
+Results are written as JSON, with the commit they were measured at, and
+two result files can be compared:
+
+Usage: python benchmarks/bench_suite.py [results.json] [case ...]
+       python benchmarks/bench_suite.py compare old.json new.json
+"""
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from pathlib import Path
+
+import h5py
+
+import numpy
+
+from pydantic import create_model
+
+import h5pydantic
+from h5pydantic import H5Dataset, H5Group, H5Int64
+from h5pydantic.types import H5UInt16
+
+from bench_plan import best, deep_model, list_model, wide_model
+
+
+def enum_model(count: int):
+    """A single group with count enum attributes."""
+    Mode = Enum("Mode", {f"MODE{i}": i for i in range(8)}, type=H5Int64)
+    Enums = create_model("Enums", __base__=H5Group, **{f"mode{i}": (Mode, ...) for i in range(count)})
+    return Enums(**{f"mode{i}": Mode(i % 8) for i in range(count)})
+
+
+def dataset_list_model(length: int, size: int, list_layout: str = "datasets"):
+    """A group with a list of length size x size datasets."""
+    class Frame(H5Dataset, shape=(size, size), dtype=H5UInt16, list_layout=list_layout):
+        pass
+
+    class Frames(H5Group):
+        frames: list[Frame]
+
+    data = numpy.zeros((size, size), dtype=numpy.uint16)
+    return Frames(frames=[Frame(data_=data) for _ in range(length)])
+
+
+def frames_model(frames: int, size: int, **storage):
+    """A group with a frames x size x size stack, chunked by frame."""
+    class Frames(H5Dataset, shape=(frames, size, size), dtype=H5UInt16, chunks="frames", **storage):
+        pass
+
+    class Stack(H5Group):
+        frames: Frames = Frames()
+
+    return Stack()
+
+
+GROUP_CASES = {
+    "wide": lambda: wide_model(1000),
+    "deep": lambda: deep_model(50, 20),
+    "list": lambda: list_model(1000, 10),
+    "enums": lambda: enum_model(500),
+    "datasets": lambda: dataset_list_model(1000, 16),
+    "stack": lambda: dataset_list_model(1000, 16, list_layout="stack"),
+}
+
+DATASET_CASES = {
+    "frames": lambda: frames_model(64, 512),
+    "compressed": lambda: frames_model(64, 512, compression="gzip", compression_opts=4, shuffle=True),
+}
+
+
+def bench_group(model, path: Path) -> dict[str, float]:
+    model.dump(path)
+    return {
+        "dump": best(lambda: model.dump(path), 5),
+        "load": best(lambda: type(model).load(path).close(), 5),
+    }
+
+
+def bench_dataset(model, path: Path) -> dict[str, float]:
+    shape = model.frames._h5config.shape
+    rng = numpy.random.default_rng(0)
+    data = rng.poisson(100, size=shape).astype(numpy.uint16)
+
+    def dumper():
+        with model.dumper(path):
+            for i, frame in enumerate(data):
+                model.frames[i] = frame
+
+    def frame_reads():
+        with type(model).load(path) as loaded:
+            for i in range(shape[0]):
+                loaded.frames[i]
+
+    def column_read():
+        with type(model).load(path) as loaded:
+            loaded.frames[:, :, shape[2] // 2]
+
+    times = {"dumper": best(dumper, 3)}
+    times["load"] = best(lambda: type(model).load(path).close(), 5)
+    times["frame reads"] = best(frame_reads, 3)
+    times["column read"] = best(column_read, 3)
+    return times
+
+
+def run_case(name: str) -> dict:
+    """Run one case, in a fresh process."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "bench.hdf"
+        if name in GROUP_CASES:
+            seconds = bench_group(GROUP_CASES[name](), path)
+        else:
+            seconds = bench_dataset(DATASET_CASES[name](), path)
+
+    # Linux reports kilobytes, macOS bytes.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"seconds": seconds, "peak_rss_mb": peak / (1e6 if sys.platform == "darwin" else 1e3)}
+
+
+def commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(output: Path, names: list[str]):
+    results = {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "versions": {"h5pydantic": h5pydantic.__version__, "h5py": h5py.__version__,
+                     "hdf5": h5py.version.hdf5_version, "numpy": numpy.__version__},
+        "cases": {},
+    }
+    # One process per case, so peak RSS isn't carried over from earlier cases.
+    with ProcessPoolExecutor(1, max_tasks_per_child=1) as executor:
+        for name in names:
+            result = results["cases"][name] = executor.submit(run_case, name).result()
+            for operation, seconds in result["seconds"].items():
+                print(f"{name:10} {operation:12} {seconds * 1000:10.2f} ms")
+            print(f"{name:10} {'peak RSS':12} {result['peak_rss_mb']:10.1f} MB")
+
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+def compare(old_path: Path, new_path: Path):
+    old, new = json.loads(old_path.read_text()), json.loads(new_path.read_text())
+    print(f"{old['commit'][:10]} -> {new['commit'][:10]}")
+    for name, result in new["cases"].items():
+        before = old["cases"].get(name)
+        if before is None:
+            continue
+        for operation, seconds in result["seconds"].items():
+            if operation in before["seconds"]:
+                was = before["seconds"][operation]
+                print(f"{name:10} {operation:12} {was * 1000:10.2f} -> {seconds * 1000:10.2f} ms "
+                      f"{seconds / was:6.2f}x")
+        print(f"{name:10} {'peak RSS':12} {before['peak_rss_mb']:10.1f} -> {result['peak_rss_mb']:10.1f} MB")
+
+
+def main():
+    if sys.argv[1:2] == ["compare"]:
+        compare(Path(sys.argv[2]), Path(sys.argv[3]))
+        return
+
+    output = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("bench_results.json")
+    names = sys.argv[2:] or list(GROUP_CASES) + list(DATASET_CASES)
+    unknown = set(names) - set(GROUP_CASES) - set(DATASET_CASES)
+    if unknown:
+        raise SystemExit(f"Unknown cases {', '.join(sorted(unknown))}, must be one of "
+                         f"{', '.join(list(GROUP_CASES) + list(DATASET_CASES))}")
+    run(output, names)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Time validate_file against load, for the models of bench_plan.py.
+
+Usage: python benchmarks/bench_validate.py
+"""
+import tempfile
+from pathlib import Path
+
+from bench_plan import MODELS, best
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "bench.hdf"
+        for name, build in MODELS.items():
+            model = build()
+            model.dump(path)
+            klass = type(model)
+
+            assert klass.validate_file(path) == []
+            load = best(lambda: klass.load(path).close(), 5)
+            validate = best(lambda: klass.validate_file(path), 5)
+            print(f"{name:6} load {load * 1000:8.2f} ms   validate_file {validate * 1000:8.2f} ms   "
+                  f"{load / validate:5.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
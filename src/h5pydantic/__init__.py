@@ -2,6 +2,9 @@ from importlib import metadata
 
 __version__ = metadata.version(__package__)
 
-from .exceptions import H5PartialDump
-from .model import H5Dataset, H5DatasetConfig, H5Group
+from .bulk import H5LoadResult
+from .catalog import H5Catalog
+from .exceptions import H5Mismatch, H5PartialDump
+from .instrument import H5Stats, profile
+from .model import H5Dataset, H5DatasetConfig, H5Group, H5VirtualDataset
 from .types import H5Int32, H5Int64
@@ -0,0 +1,73 @@
+"""Running HDF5 calls from asyncio, without blocking the event loop.
+
+h5py serialises every HDF5 call behind one global lock, so more threads
+don't make HDF5 faster. Calls are instead run on a small dedicated
+executor, with one call at a time per file, and a bounded number of
+pending calls, so a busy service waits for room rather than queueing
+without limit.
+"""
+import asyncio
+import functools
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+_workers = 1
+_max_pending = 64
+_executor: Optional[ThreadPoolExecutor] = None
+
+# The asyncio primitives of each event loop, as they can't be shared between loops.
+_loop_state: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+
+
+def configure(workers: int = 1, max_pending: int = 64):
+    """Configure the executor used by the async API.
+
+    Args:
+        workers: The number of I/O threads. As HDF5 calls are serialised, more
+                 than one only helps the work done outside HDF5, like validation.
+        max_pending: The number of calls that can be running or queued, further
+                     calls wait for room.
+    """
+    global _workers, _max_pending, _executor
+    if workers < 1 or max_pending < 1:
+        raise ValueError(f"workers ({workers}) and max_pending ({max_pending}) must be positive")
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+    _workers, _max_pending = workers, max_pending
+    _loop_state.clear()
+
+
+class _LoopState:
+    def __init__(self):
+        self.pending = asyncio.Semaphore(_max_pending)
+        self.file_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def file_lock(self, filename: str) -> asyncio.Lock:
+        lock = self.file_locks.get(filename)
+        if lock is None:
+            lock = self.file_locks[filename] = asyncio.Lock()
+        return lock
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(_workers, thread_name_prefix="h5pydantic-io")
+    return _executor
+
+
+async def _run(filename, func: Callable, *args, **kwargs) -> Any:
+    """Run func on the I/O executor, after any other call on the same file."""
+    loop = asyncio.get_running_loop()
+    state = _loop_state.get(loop)
+    if state is None:
+        state = _loop_state[loop] = _LoopState()
+
+    # File-like objects and file images are serialised by identity.
+    key = os.path.realpath(filename) if isinstance(filename, (str, os.PathLike)) else str(id(filename))
+    async with state.pending:
+        async with state.file_lock(key):
+            return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
@@ -0,0 +1,30 @@
+from typing import Any
+
+import h5py
+
+import numpy
+
+from . import instrument
+
+_SCALAR = h5py.h5s.create(h5py.h5s.SCALAR)
+
+
+def _write_attrs(container, attrs: list[tuple[bytes, h5py.h5t.TypeID, numpy.dtype, Any]]):
+    """Write a node's scalar attributes in one batch.
+
+    Each attribute is a (name, HDF5 type, numpy dtype, value) tuple. The types
+    come from the declared field types, so nothing is inferred from the values,
+    and the low level API skips the per attribute overhead of h5py's AttributeManager.
+    """
+    if instrument._active is not None:
+        instrument._active._attributes_written(len(attrs))
+    cid = container.id
+    for (name, h5type, dtype, value) in attrs:
+        if h5py.h5a.exists(cid, name):
+            h5py.h5a.delete(cid, name)
+        h5py.h5a.create(cid, name, h5type, _SCALAR).write(numpy.asarray(value, dtype=dtype))
+
+
+def _track_order(h5file: h5py.File) -> bool:
+    """Whether the file tracks the creation order of links and attributes."""
+    return bool(h5file.id.get_create_plist().get_link_creation_order())
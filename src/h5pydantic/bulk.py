@@ -0,0 +1,43 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Iterable, Iterator, NamedTuple, Optional
+
+
+class H5LoadResult(NamedTuple):
+    """The outcome of loading one file, see :meth:`h5pydantic.H5Group.load_many`."""
+
+    path: Path
+    """The file loaded."""
+
+    model: Optional[Any]
+    """The loaded model, with its datasets closed, None if loading failed."""
+
+    error: Optional[BaseException]
+    """Why loading failed, None if it succeeded."""
+
+
+def _load_detached(cls, path: Path) -> H5LoadResult:
+    """Load path, then close it, so the model can be sent back from a worker process."""
+    try:
+        with cls.load(path) as model:
+            pass
+        return H5LoadResult(path, model._detach(), None)
+    except Exception as e:
+        return H5LoadResult(path, None, e)
+
+
+def _load_many(cls, paths: Iterable[Path], workers: Optional[int] = None,
+               executor: Optional[Executor] = None) -> Iterator[H5LoadResult]:
+    own_executor = executor is None
+    pool = ProcessPoolExecutor(workers) if executor is None else executor
+    try:
+        futures = {pool.submit(_load_detached, cls, path): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # The worker itself failed, or the result couldn't be sent back.
+                yield H5LoadResult(futures[future], None, e)
+    finally:
+        if own_executor:
+            pool.shutdown(cancel_futures=True)
@@ -0,0 +1,172 @@
+import os
+import sqlite3
+from enum import Enum
+from pathlib import Path, PurePosixPath
+from typing import Any, Iterable, Iterator, Literal, NamedTuple
+
+import h5py
+
+from .plan import _AttributePlan, _EnumPlan, _NodePlan, _read_attribute
+
+_OPERATORS = {"==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">=", "in": "IN"}
+
+
+_SQLType = Literal["INTEGER", "REAL", "TEXT"]
+
+
+class _Column(NamedTuple):
+    name: str
+    node: PurePosixPath
+    alias: str
+    sql_type: _SQLType
+
+
+def _columns(cls, prefix: PurePosixPath = PurePosixPath("/"), name: str = "") -> Iterator[_Column]:
+    """The scalar attributes and enums of cls and its child nodes, named by their dotted field keys."""
+    for plan in cls._h5plan():
+        key = name + plan.key
+        if isinstance(plan, _EnumPlan):
+            yield _Column(key, prefix, plan.alias, "INTEGER")
+        elif isinstance(plan, _AttributePlan) and plan.dtype is not None:
+            kind = plan.dtype.kind
+            sql_type: _SQLType = "REAL" if kind == "f" else "INTEGER" if kind in "biu" else "TEXT"
+            yield _Column(key, prefix, plan.alias, sql_type)
+        elif isinstance(plan, _NodePlan):
+            yield from _columns(plan.type_, prefix / plan.alias, key + ".")
+
+
+def _sql_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        value = value.value
+    if hasattr(value, "item"):
+        # numpy scalars
+        value = value.item()
+    return value
+
+
+class H5Catalog:
+    """An index of the scalar attributes and enums of many files, in an SQLite database.
+
+    The attributes follow the field structure of the model class, and are
+    named by their field keys, with child groups and datasets separated by
+    dots (``"detector.distance"``). Lists and unions aren't indexed.
+
+    Queries are answered from the index, without opening the files.
+    """
+
+    def __init__(self, model, index: Path):
+        """
+        Args:
+            model: The H5Group class the files are instances of.
+            index: The SQLite database to keep the index in, created if needed.
+        """
+        self.model = model
+        self.columns = {column.name: column for column in _columns(model)}
+        self._db = sqlite3.connect(index)
+
+        names = ["path", "mtime"] + list(self.columns)
+        existing = [row[1] for row in self._db.execute("PRAGMA table_info(entries)")]
+        if existing != names:
+            # A new index, or the model has changed since it was built.
+            definitions = ", ".join(f'"{column.name}" {column.sql_type}' for column in self.columns.values())
+            with self._db:
+                self._db.execute("DROP TABLE IF EXISTS entries")
+                self._db.execute(f"CREATE TABLE entries (path TEXT PRIMARY KEY, mtime INTEGER, {definitions})")
+
+    def close(self):
+        """Close the index."""
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _extract(self, path: str) -> list[Any]:
+        values: list[Any] = []
+        with h5py.File(path, "r") as h5file:
+            for column in self.columns.values():
+                node = h5file.get(str(column.node))
+                if node is None or not h5py.h5a.exists(node.id, column.alias.encode()):
+                    values.append(None)
+                else:
+                    values.append(_sql_value(_read_attribute(node, column.alias)))
+        return values
+
+    def update(self, paths: Iterable[Path]) -> list[tuple[Path, Exception]]:
+        """Index the files, skipping those unchanged since they were last indexed.
+
+        Files are indexed by their absolute path, so the same file given by different
+        paths is indexed once. Indexed files that no longer exist are removed from the index.
+
+        Args:
+            paths: The files to index.
+
+        Returns:
+            The (path, error) of each file that couldn't be read, which isn't indexed.
+        """
+        indexed = dict(self._db.execute("SELECT path, mtime FROM entries"))
+        placeholders = ", ".join("?" * (len(self.columns) + 2))
+        errors = []
+        with self._db:
+            for name in indexed:
+                if not os.path.exists(name):
+                    self._db.execute("DELETE FROM entries WHERE path = ?", (name,))
+
+            for path in paths:
+                name = os.fspath(Path(path).resolve())
+                try:
+                    mtime = os.stat(name).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                if indexed.get(name) == mtime:
+                    continue
+
+                try:
+                    values = self._extract(name)
+                except Exception as e:
+                    errors.append((path, e))
+                    continue
+                self._db.execute(f"INSERT OR REPLACE INTO entries VALUES ({placeholders})", [name, mtime] + values)
+                indexed[name] = mtime
+        return errors
+
+    def query(self, *filters: tuple[str, str, Any]) -> list[Path]:
+        """The files matching all of the filters.
+
+        Args:
+            filters: ``(field, operator, value)`` tuples, where operator is one of
+                     ``==``, ``!=``, ``<``, ``<=``, ``>``, ``>=`` or ``in``, with
+                     a list of values. Enum members compare by value.
+
+        Returns:
+            The absolute paths of the matching files, sorted.
+        """
+        clauses = []
+        parameters = []
+        for (field, operator, value) in filters:
+            if field not in self.columns:
+                raise ValueError(f"Unknown field '{field}', must be one of {', '.join(self.columns)}")
+            if operator not in _OPERATORS:
+                raise ValueError(f"Unknown operator '{operator}', must be one of {', '.join(_OPERATORS)}")
+
+            if operator == "in":
+                values = [_sql_value(elem) for elem in value]
+                clauses.append(f'"{field}" IN ({", ".join("?" * len(values))})')
+                parameters.extend(values)
+            else:
+                clauses.append(f'"{field}" {_OPERATORS[operator]} ?')
+                parameters.append(_sql_value(value))
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._db.execute(f"SELECT path FROM entries{where} ORDER BY path", parameters)
+        return [Path(path) for (path,) in rows]
+
+    def load(self, *filters: tuple[str, str, Any]) -> Iterator:
+        """Lazily load each of the files matching the filters, see :meth:`query`.
+
+        Each model is loaded with ``lazy=True``, and should be closed when done with.
+        """
+        for path in self.query(*filters):
+            yield self.model.load(path, lazy=True)
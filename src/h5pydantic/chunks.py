@@ -0,0 +1,99 @@
+import itertools
+import zlib
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Iterator, Optional
+
+import h5py
+
+import numpy
+
+# The filters that can be applied outside of libhdf5, by filter id.
+_FILTER_NAMES = {h5py.h5z.FILTER_DEFLATE: "gzip", h5py.h5z.FILTER_SHUFFLE: "shuffle"}
+
+
+def _chunk_filters(dset: h5py.Dataset) -> tuple[tuple[int, tuple[int, ...]], ...]:
+    """The (filter id, client data) pipeline of dset, in the order libhdf5 applies it when writing.
+
+    Raises a ValueError for filters that can't be applied outside of libhdf5.
+    """
+    plist = dset.id.get_create_plist()
+    filters = []
+    for i in range(plist.get_nfilters()):
+        (filter_id, _, cd_values, name) = plist.get_filter(i)
+        if filter_id not in _FILTER_NAMES:
+            raise ValueError(f"{dset.name}: Filter {name.decode() or filter_id} is not supported for chunk writes, "
+                             f"only {' and '.join(_FILTER_NAMES.values())}")
+        filters.append((filter_id, tuple(cd_values)))
+    return tuple(filters)
+
+
+def _compress_chunk(chunk: numpy.ndarray, filters: tuple[tuple[int, tuple[int, ...]], ...]) -> bytes:
+    """Run a chunk through the filter pipeline, giving the bytes libhdf5 would store.
+
+    zlib releases the GIL, so this scales across threads as well as processes.
+    """
+    data = numpy.ascontiguousarray(chunk)
+    buffer = data.tobytes()
+    for (filter_id, cd_values) in filters:
+        if filter_id == h5py.h5z.FILTER_SHUFFLE:
+            itemsize = cd_values[0] if cd_values else data.dtype.itemsize
+            buffer = numpy.frombuffer(buffer, dtype=numpy.uint8).reshape(-1, itemsize).T.tobytes()
+        else:
+            buffer = zlib.compress(buffer, cd_values[0] if cd_values else 6)
+    return buffer
+
+
+def _chunk_offsets(shape: tuple[int, ...], chunks: tuple[int, ...], start: int) -> Iterator[tuple[int, ...]]:
+    """The offsets of the chunks covering data of shape, written at frame start of the first dimension."""
+    ranges = [range(start, start + shape[0], chunks[0])]
+    ranges += [range(0, dim, chunk) for (dim, chunk) in zip(shape[1:], chunks[1:])]
+    return itertools.product(*ranges)
+
+
+def _write_chunks(dset: h5py.Dataset, data: numpy.ndarray, start: int, extent: int,
+                  workers: Optional[int] = None, executor: Optional[Executor] = None):
+    """Write data at frame start of dset, compressing whole chunks in parallel.
+
+    extent is the number of frames in use, which may be less than the
+    allocated shape of an appendable dataset. Partial chunks at the edges of
+    the dataset are padded with the fill value, as libhdf5 does, so the file
+    reads back the same as a normal write.
+    """
+    if dset.chunks is None:
+        raise ValueError(f"{dset.name}: Chunk writes need a chunked dataset")
+    if dset.dtype.kind not in "biufc":
+        raise ValueError(f"{dset.name}: Chunk writes need a numeric dtype, not {dset.dtype}")
+
+    chunks = dset.chunks
+    if start % chunks[0]:
+        raise ValueError(f"{dset.name}: Start frame {start} is not aligned to the chunk shape {chunks}")
+    if data.shape[1:] != dset.shape[1:]:
+        raise ValueError(f"{dset.name}: Frame shape {data.shape[1:]} does not match the dataset {dset.shape[1:]}")
+    if data.shape[0] % chunks[0] and start + data.shape[0] != extent:
+        raise ValueError(f"{dset.name}: {data.shape[0]} frames do not fill whole chunks of {chunks}")
+
+    filters = _chunk_filters(dset)
+    data = numpy.asarray(data, dtype=dset.dtype)
+    fillvalue = dset.fillvalue
+
+    def chunk(offset: tuple[int, ...]) -> numpy.ndarray:
+        index = tuple(slice(off - (start if axis == 0 else 0), off - (start if axis == 0 else 0) + size)
+                      for axis, (off, size) in enumerate(zip(offset, chunks)))
+        block = data[index]
+        if block.shape != chunks:
+            padded = numpy.full(chunks, fillvalue, dtype=dset.dtype)
+            padded[tuple(slice(0, dim) for dim in block.shape)] = block
+            block = padded
+        return block
+
+    offsets = list(_chunk_offsets(data.shape, chunks, start))
+    own_executor = executor is None
+    pool = ThreadPoolExecutor(workers) if executor is None else executor
+    try:
+        compressed = pool.map(_compress_chunk, (chunk(offset) for offset in offsets),
+                              itertools.repeat(filters))
+        for (offset, buffer) in zip(offsets, compressed):
+            dset.id.write_direct_chunk(offset, buffer)
+    finally:
+        if own_executor:
+            pool.shutdown()
@@ -1,19 +1,64 @@
-from pathlib import PurePosixPath
+from enum import Enum
+from functools import cache
+from typing import Type
+import weakref
 
 import h5py
 import h5py.h5t
 
-from pydantic.v1.fields import ModelField
+import numpy
 
+from .attrs import _SCALAR
+from .types import _enum_member_type
 
-def _h5enum_dump(h5file: h5py.File, container, key: str, value: int, fieldtype: ModelField):
-    # FIXME look for previous type? maybe cache it in the class?
-    h5type = h5py.h5t.enum_create(fieldtype.type_._member_type_.h5pyid)
-    for (member_name, member_value) in fieldtype.type_.__members__.items():
+# Where committed enum datatypes are stored in the file.
+_ENUM_GROUP = "/_h5pydantic/enums"
+
+# Files being dumped with committed enum datatypes, and the types committed so far.
+_committed_enums: "weakref.WeakKeyDictionary[h5py.File, dict[Type[Enum], h5py.h5t.TypeEnumID]]" = \
+    weakref.WeakKeyDictionary()
+
+
+@cache
+def _h5enum_type(enum_type: Type[Enum]) -> h5py.h5t.TypeEnumID:
+    """The HDF5 enum type of an Enum class, built once per class."""
+    h5type = h5py.h5t.enum_create(_enum_member_type(enum_type).h5pyid)
+    for (member_name, member_value) in enum_type.__members__.items():
         h5type.enum_insert(member_name.encode("ascii"), member_value)
+    return h5type
+
+
+def _h5enum_commit(h5file: h5py.File):
+    """Store enum attributes dumped to h5file using one committed (named) datatype per Enum class."""
+    _committed_enums[h5file] = {}
+
+
+def _h5enum_file_type(h5file: h5py.File, enum_type: Type[Enum]) -> h5py.h5t.TypeEnumID:
+    committed = _committed_enums.get(h5file)
+    if committed is None:
+        return _h5enum_type(enum_type)
+
+    h5type = committed.get(enum_type)
+    if h5type is None:
+        # Enums of the same name can be defined in different modules.
+        path = f"{_ENUM_GROUP}/{enum_type.__module__}.{enum_type.__qualname__}"
+        if path not in h5file:
+            h5file[path] = _h5enum_type(enum_type).dtype
+        elif h5py.check_enum_dtype(h5file[path].dtype) != h5py.check_enum_dtype(_h5enum_type(enum_type).dtype):
+            raise ValueError(f"{path}: The committed enum datatype does not match the members of {enum_type.__name__}")
+        h5type = committed[enum_type] = h5file[path].id
+    return h5type
+
+
+def _h5enum_dump(h5file: h5py.File, container, key: str, value: int, enum_type: Type[Enum]):
+    h5type = _h5enum_file_type(h5file, enum_type)
 
-        container.attrs.create(key, dtype=h5type.dtype, data=value)
+    name = key.encode()
+    if h5py.h5a.exists(container.id, name):
+        h5py.h5a.delete(container.id, name)
+    attr = h5py.h5a.create(container.id, name, h5type, _SCALAR)
+    attr.write(numpy.array(value, dtype=_enum_member_type(enum_type).numpy))
 
 
-def _h5enum_load(h5file: h5py.File, prefix: PurePosixPath, key: str, field: ModelField):
-    return field.type_(h5file[str(prefix)].attrs[key])
+def _h5enum_load(container, key: str, enum_type: Type[Enum]):
+    return enum_type(container.attrs[key])
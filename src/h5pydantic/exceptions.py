@@ -1,4 +1,21 @@
+from typing import Literal, NamedTuple
+
+
 class H5PartialDump(Exception):
     def __init__(self, datasets: list):
         self.datasets = datasets
         super().__init__(f"The following datasets were not written to: {', '.join(self.datasets)}")
+
+
+class H5Mismatch(NamedTuple):
+    """One way a file doesn't match a model, see :meth:`h5pydantic.H5Group.validate_file`."""
+
+    path: str
+    """The path of the group, dataset or attribute in the file."""
+
+    kind: Literal["missing", "node", "shape", "dtype", "value", "layout"]
+    """What doesn't match: a missing node or attribute, the wrong kind of node
+    (a group rather than a dataset), or a dataset shape, data type, attribute
+    value or storage layout that doesn't match."""
+
+    message: str
@@ -0,0 +1,40 @@
+import io
+from typing import Union
+
+_Buffer = Union[bytes, bytearray, memoryview]
+
+
+class _BufferFile(io.RawIOBase):
+    """A read-only file over an in-memory HDF5 file image.
+
+    h5py reads through readinto, so only the blocks HDF5 asks for are
+    copied out of the image, and the image itself is never copied.
+    """
+
+    def __init__(self, image: _Buffer):
+        super().__init__()
+        self._image = memoryview(image).cast("B")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._image)
+        self._position = offset
+        return offset
+
+    def tell(self) -> int:
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        data = self._image[self._position:self._position + len(buffer)]
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
@@ -0,0 +1,204 @@
+"""Optional instrumentation of loads, dumps and dataset I/O.
+
+Nothing is recorded unless a :func:`profile` block is active, and each
+hook then costs a single global lookup.
+"""
+import functools
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+import numpy
+
+# The statistics being recorded, None when not profiling.
+_active: Optional["H5Stats"] = None
+
+
+class H5Stats:
+    """The statistics recorded by :func:`h5pydantic.profile`.
+
+    Node timings are keyed by operation ("load", "dump" or "save") and HDF5
+    path, and include the time spent on the nodes below them. The same path
+    loaded from several files is added up.
+    """
+
+    def __init__(self):
+        self.seconds: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        """The time spent on each node, by operation and path, including the nodes below it."""
+
+        self.total_seconds = 0.0
+        """The time spent in loads, dumps and saves."""
+
+        self.validation_seconds = 0.0
+        """The part of total_seconds spent building and validating models."""
+
+        self.opens = 0
+        """The number of HDF5 groups and datasets opened by loads."""
+
+        self.attribute_reads = 0
+        """The number of HDF5 attributes read."""
+
+        self.attribute_writes = 0
+        """The number of HDF5 attributes written."""
+
+        self.bytes_read: dict[str, int] = defaultdict(int)
+        """The bytes read from each dataset, by path. Strings count a byte per character."""
+
+        self.bytes_written: dict[str, int] = defaultdict(int)
+        """The bytes written to each dataset, by path, before compression."""
+
+        self._self_seconds: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._local = threading.local()
+        # Calls are recorded from all threads, such as those of the async API.
+        self._lock = threading.Lock()
+
+    @property
+    def io_seconds(self) -> float:
+        """The part of total_seconds spent outside validation, mostly in HDF5."""
+        return self.total_seconds - self.validation_seconds
+
+    def _enter(self):
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append([time.perf_counter(), 0.0])
+
+    def _exit(self, operation: str, path: str):
+        stack = self._local.stack
+        (start, children) = stack.pop()
+        elapsed = time.perf_counter() - start
+        if stack:
+            stack[-1][1] += elapsed
+        with self._lock:
+            self.seconds[operation][path] += elapsed
+            self._self_seconds[operation][path] += elapsed - children
+            if not stack:
+                self.total_seconds += elapsed
+
+    def _validated(self, seconds: float):
+        with self._lock:
+            self.validation_seconds += seconds
+
+    def _opened(self):
+        with self._lock:
+            self.opens += 1
+
+    def _attributes_read(self, count: int = 1):
+        with self._lock:
+            self.attribute_reads += count
+
+    def _attributes_written(self, count: int = 1):
+        with self._lock:
+            self.attribute_writes += count
+
+    def _read(self, path: str, nbytes: int):
+        with self._lock:
+            self.bytes_read[path] += nbytes
+
+    def _written(self, path: str, nbytes: int):
+        with self._lock:
+            self.bytes_written[path] += nbytes
+
+    def as_dict(self) -> dict[str, Any]:
+        """The statistics as plain dicts and numbers, such as for JSON."""
+        return {
+            "seconds": {operation: dict(paths) for operation, paths in self.seconds.items()},
+            "total_seconds": self.total_seconds,
+            "validation_seconds": self.validation_seconds,
+            "io_seconds": self.io_seconds,
+            "opens": self.opens,
+            "attribute_reads": self.attribute_reads,
+            "attribute_writes": self.attribute_writes,
+            "bytes_read": dict(self.bytes_read),
+            "bytes_written": dict(self.bytes_written),
+        }
+
+    def folded(self) -> str:
+        """The time spent on each node itself as folded stack samples, in microseconds.
+
+        Each line is ``operation;/;group;dataset microseconds``, as read by
+        flamegraph.pl, speedscope and similar tools.
+        """
+        lines = []
+        for operation, paths in self._self_seconds.items():
+            for path, seconds in paths.items():
+                frames = [operation, "/"] + [name for name in path.split("/") if name]
+                lines.append(f"{';'.join(frames)} {round(seconds * 1e6)}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def profile() -> Iterator[H5Stats]:
+    """Record statistics of the loads, dumps and dataset I/O in the block.
+
+    Calls from all threads are recorded. Profiles can't be nested.
+
+    Returns:
+        The :class:`h5pydantic.H5Stats` being recorded.
+    """
+    global _active
+    if _active is not None:
+        raise RuntimeError("h5pydantic.profile() is already active")
+    stats = _active = H5Stats()
+    try:
+        yield stats
+    finally:
+        _active = None
+
+
+def _traced(operation: str) -> Callable:
+    """Time a _load/_dump/_save(self or cls, h5file, prefix, ...) method by path, when profiling."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(owner, h5file, prefix, *args, **kwargs):
+            stats = _active
+            if stats is None:
+                return func(owner, h5file, prefix, *args, **kwargs)
+            stats._enter()
+            try:
+                return func(owner, h5file, prefix, *args, **kwargs)
+            finally:
+                stats._exit(operation, str(prefix))
+        return wrapper
+    return decorator
+
+
+def _construct(cls, values: dict[str, Any]):
+    """cls(**values), timed as validation when profiling."""
+    stats = _active
+    if stats is None:
+        return cls(**values)
+    start = time.perf_counter()
+    try:
+        return cls(**values)
+    finally:
+        stats._validated(time.perf_counter() - start)
+
+
+@contextmanager
+def _validating() -> Iterator[None]:
+    """Time the block as validation, when profiling."""
+    stats = _active
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats._validated(time.perf_counter() - start)
+
+
+def _nbytes(value) -> int:
+    """The size of data read or written, with strings counted a byte per character."""
+    array = numpy.asarray(value)
+    if array.dtype.kind in "UT":
+        return int(numpy.strings.str_len(array).sum())
+    return array.nbytes
+
+
+def _open(parent, name: str):
+    """parent[name], counted as an open when profiling."""
+    if _active is not None:
+        _active._opened()
+    return parent[name]
@@ -0,0 +1,143 @@
+from typing import Any, Callable
+
+
+class _Unloaded:
+    """Placeholder for a list element that hasn't been loaded yet."""
+
+    def __repr__(self):
+        return "<unloaded>"
+
+
+_UNLOADED = _Unloaded()
+
+
+class _LazyList(list):
+    """A list whose elements are loaded from the HDF5 file when first accessed.
+
+    The length is known up front, so ``len()`` doesn't load anything.
+    Loaded elements are cached in the list. Elements are loaded by their
+    position, so the whole list is loaded before anything changes it.
+    """
+
+    def __init__(self, iterable, load: Callable[[int], Any]):
+        super().__init__(iterable)
+        self._load_element = load
+
+    def _get(self, index: int) -> Any:
+        value = super().__getitem__(index)
+        if value is _UNLOADED:
+            value = self._load_element(range(len(self))[index])
+            super().__setitem__(index, value)
+        return value
+
+    def _load_all(self):
+        for i in range(len(self)):
+            self._get(i)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self)))]
+        return self._get(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._get(i)
+
+    def __reversed__(self):
+        for i in reversed(range(len(self))):
+            yield self._get(i)
+
+    def __contains__(self, value) -> bool:
+        return any(elem == value for elem in self)
+
+    def __eq__(self, other) -> bool:
+        self._load_all()
+        return super().__eq__(other)
+
+    def __ne__(self, other) -> bool:
+        return not self == other
+
+    def __lt__(self, other) -> bool:
+        self._load_all()
+        return super().__lt__(other)
+
+    def __le__(self, other) -> bool:
+        self._load_all()
+        return super().__le__(other)
+
+    def __gt__(self, other) -> bool:
+        self._load_all()
+        return super().__gt__(other)
+
+    def __ge__(self, other) -> bool:
+        self._load_all()
+        return super().__ge__(other)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def __add__(self, other) -> list:
+        return list(self) + other
+
+    def __radd__(self, other) -> list:
+        return other + list(self)
+
+    def __mul__(self, count) -> list:
+        return list(self) * count
+
+    __rmul__ = __mul__
+
+    def copy(self) -> list:
+        return list(self)
+
+    def index(self, value, *args) -> int:
+        self._load_all()
+        return super().index(value, *args)
+
+    def count(self, value) -> int:
+        self._load_all()
+        return super().count(value)
+
+    def __setitem__(self, index, value):
+        self._load_all()
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index):
+        self._load_all()
+        super().__delitem__(index)
+
+    def __iadd__(self, other):
+        self._load_all()
+        return super().__iadd__(other)
+
+    def __imul__(self, count):
+        self._load_all()
+        return super().__imul__(count)
+
+    def append(self, value):
+        self._load_all()
+        super().append(value)
+
+    def extend(self, values):
+        self._load_all()
+        super().extend(values)
+
+    def insert(self, index, value):
+        self._load_all()
+        super().insert(index, value)
+
+    def pop(self, index=-1) -> Any:
+        self._load_all()
+        return super().pop(index)
+
+    def remove(self, value):
+        self._load_all()
+        super().remove(value)
+
+    def reverse(self):
+        self._load_all()
+        super().reverse()
+
+    def sort(self, *args, **kwargs):
+        self._load_all()
+        super().sort(*args, **kwargs)
@@ -0,0 +1,20 @@
+from typing import Optional
+
+import h5py
+
+import numpy
+
+
+def _memmap(dset: h5py.Dataset) -> Optional[numpy.memmap]:
+    """A read-only memory map of dset, None unless it is stored contiguously, unfiltered, in the file itself."""
+    h5file = dset.file
+    if (h5file.driver != "sec2" or h5file.mode != "r" or h5file.swmr_mode
+            or dset.chunks is not None or dset.external is not None
+            or dset.dtype.hasobject or dset.size == 0):
+        return None
+
+    offset = dset.id.get_offset()
+    if offset is None:
+        # Not written yet, so there is no storage to map.
+        return None
+    return numpy.memmap(h5file.filename, mode="r", dtype=dset.dtype, offset=offset, shape=dset.shape)
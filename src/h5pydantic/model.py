@@ -1,182 +1,467 @@
 import h5py
-from pydantic.v1 import BaseModel
-from pydantic import PrivateAttr, StrictInt, StrictStr
+from pydantic import BaseModel, ConfigDict, PrivateAttr, StrictBool, StrictInt, ValidationError, model_validator
+from pydantic.fields import FieldInfo
+from pydantic_core import InitErrorDetails
 
 import numpy
 
 from abc import abstractmethod
+from concurrent.futures import Executor
 from contextlib import contextmanager
 from pathlib import Path, PurePosixPath
 from enum import Enum
+import os
 import types
 
 from typing import get_origin, get_args
-from typing import Any, Optional, Union
+from typing import Any, BinaryIO, ClassVar, Iterable, Iterator, Literal, Mapping, Optional, Union
 from typing_extensions import Self, Type
 
-from .enum import _h5enum_dump, _h5enum_load
-from .exceptions import H5PartialDump
-from .types import H5Type, _pytype_to_h5type
+from . import aio, instrument
+from .attrs import _track_order, _write_attrs
+from .bulk import H5LoadResult, _load_many
+from .chunks import _write_chunks
+from .enum import _h5enum_commit
+from .exceptions import H5Mismatch, H5PartialDump
+from .image import _Buffer, _BufferFile
+from .lazy import _UNLOADED
+from .memmap import _memmap
+from .plan import (_FieldPlan, _AttributePlan, _AttributeListPlan, _EnumPlan, _NodePlan, _NodeListPlan,
+                   _StackPlan, _TableList, _TablePlan, _UnionPlan, _field_types)
+from .types import H5String, H5Type, _pytype_to_h5type, _pytype_to_numpy
 
 _H5Container = Union[h5py.Group, h5py.Dataset]
 
+# Dataset dtypes stored as strings.
+_STRING_TYPES = (str, H5String)
+
 import logging
 
 logger = logging.getLogger('h5pydantic_logger')
 
+
+def _source_path(filename) -> Optional[str]:
+    """The resolved path of a file given by name, None for file-like objects and file images."""
+    return os.path.realpath(filename) if isinstance(filename, (str, os.PathLike)) else None
+
 # FIXME strings probably need some form of validation, printable seems good, but may be too strict
 class _H5Base(BaseModel):
     """An implementation detail, to share the _load and _dump APIs."""
 
+    # The fields assigned since the node was loaded or dumped, None for a node that isn't in a file yet.
+    _h5dirty: Optional[set[str]] = PrivateAttr(default=None)
+    # The compiled plan of each class, see _h5plan.
+    _h5plan_cache: ClassVar[Optional[tuple[_FieldPlan, ...]]] = None
+
     @classmethod
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
-        for key, field in cls.__fields__.items():
-            if isinstance(field.outer_type_, types.GenericAlias):
+        # Nodes given as a default without an annotation are fields of their class, as pydantic v1 inferred.
+        annotations = cls.__dict__.get("__annotations__", {})
+        for name, value in list(cls.__dict__.items()):
+            if isinstance(value, _H5Base) and name not in annotations:
+                annotations[name] = type(value)
+        if annotations and "__annotations__" not in cls.__dict__:
+            cls.__annotations__ = annotations
 
-                if get_origin(field.outer_type_) != list:
-                    raise TypeError(f"h5pydantic only handles list containers, not '{get_origin(field.outer_type_)}'")
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs):
+        super().__pydantic_init_subclass__(**kwargs)
+        rebuild = False
+        for key, field in cls.model_fields.items():
+            (outer, inner, optional) = _field_types(field)
+            if isinstance(outer, types.GenericAlias):
+
+                if get_origin(outer) != list:
+                    raise TypeError(f"h5pydantic only handles list containers, not '{get_origin(outer)}'")
 
-                if issubclass(field.type_, Enum):
+                if isinstance(inner, type) and issubclass(inner, Enum):
                     raise TypeError("h5pydantic does not handle lists of enums")
 
-            elif field.type_ is str:
-                # FIXME this is an awful way of coercing a type, not sure what the right thing to do is.
-                field.type_ = StrictStr
-                field.populate_validators()
+            if optional and field.is_required():
+                # Optional fields may be absent from files, so they default to None.
+                field.default = None
+                rebuild = True
+        if rebuild:
+            cls.model_rebuild(force=True)
+
+    @classmethod
+    def _h5plan(cls) -> tuple[_FieldPlan, ...]:
+        """The load/dump handlers for each field of this class, compiled on first use."""
+        plan = cls.__dict__.get("_h5plan_cache")
+        if plan is None:
+            plan = tuple(_compile_field(key, field) for key, field in cls.model_fields.items())
+            cls._h5plan_cache = plan
+        return plan
 
     @abstractmethod
     def _dump_container(self, h5file: h5py.File, prefix: PurePosixPath) -> _H5Container:
         """Dump the group/dataset container to the h5file."""
 
     def _dump_children(self, container: _H5Container, h5file: h5py.File, prefix: PurePosixPath):
-        for key, field in self.__fields__.items():
-            # FIXME I think I should be explicitly testing these keys against a known list, at init time though.
-            # FIXME I really don't like this delegation code.
-            value = getattr(self, key)
-            if field.required is False and value is None:
+        attrs = []
+        for plan in self._h5plan():
+            value = getattr(self, plan.key)
+            if value is None and not plan.required:
                 continue
-
-            elif get_origin(field.outer_type_) is list:
-                for i, elem in enumerate(value):
-                    elem._dump(h5file, prefix / key / str(i))
-            elif isinstance(value, Enum):
-                _h5enum_dump(h5file, container, key, value.value, field)
-
-            elif isinstance(value, _H5Base):
-                value._dump(h5file, prefix / key)
-
+            if plan.batched:
+                attrs.append(plan.attr(value))
             else:
-                # FIXME should handle shape here. (i.e. datasets)
-                dtype = _pytype_to_h5type(field.type_)
-                # FIXME set the type explicitly
-                container.attrs.create(key, getattr(self, key)) #  dtype=_pytype_to_h5type(field.type_))
+                plan.dump(value, container, h5file, prefix)
+        _write_attrs(container, attrs)
 
+    @instrument._traced("dump")
     def _dump(self, h5file: h5py.File, prefix: PurePosixPath):
         container = self._dump_container(h5file, prefix)
         self._dump_children(container, h5file, prefix)
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        # Anything else set without an error is a field. Private attributes are set often,
+        # and slower to read in pydantic v2, so they are skipped first.
+        if not name.startswith("_") and self._h5dirty is not None:
+            self._h5dirty.add(name)
+
+    def __copy__(self) -> Self:
+        copied = super().__copy__()
+        # Assignments to the copy are its own.
+        if self._h5dirty is not None:
+            copied._h5dirty = set(self._h5dirty)
+        return copied
+
+    @instrument._traced("save")
+    def _save(self, h5file: h5py.File, prefix: PurePosixPath):
+        """Write the fields assigned since the node was loaded or dumped, and the nodes below it.
+
+        Nodes that aren't in the file yet are dumped whole. Deferred fields of
+        a lazy load are skipped, as they can't have been changed.
+        """
+        if self._h5dirty is None or str(prefix) not in h5file:
+            self._dump(h5file, prefix)
+            return
+
+        container = h5file[str(prefix)]
+        attrs = []
+        for plan in self._h5plan():
+            if plan.key not in self.__dict__:
+                continue
+            value = self.__dict__[plan.key]
+
+            if plan.key in self._h5dirty:
+                # The old value may be of another kind, or absent in the new one.
+                name = plan.key.encode()
+                if h5py.h5a.exists(container.id, name):
+                    h5py.h5a.delete(container.id, name)
+                if isinstance(container, h5py.Group) and plan.key in container:
+                    del container[plan.key]
+
+                if value is None and not plan.required:
+                    continue
+                if plan.batched:
+                    attrs.append(plan.attr(value))
+                else:
+                    plan.dump(value, container, h5file, prefix)
+            elif value is None:
+                continue
+            elif isinstance(plan, (_NodePlan, _UnionPlan)):
+                value._save(h5file, prefix / plan.key)
+            elif isinstance(plan, _NodeListPlan):
+                for i, elem in enumerate(list.__iter__(value)):
+                    if elem is not _UNLOADED:
+                        elem._save(h5file, prefix / plan.key / str(i))
+        _write_attrs(container, attrs)
+
+    def __eq__(self, other) -> bool:
+        # Only the field values, not the HDF5 objects and other private state of loaded models.
+        if not isinstance(other, _H5Base):
+            return NotImplemented
+        return type(self) is type(other) and dict(self) == dict(other)
+
+    def _h5clean(self):
+        """Mark the whole tree as matching the file."""
+        for (_, node) in self._walk(PurePosixPath("/")):
+            node._h5dirty = set()
+
     @classmethod
-    def _load_intrinsic(cls, h5file: h5py.File, prefix: PurePosixPath) -> dict[str, Any]:
+    def _load_intrinsic(cls, h5file: h5py.File, prefix: PurePosixPath, mmap: bool = False) -> dict[str, Any]:
         return {}
 
     @classmethod
-    def _load_children(cls, h5file: h5py.File, prefix: PurePosixPath):
-        # FIXME specialise away Any
-        d: dict[str, Any] = {}
-        for key, field in cls.__fields__.items():
-            # logger.info(f"ALIAS: {field.alias}, TYPE: {field.type_}, required: {field.required}, outer type: {field.outer_type_}, origin: {get_origin(field.outer_type_)}")
-
-            # Allow h5py to work with unions - only currently checks against data shape
-            if get_origin(field.outer_type_) == Union:
-                # If the field is optional and not found in HDF5 then set to any model so 
-                # the dictionary item can be set to None later on
-                if field.required is False and str(prefix / field.alias) not in h5file:
-                    field.type_ = get_args(field.outer_type_)[0]
-                else:
-                    np_dataset = h5file[str(prefix / field.alias)][()]
-                    
-                    # if data dimensions match check if shape matches any datamodel in the union
-                    model_match: bool = True
-                    for data_model in get_args(field.outer_type_):
-                        model_match = True
-                        if len(data_model._h5config.shape) == len(np_dataset.shape):
-                            for idx, data_dim in enumerate(data_model._h5config.shape):
-                                if data_dim != -1 and data_dim != np_dataset.shape[idx]:
-                                    model_match = False
-                        else:
-                            model_match = False
-
-                        if model_match:
-                            logger.info(f"UNION FOUND: {field.alias}, data model {data_model} shape match")
-                            field.type_ = data_model
-                            break
-                    
-                    if not model_match:
-                        raise(TypeError(f"Could not find suitable data model in Union to match data shape: {np_dataset.shape}"))
-                    
-            if get_origin(field.outer_type_) == list:    # isinstance(field.outer_type_, types.GenericAlias):
-                if field.required is False and (str(prefix / field.alias) not in h5file or field.alias not in h5file[str(prefix)].attrs.keys()):
-                    d[field.alias] = None
-                    logger.info(f"Optional field {key} not present in this file")
-                else:
-                    if field.alias in h5file[str(prefix)].attrs.keys():
-                        # TODO add types that aren't ints
-                        d[field.alias] = [int(i) for i in h5file[str(prefix)].attrs[field.alias]]
-                    else:
-                        d[field.alias] = []
-                        indexes = [int(i) for i in h5file[str(prefix / field.alias)].keys()]
-                        indexes.sort()
-                        for i in indexes:
-                            # FIXME This doesn't check a lot of cases.
-                            d[field.alias].insert(i, field.type_._load(h5file, prefix / field.alias / str(i)))
-
-            elif issubclass(field.type_, _H5Base):
-                if field.required is False and str(prefix / field.alias) not in h5file:
-                    d[field.alias] = None
-                    logger.info(f"Optional field {key} not present in this file")
-                else:
-                    d[field.alias] = field.type_._load(h5file, prefix / field.alias)
-
-            elif issubclass(field.type_, Enum):
-                d[field.alias] = _h5enum_load(h5file, prefix, field.alias, field)
+    def _load_children(cls, h5file: h5py.File, prefix: PurePosixPath,
+                       container: Optional[_H5Container] = None, mmap: bool = False) -> dict[str, Any]:
+        if container is None:
+            container = instrument._open(h5file, str(prefix))
+        return {plan.alias: plan.load(h5file, container, prefix, mmap=mmap) for plan in cls._h5plan()}
 
-            else:
-                if field.required is False and field.alias not in h5file[str(prefix)].attrs:
-                    d[field.alias] = None
-                    logger.info(f"Optional attribute {key} from path {prefix} not present in this file")
-                else:
-                    d[field.alias] = h5file[str(prefix)].attrs[field.alias]
+    @classmethod
+    @instrument._traced("load")
+    def _load(cls, h5file: h5py.File, prefix: PurePosixPath, lazy: bool = False, mmap: bool = False) -> Self:
+        d = cls._load_intrinsic(h5file, prefix, mmap)
+        # Datasets are opened by _load_intrinsic already.
+        d.update(cls._load_children(h5file, prefix, d.get("_dset"), mmap))
+        node = instrument._construct(cls, d)
+        node._h5dirty = set()
+        return node
+
+    def _walk(self, prefix: PurePosixPath) -> Iterator[tuple[PurePosixPath, "_H5Base"]]:
+        """This node and all the loaded nodes below it, with their paths in the file."""
+        yield (prefix, self)
+        for plan in self._h5plan():
+            value = self.__dict__.get(plan.key)
+            if value is None:
+                continue
+            if isinstance(plan, (_NodePlan, _UnionPlan)):
+                yield from value._walk(prefix / plan.alias)
+            elif isinstance(plan, _NodeListPlan):
+                for i, elem in enumerate(list.__iter__(value)):
+                    if elem is not _UNLOADED:
+                        yield from elem._walk(prefix / plan.alias / str(i))
 
-        return d
+    @classmethod
+    @abstractmethod
+    def _validate_intrinsic(cls, node, prefix: PurePosixPath, mismatches: list[H5Mismatch]):
+        """Add the ways node itself doesn't match this class to mismatches."""
 
     @classmethod
-    def _load(cls, h5file: h5py.File, prefix: PurePosixPath) -> Self:
-        d = cls._load_intrinsic(h5file, prefix)
-        d.update(cls._load_children(h5file, prefix))
-        return cls(**d)
+    def _validate(cls, node: _H5Container, prefix: PurePosixPath, mismatches: list[H5Mismatch]):
+        """Add the ways node, at prefix, and its children, don't match this class to mismatches."""
+        cls._validate_intrinsic(node, prefix, mismatches)
+        for plan in cls._h5plan():
+            plan.validate(node, prefix, mismatches)
+
+def _compile_field(key: str, field: FieldInfo) -> _FieldPlan:
+    """Pick the load/dump handler for a field."""
+    def is_subclass(type_, base) -> bool:
+        return isinstance(type_, type) and issubclass(type_, base)
+
+    (outer, inner, _) = _field_types(field)
+    if get_origin(outer) is Union:
+        if all(is_subclass(arg, _H5Base) for arg in get_args(outer)):
+            return _UnionPlan(key, field)
+    elif get_origin(outer) is list:
+        if is_subclass(inner, H5Group) and inner._h5list_layout != "groups":
+            return _TablePlan(key, field)
+        elif (is_subclass(inner, H5Dataset) and hasattr(inner, "_h5config")
+              and inner._h5config.list_layout == "stack"):
+            return _StackPlan(key, field)
+        elif is_subclass(inner, _H5Base):
+            return _NodeListPlan(key, field)
+        return _AttributeListPlan(key, field)
+    elif is_subclass(inner, _H5Base):
+        return _NodePlan(key, field)
+    elif is_subclass(inner, Enum):
+        return _EnumPlan(key, field)
+    return _AttributePlan(key, field)
+
 
 class H5DatasetConfig(BaseModel):
-    """All of the dataset configuration options."""
-    # FIXME There are a *lot* of dataset features to be supported as optional flags, compression, chunking etc.
+    """All of the dataset configuration options.
+
+    The storage options (``chunks`` onwards) are passed through to
+    :meth:`h5py.Group.create_dataset`, with the exception of
+    ``chunks="frames"``, which chunks one frame (the first dimension) at a time.
+
+    The string options only apply to ``dtype=str`` datasets. ``string_length``
+    stores fixed length strings of that many bytes, rather than variable
+    length strings, and ``string_array`` picks the numpy dtype string data is
+    read as.
+
+    ``list_layout="stack"`` stores a list of these datasets as one dataset,
+    stacked along a new first dimension, rather than one dataset per element.
+    """
     shape: tuple[StrictInt, ...]
     dtype: Union[Type[str],Type[float],Type[H5Type],Type[Enum]]
+    string_length: Optional[StrictInt] = None
+    string_encoding: Literal["utf-8", "ascii"] = "utf-8"
+    string_array: Literal["StringDType", "U"] = "StringDType"
+    chunks: Union[None, StrictBool, tuple[StrictInt, ...], Literal["frames"]] = None
+    compression: Union[None, Literal["gzip", "lzf", "szip"], StrictInt] = None
+    compression_opts: Optional[Any] = None
+    shuffle: Optional[StrictBool] = None
+    fletcher32: Optional[StrictBool] = None
+    scaleoffset: Optional[StrictInt] = None
+    list_layout: Literal["datasets", "stack"] = "datasets"
+
+    @model_validator(mode="after")
+    def _check_storage(self) -> Self:
+        shape, chunks = self.shape, self.chunks
+        if isinstance(chunks, tuple) and len(chunks) != len(shape):
+            raise ValueError(f"chunks {chunks} must have the same number of dimensions as shape {shape}")
+        if chunks == "frames" and len(shape) < 2:
+            raise ValueError(f"chunks='frames' needs at least two dimensions, not shape {shape}")
+        if self.compression_opts is not None and self.compression is None:
+            raise ValueError("compression_opts given without compression")
+        if not self._is_string():
+            for option, default in (("string_length", None), ("string_encoding", "utf-8"),
+                                    ("string_array", "StringDType")):
+                if getattr(self, option) != default:
+                    raise ValueError(f"{option} is only for dtype=str, not {self.dtype}")
+        if self.string_length is not None and self.string_length < 1:
+            raise ValueError(f"string_length must be positive, not {self.string_length}")
+        if self.list_layout == "stack" and -1 in shape:
+            raise ValueError(f"list_layout='stack' needs a fixed shape, not {shape}")
+        return self
+
+    def _is_string(self) -> bool:
+        """Whether this is a dataset of strings."""
+        return self.dtype in _STRING_TYPES
+
+    def _h5dtype(self):
+        """The dtype to create the dataset with."""
+        if self._is_string():
+            return h5py.string_dtype(encoding=self.string_encoding, length=self.string_length)
+        return _pytype_to_h5type(self.dtype)
+
+    def _numpy_dtype(self) -> Optional[numpy.dtype]:
+        """The numpy dtype h5py reads the dataset as, None if unknown."""
+        if self._is_string():
+            return self._h5dtype()
+        return _pytype_to_numpy(self.dtype)
+
+    def _check_string_dtype(self, dtype: numpy.dtype, prefix: PurePosixPath):
+        """Raise a ValueError if the stored string dtype doesn't match this configuration.
+
+        utf-8 models can read ascii data, as ascii is a subset of utf-8.
+        """
+        info = h5py.check_string_dtype(dtype)
+        if (info is None or info.length != self.string_length
+                or (self.string_encoding == "ascii" and info.encoding != "ascii")):
+            described = "variable length" if self.string_length is None else f"length {self.string_length}"
+            found = "not strings" if info is None else \
+                f"{'variable length' if info.length is None else f'length {info.length}'} {info.encoding}"
+            raise ValueError(f"{prefix}: Model data type {described} {self.string_encoding} strings "
+                             f"does not match H5 data type {dtype} ({found})")
+
+    def _to_strings(self, value) -> numpy.ndarray:
+        """Convert strings to write in one bulk conversion, checking they fit the stored dtype."""
+        value = numpy.asarray(value, dtype=numpy.dtypes.StringDType())
+        if self.string_length is not None or self.string_encoding == "ascii":
+            try:
+                encoded = numpy.strings.encode(value, self.string_encoding)
+            except UnicodeEncodeError as e:
+                raise ValueError(f"Strings are not {self.string_encoding}: {e}") from e
+            if self.string_length is not None and encoded.dtype.itemsize > self.string_length:
+                raise ValueError(f"Strings longer than string_length {self.string_length} bytes")
+        return value
+
+    def _from_strings(self, value):
+        """Convert strings read as StringDType to the configured string_array, scalars to str."""
+        if numpy.ndim(value) == 0:
+            return str(value[()] if isinstance(value, numpy.ndarray) else value)
+        if self.string_array == "U":
+            return value.astype(f"U{max(1, numpy.strings.str_len(value).max(initial=0))}")
+        return value
+
+    def _resizable(self) -> bool:
+        """Whether any dimension is unlimited (-1)."""
+        return -1 in self.shape
+
+    def _initial_shape(self) -> tuple[int, ...]:
+        """The shape to create the dataset with, unlimited dimensions start empty."""
+        return tuple(0 if dim == -1 else dim for dim in self.shape)
+
+    def _maxshape(self) -> Optional[tuple[Optional[int], ...]]:
+        """The maxshape argument as h5py understands it."""
+        if not self._resizable():
+            return None
+        return tuple(None if dim == -1 else dim for dim in self.shape)
+
+    def _chunk_shape(self) -> Union[None, bool, tuple[int, ...]]:
+        """The chunks argument as h5py understands it."""
+        if self.chunks == "frames":
+            return (1,) + tuple(1 if dim == -1 else dim for dim in self.shape[1:])
+        return self.chunks
+
+    def _stacked(self) -> "H5DatasetConfig":
+        """The configuration of the dataset a stacked list of these datasets is stored in.
+
+        The stack can grow along its first dimension. Unless chunks are given,
+        small elements are chunked together, up to about 1 MiB.
+        """
+        chunks = self._chunk_shape()
+        if chunks is None:
+            itemsize = numpy.dtype(self._h5dtype()).itemsize
+            rows = max(1, (1 << 20) // max(1, itemsize * int(numpy.prod(self.shape))))
+            chunks = (rows,) + self.shape
+        elif isinstance(chunks, tuple):
+            chunks = (1,) + chunks
+        return self.model_copy(update={"shape": (-1,) + self.shape, "chunks": chunks, "list_layout": "datasets"})
+
+    def _storage_kwargs(self) -> dict[str, Any]:
+        """The keyword arguments to pass to :meth:`h5py.Group.create_dataset`."""
+        kwargs = {"maxshape": self._maxshape(), "chunks": self._chunk_shape(), "compression": self.compression,
+                  "compression_opts": self.compression_opts, "shuffle": self.shuffle,
+                  "fletcher32": self.fletcher32, "scaleoffset": self.scaleoffset}
+        return {key: value for key, value in kwargs.items() if value is not None}
+
+    def _check_storage_layout(self, dset: h5py.Dataset, prefix: PurePosixPath):
+        """Raise a ValueError if the stored layout of dset doesn't match this configuration.
+
+        Only the options the model sets are checked, so a model without storage
+        options loads data stored with any layout.
+        """
+        chunks = self._chunk_shape()
+        if chunks is True and dset.chunks is None:
+            raise ValueError(f"{prefix}: Model is chunked, H5 data is contiguous")
+        elif isinstance(chunks, tuple) and chunks != dset.chunks:
+            raise ValueError(f"{prefix}: Model chunks {chunks} do not match H5 data chunks {dset.chunks}")
+
+        if isinstance(self.compression, int):
+            plist = dset.id.get_create_plist()
+            filters = [plist.get_filter(i)[0] for i in range(plist.get_nfilters())]
+            if self.compression not in filters:
+                raise ValueError(f"{prefix}: Model compression filter {self.compression} not found in H5 data")
+        elif self.compression is not None and self.compression != dset.compression:
+            raise ValueError(f"{prefix}: Model compression {self.compression} does not match "
+                             f"H5 data compression {dset.compression}")
+
+        if self.compression_opts is not None and self.compression_opts != dset.compression_opts:
+            raise ValueError(f"{prefix}: Model compression_opts {self.compression_opts} do not match "
+                             f"H5 data compression_opts {dset.compression_opts}")
+
+        for flag in ("shuffle", "fletcher32"):
+            value = getattr(self, flag)
+            if value is not None and value != getattr(dset, flag):
+                raise ValueError(f"{prefix}: Model {flag}={value} does not match H5 data")
+
+        if self.scaleoffset is not None and self.scaleoffset != dset.scaleoffset:
+            raise ValueError(f"{prefix}: Model scaleoffset {self.scaleoffset} does not match "
+                             f"H5 data scaleoffset {dset.scaleoffset}")
 
 
 class H5Dataset(_H5Base):
     """A :class:`pydantic.BaseModel` representing a :class:`h5py.Dataset`.
     """
 
-    _h5config: H5DatasetConfig = PrivateAttr()
+    _h5config: ClassVar[H5DatasetConfig]
+    # Whether this is a base class, like H5VirtualDataset, configured by its own subclasses.
+    _h5abstract: ClassVar[bool] = False
     _data: Optional[numpy.ndarray] = PrivateAttr(default=None)
     _dset: Optional[h5py.Dataset] = PrivateAttr(default=None)
     _modified: bool = PrivateAttr(default=False)
-
+    _length: int = PrivateAttr(default=0)
+    # Inside H5Group.dumper(), which trims appended datasets when it closes.
+    _dumping: bool = PrivateAttr(default=False)
+    _swmr: bool = PrivateAttr(default=False)
+    _polled: int = PrivateAttr(default=0)
+    _mmap: Optional[numpy.memmap] = PrivateAttr(default=None)
+    # The element of _dset this is a view of, for lists stored with list_layout="stack".
+    _index: Optional[int] = PrivateAttr(default=None)
 
     @classmethod
     def __init_subclass__(cls, **kwargs):
+        if cls.__dict__.get("_h5abstract", False):
+            return
         cls._h5config = H5DatasetConfig(**kwargs)
 
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs):
+        super().__pydantic_init_subclass__(**kwargs)
+        config = cls.__dict__.get("_h5config")
+        if config is not None and config.list_layout == "stack" and cls.model_fields:
+            raise TypeError(f"{cls.__name__}: list_layout='stack' needs datasets without attributes, "
+                            f"not {', '.join(cls.model_fields)}")
+
     def __init__(self, data_: Optional[numpy.ndarray] = None, **kwargs):
         """
         Args:
@@ -185,73 +470,194 @@ class H5Dataset(_H5Base):
                    using the array assignment syntax.
         """
         super().__init__(**kwargs)
+        if data_ is not None and self._h5config._is_string():
+            data_ = self._h5config._to_strings(data_)
         self._data = data_
         self._dset = kwargs.get("_dset", None)
+        self._mmap = kwargs.get("_mmap", None)
+        # The data of a loaded dataset is already in its file.
+        self._modified = self._dset is not None
+        self._length = self._dset.shape[0] if self._dset is not None and self._dset.shape else 0
 
-    class Config:
-        # Allows numpy.ndarray (which doesn't have a validator).
-        arbitrary_types_allowed = True
+    # Allows numpy.ndarray (which doesn't have a validator).
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
     # FIXME test for attributes on datasets
 
     def _dump_container(self, h5file: h5py.File, prefix: PurePosixPath) -> Self:
+        stored = self._stored()
+        if stored is not None and self._index is None:
+            # Loaded data isn't read into memory, it's copied from the dataset it was loaded from.
+            # Attributes are written from the fields afterwards.
+            h5file.copy(stored, str(prefix), without_attrs=True)
+            self._dset, self._mmap = h5file[str(prefix)], None
+            self._length = self._dset.shape[0] if self._dset.shape else 0
+            if instrument._active is not None:
+                instrument._active._written(self._dset.name, stored.nbytes)
+            return self._dset
+        if stored is not None:
+            self._data = self._stored_data()
+
         # FIXME check that the shape of data matches
-        # FIXME add in all the other flags
-        self._dset = h5file.require_dataset(str(prefix), shape=self._h5config.shape,
-                                            dtype=_pytype_to_h5type(self._h5config.dtype),
-                                            data=self._data)
+        shape = self._h5config._initial_shape() if self._data is None else numpy.shape(self._data)
+        self._dset = h5file.require_dataset(str(prefix), shape=shape,
+                                            dtype=self._h5config._h5dtype(),
+                                            data=self._data, **self._h5config._storage_kwargs())
         self._modified = self._data is not None
+        self._length = self._dset.shape[0] if self._dset.shape else 0
+        if self._modified and instrument._active is not None:
+            instrument._active._written(self._dset.name, instrument._nbytes(self._data))
         return self._dset
 
     @classmethod
-    def _load_intrinsic(cls, h5file: h5py.File, prefix: PurePosixPath) -> dict:
+    def _check_dataset(cls, dset: h5py.Dataset, prefix: PurePosixPath,
+                       config: Optional[H5DatasetConfig] = None) -> list[H5Mismatch]:
+        """The ways dset doesn't match the shape, data type and storage layout of this class, or config."""
         # FIXME Really should be verifying all of the details match the class.
-        # FIXME should probably be doing exact=True here, but need to test what happens
-        dset = h5file.require_dataset(str(prefix), cls._h5config.shape, _pytype_to_h5type(cls._h5config.dtype))
-
+        path = str(prefix)
         data_type = str(dset.dtype)
-        
-        #TODO do we need these cheks now 'require_dataset' is being used?
-        # Check Dimensions: 
-        if len(cls._h5config.shape) != len(dset.shape):
-            raise ValueError(f"{prefix}: Dimensions of model ({len(cls._h5config.shape)}) dont match dimensions of H5 data: {len(dset.shape)}")
-        
+        config = config or cls._h5config
+
+        # Check Dimensions:
+        if len(config.shape) != len(dset.shape):
+            return [H5Mismatch(path, "shape", f"{prefix}: Dimensions of model ({len(config.shape)}) dont match dimensions of H5 data: {len(dset.shape)}")]
+
+        mismatches = []
+
         # Check Shape: 
-        for idx, data_dim in enumerate(cls._h5config.shape):
+        for idx, data_dim in enumerate(config.shape):
             if data_dim != -1 and data_dim != dset.shape[idx]:
-                raise ValueError(f"{prefix}: Model Shape {cls._h5config.shape} does not match H5 data shape {dset.shape}")
+                mismatches.append(H5Mismatch(path, "shape", f"{prefix}: Model Shape {config.shape} does not match H5 data shape {dset.shape}"))
+                break
 
         # Check Data Type:
-        if str(data_type) == 'object' and  (cls._h5config.dtype.numpy != numpy.bytes_):
+        model_dtype = getattr(config.dtype, "numpy", None) or config._numpy_dtype()
+        if config._is_string():
+            try:
+                config._check_string_dtype(dset.dtype, prefix)
+            except ValueError as e:
+                mismatches.append(H5Mismatch(path, "dtype", str(e)))
+        elif str(data_type) == 'object' and  (model_dtype != numpy.bytes_):
             # string type imports from h5 as 'object'
-            raise ValueError(f"{prefix}: Model data type {cls._h5config.dtype.numpy} (string) does not match H5 data type {data_type}")
-        elif isinstance(dset.dtype, numpy.dtypes.VoidDType) and  (cls._h5config.dtype.numpy != numpy.bytes_):
+            mismatches.append(H5Mismatch(path, "dtype", f"{prefix}: Model data type {model_dtype} (string) does not match H5 data type {data_type}"))
+        elif isinstance(dset.dtype, numpy.dtypes.VoidDType) and  (model_dtype != numpy.bytes_):
             # Compoud data type imports from h5 as VoidDType
-            raise ValueError(f"Compound types do not match in model and data")
-        elif data_type != 'object' and not isinstance(dset.dtype, numpy.dtypes.VoidDType) and dset.dtype != cls._h5config.dtype.numpy:
-            raise ValueError(f"{prefix}:Model data type {cls._h5config.dtype.numpy} does not match H5 data type {dset.dtype}")
-            
-        # Allows model to deal with compound data types
-        if isinstance(dset.dtype, numpy.dtypes.VoidDType):
-            data_type = str(dset.dtype.__class__.__name__)
-
-        logger.info(f"VALIDATED {cls.__name__}: Data shape [{cls._h5config.shape}={dset.shape}] and data type {cls._h5config.dtype.numpy} match")
-        
+            mismatches.append(H5Mismatch(path, "dtype", f"Compound types do not match in model and data"))
+        elif data_type != 'object' and not isinstance(dset.dtype, numpy.dtypes.VoidDType) and dset.dtype != model_dtype:
+            mismatches.append(H5Mismatch(path, "dtype", f"{prefix}:Model data type {model_dtype} does not match H5 data type {dset.dtype}"))
+
+        try:
+            config._check_storage_layout(dset, prefix)
+        except ValueError as e:
+            mismatches.append(H5Mismatch(path, "layout", str(e)))
+
+        return mismatches
+
+    @classmethod
+    def _check_stack(cls, dset: h5py.Dataset, prefix: PurePosixPath) -> list[H5Mismatch]:
+        """The ways dset doesn't match a stacked list of this class."""
+        return cls._check_dataset(dset, prefix, cls._h5config._stacked())
+
+    @classmethod
+    def _views(cls, dset: h5py.Dataset) -> list[Self]:
+        """A view of each element of a stacked list."""
+        views = []
+        for i in range(dset.shape[0]):
+            view = cls.model_construct()
+            view._dset, view._index, view._modified = dset, i, True
+            views.append(view)
+        return views
+
+    @classmethod
+    def _dump_stack(cls, elements: list[Self], container: h5py.Group, name: str) -> h5py.Dataset:
+        """Store elements as one stacked dataset, and make them views of it."""
+        config = cls._h5config._stacked()
+        data = [elem._data if elem._data is not None else elem._stored_data() for elem in elements]
+        written = [value for value in data if value is not None]
+        whole = bool(elements) and len(written) == len(elements)
+        dset = container.create_dataset(name, shape=(len(elements),) + cls._h5config.shape,
+                                        dtype=config._h5dtype(), data=numpy.stack(written) if whole else None,
+                                        **config._storage_kwargs())
+        for (i, (elem, value)) in enumerate(zip(elements, data)):
+            if value is not None:
+                if not whole:
+                    dset[i] = value
+                if instrument._active is not None:
+                    instrument._active._written(dset.name, instrument._nbytes(value))
+            elem._dset, elem._index = dset, i
+            elem._modified = value is not None
+        return dset
+
+    def _stored(self) -> Optional[h5py.Dataset]:
+        """The open dataset holding the data written to or loaded into this dataset, when it isn't in memory."""
+        if self._data is None and self._modified and self._dset is not None and self._dset.id.valid:
+            return self._dset
+        return None
+
+    def _stored_data(self) -> Optional[numpy.ndarray]:
+        """The data of :meth:`_stored`, read whole, or None."""
+        stored = self._stored()
+        if stored is None:
+            return None
+        return self._read(stored, () if self._index is None else self._index)
+
+    def _read(self, source, key):
+        """source[key], counted as read from the dataset when profiling."""
+        value = source[key]
+        if instrument._active is not None:
+            instrument._active._read(self._dset.name, instrument._nbytes(value))
+        return value
+
+    def _check_whole(self, name: str):
+        """Raise a ValueError for operations on whole datasets, when this is an element of a stacked list."""
+        if self._index is not None:
+            raise ValueError(f"{self.__class__.__name__}: {name} is not supported for elements of a stacked list")
+
+    @classmethod
+    def _validate_intrinsic(cls, node, prefix: PurePosixPath, mismatches: list[H5Mismatch]):
+        if not isinstance(node, h5py.Dataset):
+            mismatches.append(H5Mismatch(str(prefix), "node", f"{prefix}: Model {cls.__name__} is a dataset, "
+                                                              f"H5 object is {type(node).__name__}"))
+        else:
+            mismatches.extend(cls._check_dataset(node, prefix))
+
+    @classmethod
+    def _load_intrinsic(cls, h5file: h5py.File, prefix: PurePosixPath, mmap: bool = False) -> dict:
+        dset = instrument._open(h5file, str(prefix))
+        if not isinstance(dset, h5py.Dataset):
+            raise ValueError(f"{prefix}: Model {cls.__name__} is a dataset, H5 object is {type(dset).__name__}")
+
+        mismatches = cls._check_dataset(dset, prefix)
+        if mismatches:
+            raise ValueError(mismatches[0].message)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("VALIDATED %s: Data shape [%s=%s] and data type %s match",
+                        cls.__name__, cls._h5config.shape, dset.shape, cls._h5config._numpy_dtype())
+
+        if mmap and not cls._h5config._is_string():
+            return {"_dset": dset, "_mmap": _memmap(dset)}
         return {"_dset": dset}
 
     def __getitem__(self, key):
         """Allow array like access to the underlying h5py Dataset.
 
+        Strings are read with one bulk conversion, as a numpy array of the
+        configured ``string_array`` dtype, or a str for a single element.
+
         :meta public:
         """
-        if self._dset:
-            value = self._dset.__getitem__(key)
-
-            if isinstance(value, bytes) and self._h5config.dtype is str:
-                return value.decode()
-            else:
-                return value
-
+        if self._index is not None:
+            key = (self._index,) + (key if isinstance(key, tuple) else (key,))
+        if self._h5config._is_string():
+            if self._dset:
+                return self._h5config._from_strings(self._read(self._dset.astype(numpy.dtypes.StringDType()), key))
+            return self._h5config._from_strings(self._data[key])
+
+        if self._mmap is not None:
+            return self._read(self._mmap, key)
+        elif self._dset:
+            return self._read(self._dset, key)
         else:
             return self._data.__getitem__(key)
 
@@ -262,12 +668,328 @@ class H5Dataset(_H5Base):
         """
         if self._data is not None:
             raise ValueError("Cannot modify data_ values given at __init__().")
+        if self._h5config._is_string():
+            value = self._h5config._to_strings(value)
+        if self._index is not None:
+            index = (self._index,) + (index if isinstance(index, tuple) else (index,))
         self._dset.__setitem__(index, value)
         self._modified = True
+        self._flush()
+        if instrument._active is not None:
+            instrument._active._written(self._dset.name, instrument._nbytes(value))
+
+    def _check_buffer(self, dset: h5py.Dataset, buffer: numpy.ndarray, name: str, whole: bool):
+        """Raise a ValueError if buffer can't be read into or written from dset directly."""
+        self._check_whole(name)
+        if self._h5config._is_string():
+            raise ValueError(f"{self.__class__.__name__}: {name} is not supported for string datasets")
+        if not isinstance(buffer, numpy.ndarray) or not buffer.flags.c_contiguous:
+            raise ValueError(f"{self.__class__.__name__}: {name} needs a C contiguous numpy array")
+
+        dtype = self._h5config._numpy_dtype() or dset.dtype
+        if buffer.dtype != dtype:
+            raise ValueError(f"{self.__class__.__name__}: Array dtype {buffer.dtype} does not match model dtype {dtype}")
+        if whole and buffer.shape != dset.shape:
+            raise ValueError(f"{self.__class__.__name__}: Array shape {buffer.shape} does not match "
+                             f"dataset shape {dset.shape} (model shape {self._h5config.shape})")
+
+    def read_into(self, out: numpy.ndarray, source_sel=None, dest_sel=None) -> numpy.ndarray:
+        """Read into an existing array, rather than allocating a new one.
+
+        Built on :meth:`h5py.Dataset.read_direct`, so a hot loop can reuse one buffer.
+
+        Args:
+            out: A C contiguous array of the model's dtype. Without selections,
+                 it must have the shape of the whole dataset.
+            source_sel: The selection to read, such as ``numpy.s_[10]``, the whole dataset by default.
+            dest_sel: The selection of ``out`` to read into, all of it by default.
+
+        Returns:
+            out
+        """
+        if self._dset is None:
+            raise ValueError(f"{self.__class__.__name__}: read_into needs a dataset loaded from, or dumped to, a file.")
+        self._check_buffer(self._dset, out, "read_into", source_sel is None and dest_sel is None)
+        if not out.flags.writeable:
+            raise ValueError(f"{self.__class__.__name__}: read_into needs a writeable array")
+        self._dset.read_direct(out, source_sel, dest_sel)
+        if instrument._active is not None:
+            instrument._active._read(self._dset.name, (out if dest_sel is None else out[dest_sel]).nbytes)
+        return out
+
+    def write_from(self, buffer: numpy.ndarray, source_sel=None, dest_sel=None):
+        """Write from an existing array, without any intermediate copies.
+
+        Built on :meth:`h5py.Dataset.write_direct`, see :meth:`read_into`.
+
+        Args:
+            buffer: A C contiguous array of the model's dtype. Without selections,
+                    it must have the shape of the whole dataset.
+            source_sel: The selection of ``buffer`` to write, all of it by default.
+            dest_sel: The selection to write to, the whole dataset by default.
+        """
+        if self._data is not None:
+            raise ValueError("Cannot modify data_ values given at __init__().")
+        if self._dset is None:
+            raise ValueError(f"{self.__class__.__name__}: write_from needs a dataset loaded from, or dumped to, a file.")
+        self._check_buffer(self._dset, buffer, "write_from", source_sel is None and dest_sel is None)
+        self._dset.write_direct(buffer, source_sel, dest_sel)
+        self._modified = True
+        self._flush()
+        if instrument._active is not None:
+            instrument._active._written(self._dset.name, (buffer if source_sel is None else buffer[source_sel]).nbytes)
+
+    def as_memmap(self) -> numpy.ndarray:
+        """The whole dataset as a read-only :class:`numpy.memmap`, without copying it.
+
+        Only uncompressed, contiguous datasets stored in the file itself can be
+        memory mapped. Anything else, like chunked, compressed or external
+        datasets, falls back to reading the whole dataset into a read-only array.
+        """
+        if self._dset is None:
+            raise ValueError("Can only memory map a dataset loaded from, or dumped to, a file.")
+        self._check_whole("as_memmap")
+        if self._mmap is not None:
+            return self._mmap
+
+        mapped = _memmap(self._dset)
+        if mapped is not None:
+            return mapped
+
+        data = numpy.asarray(self._read(self._dset, ()))
+        data.flags.writeable = False
+        return data
+
+    async def aread(self, key=()):
+        """Read from the dataset without blocking the event loop, see :meth:`__getitem__`.
+
+        The read runs on the I/O executor of :mod:`h5pydantic.aio`, after any other call on the same file.
+        """
+        return await aio._run(self._dset.file.filename, self.__getitem__, key)
+
+    async def awrite(self, key, value):
+        """Write to the dataset without blocking the event loop, see :meth:`__setitem__` and :meth:`aread`."""
+        await aio._run(self._dset.file.filename, self.__setitem__, key, value)
+
+    def append(self, frame):
+        """Append a single frame to the end of the first, unlimited (-1), dimension.
+
+        Available inside :meth:`H5Group.dumper`, and on datasets loaded with
+        ``mode="r+"``. Inside the dumper storage grows geometrically, and is
+        trimmed to size when the dumper closes.
+        """
+        self.extend(numpy.expand_dims(numpy.asarray(frame), 0))
+
+    def extend(self, frames):
+        """Append many frames to the end of the first, unlimited (-1), dimension.
+
+        See :meth:`append`.
+        """
+        if self._data is not None:
+            raise ValueError("Cannot modify data_ values given at __init__().")
+        if self._dset is None:
+            raise ValueError("Can only extend a dataset inside H5Group.dumper(), or loaded with mode='r+'.")
+        self._check_whole("extend")
+        if not self._h5config.shape or self._h5config.shape[0] != -1:
+            raise ValueError(f"{self.__class__.__name__} is not appendable, its first dimension must be -1")
+
+        frames = self._h5config._to_strings(frames) if self._h5config._is_string() else numpy.asarray(frames)
+        end = self._length + len(frames)
+        self._grow(self._dset, end)
+        self._dset[self._length:end] = frames
+        self._length = end
+        self._modified = True
+        self._flush()
+        if instrument._active is not None:
+            instrument._active._written(self._dset.name, frames.nbytes)
+
+    def write_chunks(self, frames, start: int = 0, workers: Optional[int] = None,
+                     executor: Optional[Executor] = None):
+        """Write frames from frame ``start`` of the first dimension, compressing whole chunks in parallel.
+
+        Each chunk is run through the dataset's own filter pipeline in a pool,
+        and the compressed bytes are written with :meth:`h5py.h5d.DatasetID.write_direct_chunk`,
+        so the file reads back exactly as if it had been written normally.
+        Only the gzip and shuffle filters are supported. ``start`` must be on a
+        chunk boundary, and frames must fill whole chunks, except at the end of
+        the dataset. An unlimited first dimension is grown as with :meth:`extend`.
+
+        Available inside :meth:`H5Group.dumper`, and on datasets loaded with ``mode="r+"``.
+
+        Args:
+            frames: The data to write, whole frames of the first dimension.
+            start: The first frame to write to.
+            workers: The number of compression threads, the default is the
+                     :class:`concurrent.futures.ThreadPoolExecutor` default.
+            executor: An executor to compress chunks with instead, such as a
+                      :class:`concurrent.futures.ProcessPoolExecutor`.
+        """
+        if self._data is not None:
+            raise ValueError("Cannot modify data_ values given at __init__().")
+        if self._dset is None:
+            raise ValueError("Can only write chunks to a dataset inside H5Group.dumper(), or loaded with mode='r+'.")
+        self._check_whole("write_chunks")
+
+        frames = numpy.asarray(frames)
+        end = start + len(frames)
+        if self._h5config.shape and self._h5config.shape[0] == -1:
+            self._grow(self._dset, end)
+            self._length = max(self._length, end)
+            extent = self._length
+        elif end > self._dset.shape[0]:
+            raise ValueError(f"{self._dset.name}: Frames {start}:{end} are outside the dataset shape {self._dset.shape}")
+        else:
+            extent = self._dset.shape[0]
+
+        _write_chunks(self._dset, frames, start, extent, workers, executor)
+        self._modified = True
+        self._flush()
+        if instrument._active is not None:
+            instrument._active._written(self._dset.name, frames.nbytes)
+
+    def _grow(self, dset: h5py.Dataset, end: int):
+        """Make room for end frames in the first dimension.
+
+        Storage grows geometrically inside :meth:`H5Group.dumper`, which trims it.
+        Outside of it, and in SWMR mode, where readers see the dataset's shape,
+        it only ever covers the frames written.
+        """
+        if end > dset.shape[0]:
+            exact = self._swmr or not self._dumping
+            dset.resize(end if exact else max(end, 2 * dset.shape[0]), axis=0)
+
+    def _flush(self):
+        """Make writes visible to SWMR readers."""
+        if self._swmr:
+            self._dset.flush()
+
+    def refresh(self) -> tuple[int, ...]:
+        """Pick up changes made by a SWMR writer, see :meth:`H5Group.load`.
+
+        Returns:
+            The current shape of the dataset.
+        """
+        if self._dset is None:
+            raise ValueError(f"{self.__class__.__name__}: refresh needs a dataset loaded from a file.")
+        self._dset.refresh()
+        return self._dset.shape
+
+    def new_frames(self) -> Iterator[numpy.ndarray]:
+        """Refresh, then iterate over the frames of the first dimension written since the last call.
+
+        The first call gives all the frames written so far. The new frames are
+        read in one go, so polling regularly keeps up with a SWMR writer. A frame
+        only counts as polled once it has been yielded, so stopping early leaves
+        the rest for the next call.
+        """
+        if not self._h5config.shape:
+            raise ValueError(f"{self.__class__.__name__} is a scalar dataset, it has no frames")
+        start = self._polled
+        end = self.refresh()[0]
+        if end > start:
+            for frame in self[start:end]:
+                self._polled += 1
+                yield frame
+
+    def _trim(self):
+        """Shrink an appended dataset down to the frames actually written."""
+        if self._h5config.shape and self._h5config.shape[0] == -1 and self._dset.shape[0] != self._length:
+            self._dset.resize(self._length, axis=0)
 
     # FIXME __len__?
 
 
+class H5VirtualDataset(H5Dataset):
+    """A :class:`H5Dataset` stacking datasets from other files along its first dimension.
+
+    It is stored as an HDF5 virtual dataset, which maps each source dataset
+    into the stack, so dumping never copies any frame data. It is read like
+    any other dataset.
+
+    Storage options don't apply, as the data is stored in the source files.
+    """
+
+    _h5abstract: ClassVar[bool] = True
+    _sources: list[tuple[str, str]] = PrivateAttr(default_factory=list)
+
+    @classmethod
+    def __init_subclass__(cls, **kwargs):
+        cls._h5config = H5DatasetConfig(**kwargs)
+        storage = cls._h5config._storage_kwargs()
+        storage.pop("maxshape", None)
+        if storage:
+            raise ValueError(f"{cls.__name__}: Virtual datasets don't have storage options, not {storage}")
+        if not cls._h5config.shape:
+            raise ValueError(f"{cls.__name__}: Virtual datasets need at least one dimension to stack along")
+        if cls._h5config.list_layout != "datasets":
+            raise ValueError(f"{cls.__name__}: Virtual datasets can't be stored as list_layout='stack'")
+
+    def __init__(self, sources_: Optional[list[tuple[Union[str, Path], str]]] = None, **kwargs):
+        """
+        Args:
+            sources_: The (filename, dataset path) of each dataset to stack, in order.
+                      Relative filenames are relative to the directory of the file
+                      the virtual dataset is dumped to.
+        """
+        super().__init__(**kwargs)
+        if "_dset" in kwargs:
+            sources_ = [(source.file_name, source.dset_name) for source in kwargs["_dset"].virtual_sources()]
+        self._sources = [(str(filename), path) for (filename, path) in sources_ or []]
+
+    def sources(self) -> list[tuple[str, str]]:
+        """The (filename, dataset path) of each stacked dataset."""
+        return list(self._sources)
+
+    def _dump_container(self, h5file: h5py.File, prefix: PurePosixPath) -> h5py.Dataset:
+        name = self.__class__.__name__
+        if not self._sources:
+            raise ValueError(f"{prefix}: {name} has no sources to stack")
+
+        # Only the metadata of the sources is read.
+        directory = Path(h5file.filename).parent
+        dtype = self._h5config._numpy_dtype()
+        shapes = []
+        for (filename, path) in self._sources:
+            with h5py.File(directory / filename, "r") as source_file:
+                source = source_file[path]
+                if not isinstance(source, h5py.Dataset):
+                    raise ValueError(f"{prefix}: Source {filename}:{path} is a {type(source).__name__}, not a dataset")
+                if dtype is not None and source.dtype != dtype:
+                    raise ValueError(f"{prefix}: Source {filename}:{path} data type {source.dtype} "
+                                     f"does not match model data type {dtype}")
+                shapes.append(source.shape)
+
+        shape = (sum(source_shape[0] for source_shape in shapes if source_shape),) + shapes[0][1:]
+        for ((filename, path), source_shape) in zip(self._sources, shapes):
+            if len(source_shape) != len(shape) or source_shape[1:] != shape[1:]:
+                raise ValueError(f"{prefix}: Source {filename}:{path} shape {source_shape} "
+                                 f"does not stack with the frames {shape[1:]} of the other sources")
+        if any(dim not in (-1, stacked) for (dim, stacked) in zip(self._h5config.shape, shape)):
+            raise ValueError(f"{prefix}: Model shape {self._h5config.shape} does not match stacked shape {shape}")
+
+        layout = h5py.VirtualLayout(shape=shape, dtype=self._h5config._h5dtype())
+        start = 0
+        for ((filename, path), source_shape) in zip(self._sources, shapes):
+            layout[start:start + source_shape[0]] = h5py.VirtualSource(filename, path, shape=source_shape)
+            start += source_shape[0]
+
+        if str(prefix) in h5file:
+            del h5file[str(prefix)]
+        self._dset = h5file.create_virtual_dataset(str(prefix), layout)
+        self._modified = True
+        self._length = shape[0]
+        return self._dset
+
+    @classmethod
+    def _check_dataset(cls, dset: h5py.Dataset, prefix: PurePosixPath,
+                       config: Optional[H5DatasetConfig] = None) -> list[H5Mismatch]:
+        mismatches = super()._check_dataset(dset, prefix, config)
+        if not dset.is_virtual:
+            mismatches.append(H5Mismatch(str(prefix), "layout",
+                                         f"{prefix}: Model {cls.__name__} is a virtual dataset, H5 data is not"))
+        return mismatches
+
+
 class H5Group(_H5Base):
     """A :class:`pydantic.BaseModel` representing a :class:`h5py.Group`.
 
@@ -275,12 +997,50 @@ class H5Group(_H5Base):
     """
 
     _h5file: h5py.File = PrivateAttr()
+    # The file the model was loaded from or last dumped to, see _source_path.
+    _h5source: Optional[str] = PrivateAttr(default=None)
+    _h5lazy: dict[str, tuple] = PrivateAttr(default_factory=dict)
+    _h5columns: dict[str, tuple[list, dict[str, numpy.ndarray]]] = PrivateAttr(default_factory=dict)
+    _h5list_layout: ClassVar[Literal["groups", "table", "columns"]] = "groups"
+
+    # Union members are kept as their own class by pydantic's default smart union mode,
+    # rather than coerced to the first that validates.
+    model_config = ConfigDict(validate_assignment=True)
+
+    @classmethod
+    def __init_subclass__(cls, list_layout: Optional[Literal["groups", "table", "columns"]] = None, **kwargs):
+        """
+        Args:
+            list_layout: How a list of this group is stored. "groups" (the default) is
+                         one HDF5 group per element, "table" is one compound dataset
+                         and "columns" is one dataset per field. The table layouts
+                         are only possible for groups of scalar attributes.
+        """
+        super().__init_subclass__(**kwargs)
+        if list_layout is None:
+            return
+
+        if list_layout not in ("groups", "table", "columns"):
+            raise ValueError(f"Unknown list_layout '{list_layout}', must be one of 'groups', 'table' or 'columns'")
+
+        cls._h5list_layout = list_layout
 
-    class Config:
-        validate_assignment = True
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs):
+        super().__pydantic_init_subclass__(**kwargs)
+        list_layout = cls.__dict__.get("_h5list_layout", "groups")
+        if list_layout != "groups":
+            for key, field in cls.model_fields.items():
+                (outer, inner, optional) = _field_types(field)
+                if (get_origin(outer) is not None or optional
+                        or (isinstance(inner, type) and issubclass(inner, (_H5Base, Enum)))
+                        or _pytype_to_numpy(inner) is None):
+                    raise TypeError(f"list_layout='{list_layout}' needs non-optional scalar attributes, "
+                                    f"'{key}' is {outer}")
 
     @classmethod
-    def load(cls, filename: Path) -> Self:
+    def load(cls, filename: Union[Path, BinaryIO, _Buffer], lazy: bool = False, swmr: bool = False,
+             mmap: bool = False, mode: Literal["r", "r+"] = "r") -> Self:
         """Load a file into a tree of H5Group models.
 
         Can be used as context manager, which allows dataset access in
@@ -288,18 +1048,308 @@ class H5Group(_H5Base):
         ``filename`` at the end of the context block.
 
         Args:
-            filename: Path of HDF5 to load.
+            filename: Path of HDF5 to load, a binary file-like object, or the
+                      bytes of an HDF5 file (such as from :meth:`dumps`), which
+                      are read in place, without copying them, so only with mode "r".
+            lazy: If True, child groups, datasets and list elements are only
+                  loaded and validated when first accessed, which must be
+                  before the file is closed.
+            swmr: If True, open the file as a single-writer/multiple-reader reader,
+                  to follow a file that is still being written by :meth:`dumper`.
+                  New data is picked up with :meth:`H5Dataset.refresh` and
+                  :meth:`H5Dataset.new_frames`.
+            mmap: If True, datasets are read through read-only memory maps of the
+                  file where possible, see :meth:`H5Dataset.as_memmap`, so reads
+                  return views rather than copies.
+            mode: "r+" opens the file for writing, so dataset assignments are
+                  written straight to the file, and the fields assigned since
+                  loading can be written with :meth:`save`.
 
         Returns:
             The parsed H5Group model.
 
         """
-        h5file = h5py.File(filename, "r")
+        source: Union[Path, BinaryIO, _BufferFile]
+        if isinstance(filename, (bytes, bytearray, memoryview)):
+            if mode != "r":
+                raise ValueError(f"Bytes are loaded read-only, mode must be 'r', not '{mode}'")
+            source = _BufferFile(filename)
+        else:
+            source = filename
+        h5file = h5py.File(source, mode, swmr=swmr)
         # TODO actually build up the list of unparsed keys
-        group = cls._load(h5file, PurePosixPath("/"))
+        try:
+            group = cls._load(h5file, PurePosixPath("/"), lazy, mmap)
+        except BaseException:
+            h5file.close()
+            raise
         group._h5file = h5file
+        group._h5source = _source_path(source)
         return group
 
+    @classmethod
+    def load_many(cls, paths: Iterable[Path], workers: Optional[int] = None,
+                  executor: Optional[Executor] = None) -> Iterator[H5LoadResult]:
+        """Load many files in parallel, across a process pool.
+
+        Each file is loaded and closed in a worker process, and the model sent
+        back, so the model class must be importable by the workers (defined at
+        the top level of a module). Use :meth:`reopen` to read the datasets of
+        a model. A file that fails to load doesn't stop the others.
+
+        Args:
+            paths: The files to load.
+            workers: The number of worker processes, the default is the
+                     :class:`concurrent.futures.ProcessPoolExecutor` default.
+            executor: An executor to load files with instead.
+
+        Returns:
+            An :class:`h5pydantic.H5LoadResult` for each file, in the order they finish loading.
+        """
+        return _load_many(cls, paths, workers, executor)
+
+    def _detach(self) -> Self:
+        """Drop all the HDF5 handles of the tree, so it can be pickled."""
+        for (_, node) in self._walk(PurePosixPath("/")):
+            if isinstance(node, H5Dataset):
+                node._dset = None
+                node._mmap = None
+        for (_, _, elements) in self._stacks():
+            for elem in elements:
+                elem._dset = None
+        self._h5file = None
+        return self
+
+    def _stacks(self) -> Iterator[tuple[PurePosixPath, _StackPlan, list[H5Dataset]]]:
+        """The loaded stacked list fields of the tree, with their paths in the file."""
+        for (prefix, node) in self._walk(PurePosixPath("/")):
+            for plan in node._h5plan():
+                value = node.__dict__.get(plan.key)
+                if isinstance(plan, _StackPlan) and value:
+                    yield (prefix / plan.alias, plan, value)
+
+    def reopen(self, filename: Path, swmr: bool = False, mmap: bool = False) -> Self:
+        """Reopen the file of a closed model, such as one from :meth:`load_many`, for dataset access.
+
+        The datasets are checked against their models again. Like :meth:`load`,
+        this can be used as a context manager.
+
+        Args:
+            filename: Path of the HDF5 file the model was loaded from.
+            swmr: See :meth:`load`.
+            mmap: See :meth:`load`.
+
+        Returns:
+            The model itself.
+        """
+        h5file = h5py.File(filename, "r", swmr=swmr)
+        try:
+            for (prefix, node) in self._walk(PurePosixPath("/")):
+                if isinstance(node, H5Dataset):
+                    d = node._load_intrinsic(h5file, prefix, mmap=mmap)
+                    node._dset = d["_dset"]
+                    node._mmap = d.get("_mmap")
+            for (path, plan, elements) in self._stacks():
+                dset = plan.open(h5file, path)
+                for elem in elements:
+                    elem._dset = dset
+        except BaseException:
+            h5file.close()
+            raise
+        self._h5file = h5file
+        self._h5source = _source_path(filename)
+        return self
+
+    @classmethod
+    def validate_file(cls, filename: Path) -> list[H5Mismatch]:
+        """Check that a file matches this model, without loading it.
+
+        The structure, attributes, dataset shapes, data types and storage
+        layouts and enum values are checked against the class, but no models
+        are built and no pydantic validation is run, which is much faster than
+        :meth:`load` when only conformance matters.
+
+        Args:
+            filename: Path of HDF5 file to check.
+
+        Returns:
+            Every mismatch found, empty if the file matches.
+        """
+        with h5py.File(filename, "r") as h5file:
+            mismatches: list[H5Mismatch] = []
+            cls._validate(h5file["/"], PurePosixPath("/"), mismatches)
+            return mismatches
+
+    @classmethod
+    def _validate_intrinsic(cls, node, prefix: PurePosixPath, mismatches: list[H5Mismatch]):
+        if not isinstance(node, h5py.Group):
+            mismatches.append(H5Mismatch(str(prefix), "node", f"{prefix}: Model {cls.__name__} is a group, "
+                                                              f"H5 object is {type(node).__name__}"))
+
+    @classmethod
+    async def aload(cls, filename: Path, lazy: bool = False, swmr: bool = False, mmap: bool = False) -> Self:
+        """Load a file without blocking the event loop, see :meth:`load`.
+
+        The load runs on the I/O executor of :mod:`h5pydantic.aio`, after any
+        other call on the same file. Lazy models still load on first access, which blocks.
+        """
+        return await aio._run(filename, cls.load, filename, lazy, swmr, mmap)
+
+    @classmethod
+    @instrument._traced("load")
+    def _load(cls, h5file: h5py.File, prefix: PurePosixPath, lazy: bool = False, mmap: bool = False) -> Self:
+        if not lazy:
+            d = cls._load_intrinsic(h5file, prefix, mmap)
+            d.update(cls._load_children(h5file, prefix, mmap=mmap))
+            group = instrument._construct(cls, d)
+            group._h5dirty = set()
+            return group._h5keep_columns(d)
+
+        # Attributes are loaded and validated now, children are deferred until __getattr__.
+        container = instrument._open(h5file, str(prefix))
+        values: dict[str, Any] = {}
+        deferred = {}
+        for plan in cls._h5plan():
+            if (isinstance(plan, (_NodePlan, _NodeListPlan, _TablePlan, _StackPlan, _UnionPlan))
+                    and (plan.required or plan.alias in container)):
+                deferred[plan.key] = (plan, h5file, container, prefix, mmap)
+                continue
+            values[plan.key] = plan.load(h5file, container, prefix, mmap=mmap)
+
+        # Validate the attributes one field at a time, as the deferred fields aren't there yet.
+        errors: list[InitErrorDetails] = []
+        with instrument._validating():
+            group = cls.model_construct()
+            for key in deferred:
+                group.__dict__.pop(key, None)
+            for key, value in values.items():
+                try:
+                    cls.__pydantic_validator__.validate_assignment(group, key, value)
+                except ValidationError as e:
+                    for error in e.errors():
+                        details = InitErrorDetails(type=error["type"], loc=error["loc"], input=error["input"])
+                        if "ctx" in error:
+                            details["ctx"] = error["ctx"]
+                        errors.append(details)
+        if errors:
+            raise ValidationError.from_exception_data(cls.__name__, errors)
+
+        group._h5lazy = deferred
+        group._h5dirty = set()
+        return group._h5keep_columns({cls.model_fields[key].alias or key: value for key, value in values.items()})
+
+    def _h5keep_columns(self, loaded: dict[str, Any]) -> Self:
+        """Keep the columns of table layout lists, as they were loaded."""
+        for plan in self._h5plan():
+            value = loaded.get(plan.alias)
+            if isinstance(value, _TableList):
+                self._h5columns[plan.key] = (self.__dict__[plan.key], value.columns)
+        return self
+
+    def columns(self, key: str) -> dict[str, numpy.ndarray]:
+        """The columns of a list field stored with the "table" or "columns" ``list_layout``.
+
+        Args:
+            key: The name of the list field.
+
+        Returns:
+            A numpy array for each field of the list elements. If the list was loaded
+            and hasn't been replaced or resized, these are the arrays read from the file.
+        """
+        plan = next((plan for plan in self._h5plan() if plan.key == key), None)
+        if not isinstance(plan, _TablePlan):
+            raise ValueError(f"'{key}' is not a list stored as a table")
+
+        value = getattr(self, key)
+        if key in self._h5columns:
+            loaded, columns = self._h5columns[key]
+            if loaded is value and all(len(column) == len(value) for column in columns.values()):
+                return columns
+        return plan.to_columns(value)
+
+    def stacked(self, key: str) -> Union[h5py.Dataset, numpy.ndarray]:
+        """A list field stored with ``list_layout="stack"``, as one array.
+
+        Args:
+            key: The name of the list field.
+
+        Returns:
+            If the elements are the views of a stacked dataset in the file, in order,
+            that :class:`h5py.Dataset`, so a slice across elements is read in one
+            call. Otherwise, the elements' data stacked into a numpy array.
+        """
+        plan = next((plan for plan in self._h5plan() if plan.key == key), None)
+        if not isinstance(plan, _StackPlan):
+            raise ValueError(f"'{key}' is not a list stored as a stack")
+
+        value = getattr(self, key)
+        dset = value[0]._dset if value else None
+        if (dset is not None and dset.shape[0] == len(value)
+                and all(elem._dset is dset and elem._index == i for (i, elem) in enumerate(value))):
+            return dset
+        config = plan.type_._h5config
+        if not value:
+            return numpy.empty((0,) + config.shape, dtype=config._numpy_dtype())
+        return numpy.stack([elem[()] for elem in value])
+
+    def __getattr__(self, name: str):
+        # Only called for names not found normally, i.e. private attributes, which pydantic
+        # looks up itself, and deferred fields of a lazy load.
+        if name.startswith("_"):
+            private = object.__getattribute__(self, "__pydantic_private__")
+            if private is None or name not in private:
+                raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+            return private[name]
+        if name not in self._h5lazy:
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+
+        plan, h5file, container, prefix, mmap = self._h5lazy.pop(name)
+        value = plan.load(h5file, container, prefix, lazy=True, mmap=mmap)
+        self.__dict__[name] = value
+        self._h5keep_columns({plan.alias: value})
+        return value
+
+    def __copy__(self) -> Self:
+        copied = super().__copy__()
+        # Loading a deferred field removes it, from the copy only.
+        copied._h5lazy = dict(self._h5lazy)
+        return copied
+
+    def model_copy(self, *, update: Optional[Mapping[str, Any]] = None, deep: bool = False) -> Self:
+        copied = super().model_copy(update=update, deep=deep)
+        for key in update or ():
+            copied._h5lazy.pop(key, None)
+        return copied
+
+    def _load_deferred(self):
+        """Load all the deferred fields of a lazy load."""
+        for name in list(self._h5lazy):
+            getattr(self, name)
+
+    def _load_all(self):
+        """Load all the deferred fields of a lazy load, in the whole tree."""
+        self._load_deferred()
+        for value in self.__dict__.values():
+            for elem in (value if isinstance(value, list) else [value]):
+                if isinstance(elem, H5Group):
+                    elem._load_all()
+
+    def model_dump(self, **kwargs) -> dict[str, Any]:
+        self._load_all()
+        return super().model_dump(**kwargs)
+
+    def model_dump_json(self, **kwargs) -> str:
+        self._load_all()
+        return super().model_dump_json(**kwargs)
+
+    def __iter__(self):
+        self._load_deferred()
+        return super().__iter__()
+
+    def __repr_args__(self):
+        self._load_deferred()
+        return super().__repr_args__()
+
     def close(self):
         """Close the underlying HDF5 file.
         """
@@ -312,18 +1362,30 @@ class H5Group(_H5Base):
         self.close()
 
     def _dump_container(self, h5file: h5py.File, prefix: PurePosixPath) -> h5py.Group:
-        return h5file.require_group(str(prefix))
-
-    def _datasets(self, parent: str):
-        for key, field in self.__fields__.items():
+        name = str(prefix)
+        if name in h5file:
+            return h5file.require_group(name)
+        return h5file.create_group(name, track_order=_track_order(h5file))
+
+    def _datasets(self, parent: str) -> Iterator[tuple[str, H5Dataset]]:
+        """All the datasets of the tree, including list elements, named by their field path."""
+        for key in type(self).model_fields:
+            if key in self._h5lazy:
+                # Deferred fields of a lazy load are in the file already.
+                continue
             value = getattr(self, key)
+            name = parent + '.' + key
 
-            # FIXME list of datasets
+            if isinstance(value, list):
+                elements = [(f"{name}[{i}]", elem) for (i, elem) in enumerate(value)]
+            else:
+                elements = [(name, value)]
 
-            if isinstance(value, H5Dataset):
-                yield (parent + '.' + key, getattr(self, key))
-            elif isinstance(value, H5Group):
-                yield from getattr(self, key)._datasets(parent + '.' + key)
+            for (elem_name, elem) in elements:
+                if isinstance(elem, H5Dataset):
+                    yield (elem_name, elem)
+                elif isinstance(elem, H5Group):
+                    yield from elem._datasets(elem_name)
 
     def _check_all_modified(self):
         unset = []
@@ -334,43 +1396,149 @@ class H5Group(_H5Base):
         if unset:
             raise H5PartialDump(unset)
 
-    def dump(self, filename: Path, partial=False):
+    @staticmethod
+    def _dump_file(filename: Optional[Union[Path, BinaryIO]], track_order: bool, swmr: bool = False,
+                   mode: Literal["w", "a"] = "w") -> h5py.File:
+        # The 1.8 file format allows dense attribute storage, without it every
+        # attribute written to a node gets slower as the node's attribute count grows.
+        # SWMR needs the 1.10 file format.
+        libver = ("v110" if swmr else "v108", "latest")
+        if filename is None:
+            return h5py.File.in_memory(libver=libver, track_order=track_order)
+        return h5py.File(filename, mode, libver=libver, track_order=track_order)
+
+    def dump(self, filename: Union[Path, BinaryIO], partial=False, commit_enums=False, track_order=False,
+             mode: Literal["w", "a"] = "w"):
         """Dump the H5Group object tree into a file.
 
         Args:
-            filename: Path to dump the HDF5Group object tree to.
+            filename: Path to dump the HDF5Group object tree to, or a binary file-like object.
             partial: If False, will raise an error if any H5Dataset is not written to.
+            commit_enums: If True, each Enum type is stored once in the file as a committed
+                          datatype, which is shared by all the attributes of that type.
+            track_order: If True, the creation order of groups, datasets and attributes
+                         is tracked, and they are listed in that order when read back.
+            mode: "w" replaces the file. "a" updates the file the model was loaded from
+                  or last dumped to in place, writing only the fields assigned since
+                  then, and the groups and datasets that aren't in the file yet.
+                  Any other file is opened for appending and the whole tree written to it.
 
         Returns: None
         """
-        with h5py.File(filename, "w") as h5file:
+        if mode not in ("w", "a"):
+            raise ValueError(f"Unknown mode '{mode}', must be one of 'w' or 'a'")
+
+        source = _source_path(filename)
+        with self._dump_file(filename, track_order, mode=mode) as h5file:
+            if commit_enums:
+                _h5enum_commit(h5file)
+            if mode == "a" and source is not None and source == self._h5source:
+                self._save(h5file, PurePosixPath("/"))
+            else:
+                self._dump(h5file, PurePosixPath("/"))
+        self._h5clean()
+        self._h5source = source
+
+        if not partial:
+            self._check_all_modified()
+
+    def save(self):
+        """Write the fields assigned since the model was loaded, to the file it was loaded from.
+
+        Only the changed attributes, and the groups and datasets assigned, are
+        written. Dataset assignments are written to the file as they are made.
+        The model must have been loaded with ``mode="r+"``.
+
+        Groups and datasets that are assigned replace the old ones in the file,
+        and are written as :meth:`dump` would. Loaded datasets among them are
+        copied from where they were loaded from.
+        Changes inside lists, rather than assignments of whole lists, aren't tracked.
+        """
+        h5file = getattr(self, "_h5file", None)
+        if h5file is None or not h5file.id.valid or h5file.mode != "r+":
+            raise ValueError(f"{self.__class__.__name__}: save() needs a model loaded with mode='r+'")
+
+        self._save(h5file, PurePosixPath("/"))
+        h5file.flush()
+        self._h5clean()
+
+    def dumps(self, partial=False, commit_enums=False, track_order=False) -> bytes:
+        """Dump the H5Group object tree to the bytes of an HDF5 file, without touching the file system.
+
+        The file is built in memory with h5py's core driver, and copied out once.
+
+        Args:
+            See :meth:`dump`.
+
+        Returns:
+            The HDF5 file image, which :meth:`load` can load.
+        """
+        with self._dump_file(None, track_order) as h5file:
+            if commit_enums:
+                _h5enum_commit(h5file)
             self._dump(h5file, PurePosixPath("/"))
+            h5file.flush()
+            image = h5file.id.get_file_image()
+        self._h5clean()
+        self._h5source = None
 
         if not partial:
             self._check_all_modified()
+        return image
+
+    async def adump(self, filename: Path, partial=False, commit_enums=False, track_order=False):
+        """Dump without blocking the event loop, see :meth:`dump`.
+
+        The dump runs on the I/O executor of :mod:`h5pydantic.aio`, after any other call on the same file.
+        """
+        await aio._run(filename, self.dump, filename, partial, commit_enums, track_order)
 
     @contextmanager
-    def dumper(self, filename: Path, partial=False):
+    def dumper(self, filename: Path, partial=False, commit_enums=False, track_order=False, swmr=False):
         """Context manager to dump the H5Group object tree into a file.
 
         Inside the context manager, Datasets can be assigned to, which will write
-        that data to the file.
+        that data to the file. Datasets with an unlimited (-1) first dimension
+        can be grown with :meth:`H5Dataset.append` and :meth:`H5Dataset.extend`.
 
         At the cleanup stage, if partial is False, this context manager will ensure all Datasets have been written to.
 
         Args:
             filename: Path to dump the HDF5Group object tree to.
             partial: If False, will raise an error if any H5Dataset is not written to.
+            commit_enums: See :meth:`dump`.
+            track_order: See :meth:`dump`.
+            swmr: If True, switch the file to single-writer/multiple-reader mode once
+                  the whole tree has been created, so it can be followed with
+                  :meth:`load` ``(swmr=True)`` while it is written. Every dataset write
+                  is flushed to the file. SWMR readers don't see new objects, so the
+                  whole tree is created before the body of the context manager.
 
         Returns: None
         """
-        with h5py.File(filename, "w") as h5file:
+        with self._dump_file(filename, track_order, swmr) as h5file:
+            if commit_enums:
+                _h5enum_commit(h5file)
             self._h5file = h5file
             self._dump(h5file, PurePosixPath("/"))
-
-            yield self
-
-            self.close()
+            self._h5clean()
+            self._h5source = _source_path(filename)
+
+            datasets = [dataset for (_, dataset) in self._datasets(self.__class__.__name__)]
+            for dataset in datasets:
+                dataset._dumping = True
+            if swmr:
+                h5file.swmr_mode = True
+                for dataset in datasets:
+                    dataset._swmr = True
+
+            try:
+                yield self
+            finally:
+                for dataset in datasets:
+                    dataset._dumping = dataset._swmr = False
+                    dataset._trim()
+                self.close()
 
         if not partial:
             self._check_all_modified()
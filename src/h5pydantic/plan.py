@@ -0,0 +1,560 @@
+from abc import ABC, abstractmethod
+from pathlib import PurePosixPath
+
+import h5py
+
+import numpy
+
+from pydantic.fields import FieldInfo
+
+import types
+
+from typing import get_args, get_origin
+from typing import Annotated, Any, Literal, NamedTuple, Optional, Union
+
+from . import instrument
+from .attrs import _write_attrs
+from .enum import _h5enum_dump, _h5enum_load
+from .exceptions import H5Mismatch
+from .lazy import _LazyList, _UNLOADED
+from .types import _pytype_to_h5type, _pytype_to_numpy
+
+import logging
+
+logger = logging.getLogger('h5pydantic_logger')
+
+
+
+class _FieldTypes(NamedTuple):
+    """The types of a field, as h5pydantic sees them."""
+
+    outer: Any
+    """The annotation without Optional and Annotated, such as list[int]."""
+
+    inner: Any
+    """The element type of lists, otherwise the same as outer."""
+
+    optional: bool
+    """Whether the annotation allows None."""
+
+
+def _strip_annotated(annotation: Any) -> Any:
+    while get_origin(annotation) is Annotated:
+        annotation = get_args(annotation)[0]
+    return annotation
+
+
+def _field_types(field: FieldInfo) -> _FieldTypes:
+    """Split a field annotation into its outer and element types, and whether it is Optional."""
+    annotation = _strip_annotated(field.annotation)
+    optional = False
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = get_args(annotation)
+        members = tuple(_strip_annotated(arg) for arg in args if arg is not type(None))
+        optional = len(members) < len(args)
+        annotation = members[0] if len(members) == 1 else Union[members]
+
+    inner = annotation
+    if get_origin(annotation) is list:
+        inner = _strip_annotated(get_args(annotation)[0]) if get_args(annotation) else Any
+    return _FieldTypes(annotation, inner, optional)
+
+
+class _FieldPlan(ABC):
+    """How to load and dump one field of a model, decided once per class.
+
+    The classification of a field (attribute, enum, subgroup, list or
+    union) only depends on the class, so it is done once, and load/dump
+    just run the resulting handlers.
+    """
+
+    __slots__ = ("key", "alias", "type_", "required", "field")
+
+    # Whether dump goes through attr(), to be written in a batch with the node's other attributes.
+    batched = False
+
+    def __init__(self, key: str, field: FieldInfo):
+        self.key = key
+        self.alias = field.alias or key
+        self.type_ = _field_types(field).inner
+        self.required = field.is_required()
+        self.field = field
+
+    @abstractmethod
+    def load(self, h5file: h5py.File, container, prefix: PurePosixPath, lazy: bool = False,
+             mmap: bool = False) -> Any:
+        """Load the field from container.
+
+        If mmap, datasets are read through memory maps where possible. Nodes
+        below are loaded the same way.
+        """
+
+    @abstractmethod
+    def dump(self, value: Any, container, h5file: h5py.File, prefix: PurePosixPath):
+        """Dump the field to container."""
+
+    def attr(self, value: Any) -> tuple[bytes, h5py.h5t.TypeID, numpy.dtype, Any]:
+        """The attribute to write, for batched plans, see :func:`_write_attrs`."""
+        raise NotImplementedError(f"{self.key}: Only batched fields are written as attributes")
+
+    @abstractmethod
+    def validate(self, container, prefix: PurePosixPath, mismatches: list[H5Mismatch]):
+        """Add the ways the file doesn't match this field to mismatches, without loading it.
+
+        Only the objects the field is stored in are opened.
+        """
+
+    def _attribute(self, container, prefix: PurePosixPath, mismatches: list[H5Mismatch]):
+        """The opened attribute of the field, None if it isn't there."""
+        try:
+            return h5py.h5a.open(container.id, self.alias.encode())
+        except KeyError:
+            if self.required:
+                mismatches.append(H5Mismatch(f"{prefix}@{self.alias}", "missing",
+                                             f"{prefix}: Attribute {self.alias} not found"))
+            return None
+
+    def _node(self, container, prefix: PurePosixPath, mismatches: list[H5Mismatch]):
+        """The group or dataset of the field, None if it isn't there."""
+        node = container.get(self.alias) if isinstance(container, h5py.Group) else None
+        if node is None and self.required:
+            path = prefix / self.alias
+            mismatches.append(H5Mismatch(str(path), "missing", f"{path}: Field {self.key} not found"))
+        return node
+
+
+def _read_attribute(container, name: str) -> Any:
+    """Read an attribute through the low level API, skipping the AttributeManager."""
+    attr = h5py.h5a.open(container.id, name.encode())
+    value = numpy.empty(attr.shape, dtype=attr.dtype)
+    attr.read(value)
+    value = value[()]
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _dtype_matches(expected: Optional[numpy.dtype], actual: numpy.dtype) -> bool:
+    """Whether data stored as actual can be loaded as expected, strings of any encoding load as str."""
+    if expected is None:
+        return True
+    if h5py.check_string_dtype(expected):
+        return h5py.check_string_dtype(actual) is not None
+    return actual == expected
+
+
+class _AttributePlan(_FieldPlan):
+    """A scalar stored as an HDF5 attribute."""
+
+    __slots__ = ("name", "dtype", "h5type", "literals")
+
+    batched = True
+
+    def __init__(self, key: str, field: FieldInfo):
+        super().__init__(key, field)
+        self.name = key.encode()
+        self.dtype = _pytype_to_numpy(self.type_)
+        self.h5type = None if self.dtype is None else h5py.h5t.py_create(self.dtype, logical=True)
+        self.literals = get_args(self.type_) if get_origin(self.type_) is Literal else None
+
+    def load(self, h5file, container, prefix, lazy=False, mmap=False):
+        attrs = container.attrs
+        if not self.required and self.alias not in attrs:
+            logger.info("Optional attribute %s from path %s not present in this file", self.key, prefix)
+            return None
+        if instrument._active is not None:
+            instrument._active._attributes_read()
+        value = attrs[self.alias]
+        # As Python scalars, pydantic validates numpy integers through float, losing precision beyond 2**53.
+        return value.item() if isinstance(value, numpy.generic) else value
+
+    def attr(self, value) -> tuple[bytes, h5py.h5t.TypeID, numpy.dtype, Any]:
+        """The attribute to write, see :func:`_write_attrs`."""
+        if self.h5type is None or self.dtype is None:
+            # Raises the unknown type error.
+            _pytype_to_h5type(self.type_)
+            raise ValueError(f"{self.key}: {self.type_} has no numpy type to store it as an attribute")
+        return (self.name, self.h5type, self.dtype, value)
+
+    def dump(self, value, container, h5file, prefix):
+        _write_attrs(container, [self.attr(value)])
+
+    def validate(self, container, prefix, mismatches):
+        attr = self._attribute(container, prefix, mismatches)
+        if attr is None:
+            return
+
+        # Comparing the HDF5 types is much cheaper than converting them to numpy dtypes,
+        # which is only done when they differ, such as strings of another encoding.
+        if self.h5type is None or not self.h5type.equal(attr.get_type()):
+            dtype = attr.dtype
+            if not _dtype_matches(self.dtype, dtype):
+                mismatches.append(H5Mismatch(f"{prefix}@{self.alias}", "dtype",
+                                             f"{prefix}: Attribute {self.alias} data type {dtype} "
+                                             f"does not match model data type {self.dtype}"))
+                return
+
+        if self.literals is not None:
+            value = _read_attribute(container, self.alias)
+            if value not in self.literals:
+                mismatches.append(H5Mismatch(f"{prefix}@{self.alias}", "value",
+                                             f"{prefix}: Attribute {self.alias} value {value!r} "
+                                             f"is not one of {self.literals}"))
+
+
+class _AttributeListPlan(_FieldPlan):
+    """A list of scalars stored as a single array HDF5 attribute."""
+
+    def load(self, h5file, container, prefix, lazy=False, mmap=False):
+        attrs = container.attrs
+        if not self.required and self.alias not in attrs:
+            logger.info("Optional field %s not present in this file", self.key)
+            return None
+        if instrument._active is not None:
+            instrument._active._attributes_read()
+        return attrs[self.alias].tolist()
+
+    def dump(self, value, container, h5file, prefix):
+        if instrument._active is not None:
+            instrument._active._attributes_written()
+        container.attrs.create(self.key, value)
+
+    def validate(self, container, prefix, mismatches):
+        self._attribute(container, prefix, mismatches)
+
+
+class _EnumPlan(_FieldPlan):
+    """An enum member stored as an HDF5 enum attribute."""
+
+    def load(self, h5file, container, prefix, lazy=False, mmap=False):
+        if instrument._active is not None:
+            instrument._active._attributes_read()
+        return _h5enum_load(container, self.alias, self.type_)
+
+    def dump(self, value, container, h5file, prefix):
+        if instrument._active is not None:
+            instrument._active._attributes_written()
+        _h5enum_dump(h5file, container, self.key, value.value, self.type_)
+
+    def validate(self, container, prefix, mismatches):
+        if self._attribute(container, prefix, mismatches) is None:
+            return
+
+        value = _read_attribute(container, self.alias)
+        if value not in self.type_._value2member_map_:
+            mismatches.append(H5Mismatch(f"{prefix}@{self.alias}", "value",
+                                         f"{prefix}: Attribute {self.alias} value {value} "
+                                         f"is not a member of {self.type_.__name__}"))
+
+
+class _NodePlan(_FieldPlan):
+    """A child H5Group or H5Dataset."""
+
+    def load(self, h5file, container, prefix, lazy=False, mmap=False):
+        if not self.required and self.alias not in container:
+            logger.info("Optional field %s not present in this file", self.key)
+            return None
+        return self.type_._load(h5file, prefix / self.alias, lazy, mmap)
+
+    def dump(self, value, container, h5file, prefix):
+        value._dump(h5file, prefix / self.key)
+
+    def validate(self, container, prefix, mismatches):
+        node = self._node(container, prefix, mismatches)
+        if node is not None:
+            self.type_._validate(node, prefix / self.alias, mismatches)
+
+
+class _NodeListPlan(_FieldPlan):
+    """A list of H5Groups or H5Datasets, stored as a group indexed by number."""
+
+    def load(self, h5file, container, prefix, lazy=False, mmap=False):
+        path = prefix / self.alias
+        if not self.required and self.alias not in container:
+            logger.info("Optional field %s not present in this file", self.key)
+            return None
+
+        group = instrument._open(h5file, str(path))
+        if lazy:
+            return _LazyList([_UNLOADED] * len(group),
+                             lambda i: self.type_._load(h5file, path / str(i), lazy, mmap))
+
+        indexes = sorted(int(i) for i in group.keys())
+        # FIXME This doesn't check a lot of cases.
+        return [self.type_._load(h5file, path / str(i), mmap=mmap) for i in indexes]
+
+    def dump(self, value, container, h5file, prefix):
+        for i, elem in enumerate(value):
+            elem._dump(h5file, prefix / self.key / str(i))
+
+    def validate(self, container, prefix, mismatches):
+        group = self._node(container, prefix, mismatches)
+        if group is None:
+            return
+
+        path = prefix / self.alias
+        if not isinstance(group, h5py.Group):
+            mismatches.append(H5Mismatch(str(path), "node", f"{path}: List {self.key} is a "
+                                                            f"{type(group).__name__}, not a group"))
+            return
+
+        names = set(group)
+        if names != {str(i) for i in range(len(names))}:
+            mismatches.append(H5Mismatch(str(path), "node", f"{path}: List {self.key} elements are not "
+                                                            f"numbered 0 to {len(names) - 1}: {sorted(names)}"))
+        for name in names:
+            if name.isdigit():
+                self.type_._validate(group[name], path / name, mismatches)
+
+
+class _TableList(list):
+    """The elements of a table layout list, along with the columns they were loaded from."""
+
+    def __init__(self, iterable, columns: dict[str, numpy.ndarray]):
+        super().__init__(iterable)
+        self.columns = columns
+
+
+def _string_column(column: numpy.ndarray) -> numpy.ndarray:
+    """Decode a column of variable length strings, which h5py reads as bytes."""
+    return numpy.array([value.decode() if isinstance(value, bytes) else value for value in column], dtype=object)
+
+
+class _TablePlan(_FieldPlan):
+    """A list of scalar-only H5Groups, stored as one compound dataset, or a group of one dataset per column.
+
+    Columns are named by the field aliases of the element class.
+    """
+
+    __slots__ = ("layout", "columns", "dtype")
+
+    def __init__(self, key: str, field: FieldInfo):
+        super().__init__(key, field)
+        self.layout = self.type_._h5list_layout
+        self.columns = tuple((name, elem_field.alias or name, _pytype_to_numpy(_field_types(elem_field).inner))
+                             for name, elem_field in self.type_.model_fields.items())
+        self.dtype = numpy.dtype([(alias, dtype) for (_, alias, dtype) in self.columns])
+
+    def load(self, h5file, container, prefix, lazy=False, mmap=False):
+        if not self.required and self.alias not in container:
+            logger.info("Optional field %s not present in this file", self.key)
+            return None
+
+        node = instrument._open(container, self.alias)
+        if self.layout == "table":
+            data = node[()]
+            columns = {alias: data[alias] for (_, alias, _) in self.columns}
+        else:
+            columns = {alias: node[alias][()] for (_, alias, _) in self.columns}
+
+        for (_, alias, dtype) in self.columns:
+            if h5py.check_string_dtype(dtype):
+                columns[alias] = _string_column(columns[alias])
+
+        aliases = [alias for (_, alias, _) in self.columns]
+        rows = zip(*(column.tolist() for column in columns.values()))
+        return _TableList((instrument._construct(self.type_, dict(zip(aliases, row))) for row in rows), columns)
+
+    def to_columns(self, value: list) -> dict[str, numpy.ndarray]:
+        """Convert a list of elements to columns."""
+        return {alias: numpy.array([getattr(elem, name) for elem in value], dtype=dtype)
+                for (name, alias, dtype) in self.columns}
+
+    def dump(self, value, container, h5file, prefix):
+        if self.key in container:
+            del container[self.key]
+
+        columns = self.to_columns(value)
+        if self.layout == "table":
+            data = numpy.empty(len(value), dtype=self.dtype)
+            for alias, column in columns.items():
+                data[alias] = column
+            container.create_dataset(self.key, data=data)
+        else:
+            group = container.create_group(self.key)
+            for alias, column in columns.items():
+                group.create_dataset(alias, data=column)
+
+    def validate(self, container, prefix, mismatches):
+        node = self._node(container, prefix, mismatches)
+        if node is None:
+            return
+
+        path = prefix / self.alias
+        kind = h5py.Dataset if self.layout == "table" else h5py.Group
+        if not isinstance(node, kind):
+            mismatches.append(H5Mismatch(str(path), "node", f"{path}: {self.layout} layout list {self.key} is a "
+                                                            f"{type(node).__name__}, not a {kind.__name__}"))
+            return
+
+        for (_, alias, dtype) in self.columns:
+            if self.layout == "table":
+                fields = node.dtype.fields or {}
+                found = fields[alias][0] if alias in fields else None
+            else:
+                column = node.get(alias)
+                found = column.dtype if isinstance(column, h5py.Dataset) else None
+            if found is None:
+                mismatches.append(H5Mismatch(str(path), "missing", f"{path}: Column {alias} not found"))
+            elif not _dtype_matches(dtype, found):
+                mismatches.append(H5Mismatch(str(path), "dtype", f"{path}: Column {alias} data type {found} "
+                                                                 f"does not match model data type {dtype}"))
+
+
+class _StackPlan(_FieldPlan):
+    """A list of H5Datasets stored as one dataset, stacked along a new first dimension.
+
+    The elements are views of the stacked dataset, so loading doesn't read
+    any data, and the metadata doesn't grow with the number of elements.
+    """
+
+    def open(self, h5file: h5py.File, path: PurePosixPath) -> h5py.Dataset:
+        """The stacked dataset at path, raising a ValueError if it doesn't match the element class."""
+        dset = instrument._open(h5file, str(path))
+        if not isinstance(dset, h5py.Dataset):
+            raise ValueError(f"{path}: Stacked list {self.key} is a {type(dset).__name__}, not a dataset")
+        mismatches = self.type_._check_stack(dset, path)
+        if mismatches:
+            raise ValueError(mismatches[0].message)
+        return dset
+
+    def load(self, h5file, container, prefix, lazy=False, mmap=False):
+        if not self.required and self.alias not in container:
+            logger.info("Optional field %s not present in this file", self.key)
+            return None
+        return self.type_._views(self.open(h5file, prefix / self.alias))
+
+    def dump(self, value, container, h5file, prefix):
+        if self.key in container:
+            del container[self.key]
+        self.type_._dump_stack(value, container, self.key)
+
+    def validate(self, container, prefix, mismatches):
+        dset = self._node(container, prefix, mismatches)
+        if dset is None:
+            return
+
+        path = prefix / self.alias
+        if not isinstance(dset, h5py.Dataset):
+            mismatches.append(H5Mismatch(str(path), "node", f"{path}: Stacked list {self.key} is a "
+                                                            f"{type(dset).__name__}, not a dataset"))
+        else:
+            mismatches.extend(self.type_._check_stack(dset, path))
+
+
+class _UnionPlan(_FieldPlan):
+    """A Union of H5Datasets and H5Groups, resolved using only the metadata of the stored node.
+
+    Datasets are dispatched on, in order of preference:
+
+    * a discriminator, a ``Literal`` field common to all dataset candidates, with distinct values,
+      stored as an attribute,
+    * an exact match of shape and dtype,
+    * a match of shape (allowing for -1 dimensions) and dtype.
+
+    Groups resolve to the first group candidate the stored group validates against.
+    """
+
+    __slots__ = ("candidates", "groups", "discriminator", "by_tag", "by_shape", "unlimited")
+
+    def __init__(self, key: str, field: FieldInfo):
+        super().__init__(key, field)
+        self.candidates = tuple(arg for arg in get_args(_field_types(field).outer))
+        # Only datasets have a configuration to dispatch on.
+        datasets = tuple(arg for arg in self.candidates if getattr(arg, "_h5config", None) is not None)
+        self.groups = tuple(arg for arg in self.candidates if arg not in datasets)
+
+        self.discriminator, self.by_tag = self._discriminator(datasets)
+
+        self.by_shape: dict[tuple[int, ...], list] = {}
+        self.unlimited = []
+        for data_model in datasets:
+            shape = data_model._h5config.shape
+            entry = (shape, data_model._h5config._numpy_dtype(), data_model)
+            if -1 in shape:
+                self.unlimited.append(entry)
+            else:
+                self.by_shape.setdefault(shape, []).append(entry)
+
+    @staticmethod
+    def _discriminator(datasets: tuple[Any, ...]) -> tuple[Optional[str], dict[Any, type]]:
+        """Find a Literal field common to all the datasets, with distinct values for each.
+
+        A field with a value shared by two datasets can't tell them apart, so isn't used.
+        """
+        for name in (datasets[0].model_fields if datasets else ()):
+            by_tag: dict[Any, type] = {}
+            for data_model in datasets:
+                candidate = data_model.model_fields.get(name)
+                if candidate is None or get_origin(_field_types(candidate).outer) is not Literal:
+                    break
+                tags = get_args(_field_types(candidate).outer)
+                if any(tag in by_tag for tag in tags):
+                    break
+                by_tag.update((tag, data_model) for tag in tags)
+            else:
+                return name, by_tag
+        return None, {}
+
+    def _resolve(self, dset: h5py.Dataset) -> Optional[type]:
+        if self.discriminator is not None:
+            tag = dset.attrs.get(self.discriminator)
+            if isinstance(tag, bytes):
+                tag = tag.decode()
+            if tag in self.by_tag:
+                return self.by_tag[tag]
+
+        shape, dtype = dset.shape, dset.dtype
+        for model_shape, model_dtype, data_model in self.by_shape.get(shape, ()):
+            if model_dtype is None or model_dtype == dtype:
+                return data_model
+
+        for model_shape, model_dtype, data_model in self.unlimited:
+            if (len(model_shape) == len(shape)
+                    and all(dim in (-1, data_dim) for dim, data_dim in zip(model_shape, shape))
+                    and (model_dtype is None or model_dtype == dtype)):
+                return data_model
+
+        return None
+
+    def _resolve_node(self, node, path: PurePosixPath) -> tuple[Optional[type], str]:
+        """The candidate matching node, or None and why none does."""
+        if isinstance(node, h5py.Dataset):
+            return (self._resolve(node), f"Could not find suitable data model in Union to match "
+                                         f"data shape: {node.shape} and dtype: {node.dtype}")
+        if not self.groups:
+            return (None, f"{path}: Union fields must be datasets, not {type(node).__name__}")
+
+        for data_model in self.groups:
+            mismatches: list[H5Mismatch] = []
+            data_model._validate(node, path, mismatches)
+            if not mismatches:
+                return (data_model, "")
+        return (None, f"{path}: Could not find suitable data model in Union to match group")
+
+    def load(self, h5file, container, prefix, lazy=False, mmap=False):
+        path = prefix / self.alias
+        if not self.required and self.alias not in container:
+            logger.info("Optional field %s not present in this file", self.key)
+            return None
+
+        node = instrument._open(h5file, str(path))
+        (data_model, unmatched) = self._resolve_node(node, path)
+        if data_model is None:
+            raise TypeError(unmatched)
+        logger.info("UNION FOUND: %s, data model %s match", self.alias, data_model)
+        return data_model._load(h5file, path, lazy, mmap)
+
+    def dump(self, value, container, h5file, prefix):
+        value._dump(h5file, prefix / self.key)
+
+    def validate(self, container, prefix, mismatches):
+        node = self._node(container, prefix, mismatches)
+        if node is None:
+            return
+
+        path = prefix / self.alias
+        (data_model, unmatched) = self._resolve_node(node, path)
+        if data_model is None:
+            kind = "dtype" if isinstance(node, h5py.Dataset) else "node"
+            mismatches.append(H5Mismatch(str(path), kind, unmatched))
+        else:
+            data_model._validate(node, path, mismatches)
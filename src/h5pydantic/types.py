@@ -1,19 +1,47 @@
-from pydantic import StrictInt, StrictStr
+from pydantic import GetCoreSchemaHandler
+
+from pydantic_core import core_schema
 
 from enum import Enum
 
+import math
+
 import h5py.h5t
 
 import numpy
 
-from typing import Union, Type
+from typing import get_args, get_origin
+from typing import Any, Literal, Optional, Union, Type
 
 
 class H5Type():
     """All subclasses must be able to save all their possible values to HDF5 without error."""
 
-    numpy: Type[numpy.number]
+    # The numpy type the values are stored as, numpy.dtype() fails on it for types without one.
+    numpy: Any
     h5pyid: h5py.h5t.TypeIntegerID
+    ge: Union[int, float]
+    le: Union[int, float]
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        """Validate as the builtin type, within the range of the HDF5 type."""
+        if issubclass(cls, Enum):
+            return handler(source)
+        if issubclass(cls, int):
+            return core_schema.int_schema(ge=int(cls.ge), le=int(cls.le))
+        if issubclass(cls, float):
+            return core_schema.no_info_after_validator_function(cls._check_range, core_schema.float_schema())
+        if issubclass(cls, str):
+            return core_schema.str_schema()
+        return handler(source)
+
+    @classmethod
+    def _check_range(cls, value: float) -> float:
+        """NaN and the infinities are stored as they are, finite values must fit."""
+        if math.isfinite(value) and not cls.ge <= value <= cls.le:
+            raise ValueError(f"Input should be between {cls.ge} and {cls.le} to fit in {cls.__name__}")
+        return value
 
 # FIXME add other types, add tests for ge/le for them as well.
 # FIXME add a validator, for ints not to accept float
@@ -63,8 +91,8 @@ class H5UInt32(int, H5Type):
 class H5Float32(float, H5Type):
     """Little Endian float, using 32 bits."""
 
-    ge = numpy.finfo(numpy.float32).min
-    le = numpy.finfo(numpy.float32).max
+    ge = float(numpy.finfo(numpy.float32).min)
+    le = float(numpy.finfo(numpy.float32).max)
     h5pyid = h5py.h5t.IEEE_F32LE
     numpy = numpy.float32
 
@@ -72,9 +100,9 @@ class H5Float32(float, H5Type):
 class H5Float64(float, H5Type):
     """Little Endian float, using 64 bits."""
 
-    ge = numpy.finfo(numpy.float64).min
-    le = numpy.finfo(numpy.float64).max
-    h5pyid = h5py.h5t.FLOAT
+    ge = float(numpy.finfo(numpy.float64).min)
+    le = float(numpy.finfo(numpy.float64).max)
+    h5pyid = h5py.h5t.IEEE_F64LE
     numpy = numpy.float64
 
 class H5String(str, H5Type):
@@ -105,10 +133,17 @@ class H5Compound(H5Type):
 
 def _pytype_to_h5type(pytype: Union[Type[Enum],Type[H5Type],Type[str],Type[float]]) -> Union[Type[Enum],Type[H5Type],Type[str],Type[float]]:
     """Map from the Python type to the h5py type."""
+    if get_origin(pytype) is Literal:
+        # A Literal is stored as the (common) type of its values.
+        value_types = {type(value) for value in get_args(pytype)}
+        if len(value_types) != 1:
+            raise ValueError(f"Literal values must all be of one type: {pytype}")
+        return _pytype_to_h5type(value_types.pop())
+
     if issubclass(pytype, H5Type):
         return pytype.h5pyid
 
-    elif pytype in [str, StrictStr]:
+    elif pytype in [str]:
         return h5py.string_dtype(encoding="utf8", length=None)
 
     elif pytype in [float]:
@@ -116,3 +151,29 @@ def _pytype_to_h5type(pytype: Union[Type[Enum],Type[H5Type],Type[str],Type[float
 
     else:
         raise ValueError(f"Unknown type: {pytype}")
+
+
+def _enum_member_type(enum: Type[Enum]) -> Any:
+    """The type mixed into an Enum, such as H5Int64, object if there is none."""
+    return getattr(enum, "_member_type_")
+
+
+def _pytype_to_numpy(pytype) -> Optional[numpy.dtype]:
+    """Map from the Python type to the numpy dtype h5py will load it as, None if unknown."""
+    if get_origin(pytype) is Literal:
+        value_types = {type(value) for value in get_args(pytype)}
+        return _pytype_to_numpy(value_types.pop()) if len(value_types) == 1 else None
+
+    if isinstance(pytype, type) and issubclass(pytype, Enum):
+        pytype = _enum_member_type(pytype)
+
+    if pytype in [str, H5String]:
+        return h5py.string_dtype(encoding="utf8", length=None)
+
+    elif pytype in [float]:
+        return numpy.dtype(numpy.float64)
+
+    try:
+        return numpy.dtype(pytype.numpy)
+    except (AttributeError, TypeError):
+        return None
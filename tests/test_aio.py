@@ -0,0 +1,104 @@
+from h5pydantic import H5Group, H5Dataset, H5Int32
+from h5pydantic import aio
+
+import asyncio
+import threading
+
+import numpy as np
+
+import pytest
+
+
+class Data(H5Dataset, shape=(4,), dtype=H5Int32):
+    pass
+
+
+class Experiment(H5Group):
+    count: H5Int32
+    data: Data = Data()
+
+
+def test_async_dump_and_load(tmp_path):
+    async def roundtrip():
+        paths = [tmp_path / f"{i}.hdf" for i in range(8)]
+        await asyncio.gather(*(Experiment(count=i, data=Data(data_=np.arange(4) * i)).adump(path)
+                               for i, path in enumerate(paths)))
+
+        loaded = await asyncio.gather(*(Experiment.aload(path) for path in paths))
+        try:
+            assert [exp.count for exp in loaded] == list(range(8))
+            assert np.array_equal(await loaded[3].data.aread(), np.arange(4) * 3)
+            assert await loaded[3].data.aread(slice(1, 3)) == pytest.approx([3, 6])
+        finally:
+            for exp in loaded:
+                exp.close()
+
+    asyncio.run(roundtrip())
+
+
+def test_async_write(hdf_path):
+    exp = Experiment(count=1)
+
+    async def write():
+        with exp.dumper(hdf_path):
+            await exp.data.awrite((), np.arange(4))
+
+    asyncio.run(write())
+
+    with Experiment.load(hdf_path) as loaded:
+        assert np.array_equal(loaded.data[()], np.arange(4))
+
+
+def test_async_calls_are_bounded(tmp_path):
+    aio.configure(workers=4, max_pending=2)
+    release = threading.Event()
+    started = []
+
+    def blocking_call(i):
+        started.append(i)
+        release.wait()
+
+    async def call_many():
+        calls = [asyncio.ensure_future(aio._run(tmp_path / f"{i}.hdf", blocking_call, i)) for i in range(5)]
+        await asyncio.sleep(0.2)
+        assert len(started) == 2
+        release.set()
+        await asyncio.gather(*calls)
+        assert sorted(started) == list(range(5))
+
+    try:
+        asyncio.run(call_many())
+    finally:
+        release.set()
+        aio.configure()
+
+
+def test_async_calls_on_one_file_are_serialised(hdf_path):
+    aio.configure(workers=4)
+    running = []
+    overlapped = []
+
+    def call():
+        running.append(None)
+        overlapped.append(len(running) > 1)
+        threading.Event().wait(0.05)
+        running.pop()
+
+    async def call_twice():
+        await asyncio.gather(aio._run(hdf_path, call), aio._run(str(hdf_path), call))
+
+    try:
+        asyncio.run(call_twice())
+    finally:
+        aio.configure()
+    assert overlapped == [False, False]
+
+
+def test_configure_checks():
+    with pytest.raises(ValueError, match="must be positive"):
+        aio.configure(workers=0)
+    with pytest.raises(ValueError, match="must be positive"):
+        aio.configure(max_pending=0)
+    # Configuring again before any call has no executor to shut down.
+    aio.configure()
+    aio.configure()
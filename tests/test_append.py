@@ -0,0 +1,121 @@
+from h5pydantic import H5Group, H5Dataset, H5Int32
+
+import h5py
+
+import numpy as np
+
+import pytest
+
+
+class Frames(H5Dataset, shape=(-1, 4, 4), dtype=H5Int32, chunks="frames"):
+    pass
+
+
+class Experiment(H5Group):
+    frames: Frames = Frames()
+
+
+def test_append_and_extend(hdf_path):
+    exp = Experiment()
+    frames = np.arange(5 * 16).reshape((5, 4, 4))
+
+    with exp.dumper(hdf_path):
+        exp.frames.append(frames[0])
+        exp.frames.append(frames[1])
+        exp.frames.extend(frames[2:])
+
+    with h5py.File(hdf_path, "r") as h5file:
+        assert h5file["frames"].shape == (5, 4, 4)
+        assert h5file["frames"].maxshape == (None, 4, 4)
+        assert h5file["frames"].chunks == (1, 4, 4)
+
+    with Experiment.load(hdf_path) as loaded:
+        assert np.array_equal(loaded.frames[()], frames)
+
+
+def test_unlimited_dataset_with_data(hdf_path):
+    frames = np.arange(2 * 16).reshape((2, 4, 4))
+    exp = Experiment(frames=Frames(data_=frames))
+
+    exp.dump(hdf_path)
+
+    with Experiment.load(hdf_path) as loaded:
+        assert np.array_equal(loaded.frames[()], frames)
+
+
+def test_empty_append_is_partial(hdf_path):
+    exp = Experiment()
+
+    with exp.dumper(hdf_path, partial=True):
+        pass
+
+    with h5py.File(hdf_path, "r") as h5file:
+        assert h5file["frames"].shape == (0, 4, 4)
+
+
+def test_append_fixed_shape_fails(hdf_path):
+    class Image(H5Dataset, shape=(4, 4), dtype=H5Int32):
+        pass
+
+    class Fixed(H5Group):
+        image: Image = Image()
+
+    exp = Fixed()
+
+    with pytest.raises(ValueError, match="not appendable"):
+        with exp.dumper(hdf_path, partial=True):
+            exp.image.append(np.zeros(4))
+
+
+def test_append_outside_dumper_fails():
+    with pytest.raises(ValueError, match="inside H5Group.dumper"):
+        Frames().append(np.zeros((4, 4)))
+
+    with pytest.raises(ValueError, match="Cannot modify data_"):
+        Frames(data_=np.zeros((1, 4, 4))).append(np.zeros((4, 4)))
+
+
+def test_append_to_list_elements_trims(hdf_path):
+    class Runs(H5Group):
+        runs: list[Frames] = []
+
+    exp = Runs(runs=[Frames(), Frames()])
+
+    with exp.dumper(hdf_path):
+        for i in range(3):
+            exp.runs[0].append(np.full((4, 4), i))
+        exp.runs[1].append(np.zeros((4, 4)))
+
+    with h5py.File(hdf_path, "r") as h5file:
+        assert h5file["runs/0"].shape == (3, 4, 4)
+        assert h5file["runs/1"].shape == (1, 4, 4)
+
+
+def test_append_trims_when_body_raises(hdf_path):
+    exp = Experiment()
+
+    with pytest.raises(RuntimeError):
+        with exp.dumper(hdf_path, partial=True):
+            for i in range(3):
+                exp.frames.append(np.full((4, 4), i))
+            raise RuntimeError("interrupted")
+
+    with h5py.File(hdf_path, "r") as h5file:
+        assert h5file["frames"].shape == (3, 4, 4)
+
+
+def test_append_to_loaded_dataset(hdf_path):
+    exp = Experiment()
+    with exp.dumper(hdf_path):
+        for i in range(3):
+            exp.frames.append(np.full((4, 4), i))
+
+    with Experiment.load(hdf_path, mode="r+") as loaded:
+        loaded.frames.append(np.full((4, 4), 100))
+        loaded.frames.write_chunks(np.full((1, 4, 4), 101), start=4)
+        # Frames already stored don't grow the dataset.
+        loaded.frames.write_chunks(np.full((1, 4, 4), 50), start=1)
+
+    with h5py.File(hdf_path, "r") as h5file:
+        assert h5file["frames"].shape == (5, 4, 4)
+        assert [frame[0, 0] for frame in h5file["frames"]] == [0, 50, 2, 100, 101]
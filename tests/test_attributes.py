@@ -0,0 +1,72 @@
+from h5pydantic import H5Group, H5Int32, H5Int64
+from h5pydantic.types import H5Float32, H5Float64
+
+from pydantic import ValidationError
+
+import h5py
+
+import math
+
+import numpy as np
+
+import pytest
+
+
+class Attributes(H5Group):
+    zulu: H5Int32
+    alpha: H5Int64
+    mike: float
+    bravo: str
+
+
+def test_attributes_use_declared_types(hdf_path):
+    Attributes(zulu=1, alpha=2, mike=3.0, bravo="four").dump(hdf_path)
+
+    with h5py.File(hdf_path, "r") as h5file:
+        assert h5file.attrs["zulu"].dtype == np.int32
+        assert h5file.attrs["alpha"].dtype == np.int64
+        assert h5file.attrs["mike"].dtype == np.float64
+        assert h5file.attrs["bravo"] == "four"
+
+
+def test_attributes_out_of_range():
+    with pytest.raises(ValidationError, match="less than or equal to 2147483647"):
+        Attributes(zulu=2**40, alpha=2, mike=3.0, bravo="four")
+
+    with pytest.raises(ValidationError, match="greater than or equal to -9223372036854775808"):
+        Attributes(zulu=1, alpha=-2**63 - 1, mike=3.0, bravo="four")
+
+
+def test_float_attributes_out_of_range(hdf_path):
+    class Floats(H5Group):
+        single: H5Float32
+        double: H5Float64
+
+    with pytest.raises(ValidationError, match="fit in H5Float32"):
+        Floats(single=1e39, double=1.0)
+
+    Floats(single=float("inf"), double=float("nan")).dump(hdf_path)
+    with Floats.load(hdf_path) as loaded:
+        assert loaded.single == float("inf")
+        assert math.isnan(loaded.double)
+
+
+@pytest.mark.parametrize("track_order,order", [(False, ["alpha", "bravo", "mike", "zulu"]),
+                                               (True, ["zulu", "alpha", "mike", "bravo"])])
+def test_attribute_track_order(hdf_path, track_order, order):
+    class Outer(H5Group):
+        inner: Attributes
+
+    Outer(inner=Attributes(zulu=1, alpha=2, mike=3.0, bravo="four")).dump(hdf_path, track_order=track_order)
+
+    with h5py.File(hdf_path, "r") as h5file:
+        assert list(h5file["inner"].attrs) == order
+
+
+def test_attributes_load_exactly(hdf_path):
+    attributes = Attributes(zulu=1, alpha=2**53 + 1, mike=0.1, bravo="four")
+    attributes.dump(hdf_path)
+
+    with Attributes.load(hdf_path) as loaded:
+        assert loaded.alpha == 2**53 + 1
+        assert loaded == attributes
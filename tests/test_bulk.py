@@ -0,0 +1,96 @@
+from h5pydantic import H5Group, H5Dataset, H5Int32, H5Int64, H5LoadResult
+
+from concurrent.futures import ThreadPoolExecutor
+
+import h5py
+
+import numpy as np
+
+import pytest
+
+
+class Frames(H5Dataset, shape=(2, 3), dtype=H5Int32):
+    pass
+
+
+class Experiment(H5Group):
+    scan: H5Int64
+    frames: Frames
+
+
+def dump_scans(tmp_path, count: int) -> list:
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"scan{i}.hdf"
+        Experiment(scan=i, frames=Frames(data_=np.full((2, 3), i, dtype=np.int32))).dump(path)
+        paths.append(path)
+    return paths
+
+
+def test_load_many(tmp_path):
+    paths = dump_scans(tmp_path, 4)
+    missing = tmp_path / "missing.hdf"
+
+    results = list(Experiment.load_many(paths + [missing], workers=2))
+
+    assert all(isinstance(result, H5LoadResult) for result in results)
+    assert sorted(result.model.scan for result in results if result.model is not None) == [0, 1, 2, 3]
+
+    [failed] = [result for result in results if result.error is not None]
+    assert failed.path == missing and failed.model is None
+    assert isinstance(failed.error, FileNotFoundError)
+
+    loaded = next(result for result in results if result.model is not None)
+    with loaded.model.reopen(loaded.path) as model:
+        assert np.array_equal(model.frames[()], np.full((2, 3), model.scan))
+
+
+def test_load_many_with_executor(tmp_path):
+    paths = dump_scans(tmp_path, 3)
+
+    with ThreadPoolExecutor(2) as executor:
+        results = list(Experiment.load_many(paths, executor=executor))
+
+    assert sorted(result.model.scan for result in results) == [0, 1, 2]
+
+
+def test_load_many_errors(tmp_path):
+    paths = dump_scans(tmp_path, 2)
+    corrupt = tmp_path / "corrupt.hdf"
+    corrupt.write_bytes(b"not an HDF5 file")
+    missing = tmp_path / "missing.hdf"
+
+    with ThreadPoolExecutor(2) as executor:
+        results = {result.path: result for result in Experiment.load_many(paths + [corrupt, missing],
+                                                                             executor=executor)}
+
+    assert [results[path].model.scan for path in paths] == [0, 1]
+    assert isinstance(results[corrupt].error, OSError) and results[corrupt].model is None
+    assert isinstance(results[missing].error, FileNotFoundError) and results[missing].model is None
+
+
+def test_load_many_worker_errors(tmp_path):
+    # Classes that can't be pickled can't be sent to worker processes.
+    class Local(H5Group):
+        scan: H5Int64
+
+    [path] = dump_scans(tmp_path, 1)
+    [result] = Local.load_many([path], workers=1)
+
+    assert result.path == path and result.model is None
+    assert result.error is not None
+
+
+def test_reopen_closes_mismatched_files(tmp_path):
+    [path] = dump_scans(tmp_path, 1)
+    with Experiment.load(path) as exp:
+        pass
+    detached = exp._detach()
+
+    with h5py.File(path, "r+") as h5file:
+        del h5file["frames"]
+
+    with pytest.raises(KeyError):
+        detached.reopen(path)
+    # A file still open can't be truncated.
+    h5py.File(path, "w").close()
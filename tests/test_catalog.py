@@ -0,0 +1,110 @@
+from h5pydantic import H5Catalog, H5Group, H5Int64
+
+from enum import Enum
+
+import os
+
+from typing import Optional
+
+import pytest
+
+
+class Beamstop(H5Int64, Enum):
+    OUT = 0
+    IN = 1
+
+
+class Detector(H5Group):
+    distance: float
+    name: str
+
+
+class Experiment(H5Group):
+    energy: float
+    beamstop: Beamstop
+    detector: Detector
+
+
+def dump_scans(tmp_path) -> list:
+    paths = []
+    for i, (energy, beamstop) in enumerate([(10.0, Beamstop.IN), (12.5, Beamstop.IN), (13.0, Beamstop.OUT)]):
+        path = tmp_path / f"scan{i}.hdf"
+        Experiment(energy=energy, beamstop=beamstop, detector=Detector(distance=i, name=f"det{i}")).dump(path)
+        paths.append(path)
+    return paths
+
+
+def test_catalog_query(tmp_path):
+    paths = dump_scans(tmp_path)
+
+    with H5Catalog(Experiment, tmp_path / "index.sqlite") as catalog:
+        assert catalog.update(paths) == []
+        assert list(catalog.columns) == ["energy", "beamstop", "detector.distance", "detector.name"]
+
+        assert catalog.query(("energy", ">", 12), ("beamstop", "==", Beamstop.IN)) == [paths[1]]
+        assert catalog.query(("detector.name", "in", ["det0", "det2"])) == [paths[0], paths[2]]
+        assert catalog.query() == paths
+
+        [loaded] = catalog.load(("beamstop", "==", Beamstop.OUT))
+        with loaded:
+            assert loaded.detector.distance == 2
+
+        with pytest.raises(ValueError, match="Unknown field"):
+            catalog.query(("wavelength", ">", 1))
+
+
+def test_catalog_updates_incrementally(tmp_path):
+    paths = dump_scans(tmp_path)
+
+    with H5Catalog(Experiment, tmp_path / "index.sqlite") as catalog:
+        catalog.update(paths)
+
+    Experiment(energy=20.0, beamstop=Beamstop.OUT, detector=Detector(distance=0, name="new")).dump(paths[0])
+    # Make sure the rewrite is seen as newer, even with coarse file system timestamps.
+    mtime = os.stat(paths[0]).st_mtime_ns + 1_000_000_000
+    os.utime(paths[0], ns=(mtime, mtime))
+    paths[2].unlink()
+
+    with H5Catalog(Experiment, tmp_path / "index.sqlite") as catalog:
+        catalog.update(paths)
+        assert catalog.query(("energy", ">=", 13)) == [paths[0]]
+        assert catalog.query() == paths[:2]
+
+
+def test_catalog_normalises_and_prunes_paths(tmp_path, monkeypatch):
+    paths = dump_scans(tmp_path)
+    monkeypatch.chdir(tmp_path)
+
+    with H5Catalog(Experiment, tmp_path / "index.sqlite") as catalog:
+        catalog.update(["scan0.hdf", tmp_path / "scan0.hdf", tmp_path / "." / "scan1.hdf"])
+        assert catalog.query() == [path.resolve() for path in paths[:2]]
+
+        # Deleted files are dropped, even when they aren't passed to update.
+        paths[0].unlink()
+        catalog.update([paths[2]])
+        assert catalog.query() == [path.resolve() for path in paths[1:]]
+
+
+def test_catalog_missing_values_and_errors(tmp_path):
+    class Run(H5Group):
+        energy: float
+        note: Optional[str] = None
+        steps: list[int] = []
+
+    Run(energy=1.0, note="first").dump(tmp_path / "first.hdf")
+    Run(energy=2.0).dump(tmp_path / "second.hdf")
+    (tmp_path / "corrupt.hdf").write_bytes(b"not an HDF5 file")
+
+    with H5Catalog(Run, tmp_path / "index.sqlite") as catalog:
+        # Lists aren't indexed.
+        assert list(catalog.columns) == ["energy", "note"]
+
+        [(path, error)] = catalog.update([tmp_path / "first.hdf", tmp_path / "second.hdf", tmp_path / "corrupt.hdf"])
+        assert path == tmp_path / "corrupt.hdf"
+        assert isinstance(error, OSError)
+
+        assert catalog.query(("note", "==", "first")) == [tmp_path / "first.hdf"]
+        assert catalog.query(("energy", ">", 0)) == [tmp_path / "first.hdf", tmp_path / "second.hdf"]
+
+        with pytest.raises(ValueError, match="Unknown operator 'like'"):
+            catalog.query(("note", "like", "f%"))
@@ -0,0 +1,108 @@
+from h5pydantic import H5Group, H5Dataset, H5Int32
+from h5pydantic.types import H5UInt16
+
+from concurrent.futures import ProcessPoolExecutor
+
+import h5py
+
+import numpy as np
+
+import pytest
+
+
+class Stack(H5Dataset, shape=(-1, 20, 24), dtype=H5UInt16, chunks=(2, 8, 8), compression="gzip",
+            compression_opts=6, shuffle=True):
+    pass
+
+
+class Lzf(H5Dataset, shape=(4, 8), dtype=H5Int32, chunks=True, compression="lzf"):
+    pass
+
+
+class Experiment(H5Group):
+    stack: Stack = Stack()
+
+
+def frames(n: int) -> np.ndarray:
+    return (np.arange(n * 20 * 24) % 1000).astype(np.uint16).reshape((n, 20, 24))
+
+
+def test_chunk_writes_read_back_normally(hdf_path):
+    exp = Experiment()
+
+    with exp.dumper(hdf_path):
+        exp.stack.write_chunks(frames(4), workers=2)
+        exp.stack.write_chunks(frames(3), start=4)
+
+    with h5py.File(hdf_path, "r") as h5file:
+        dset = h5file["stack"]
+        assert dset.shape == (7, 20, 24)
+        assert dset.compression == "gzip" and dset.shuffle
+        assert np.array_equal(dset[:4], frames(4))
+        assert np.array_equal(dset[4:], frames(3))
+
+
+def test_chunk_writes_with_process_pool(hdf_path):
+    exp = Experiment()
+
+    with exp.dumper(hdf_path), ProcessPoolExecutor(2) as executor:
+        exp.stack.write_chunks(frames(6), executor=executor)
+
+    with Experiment.load(hdf_path) as loaded:
+        assert np.array_equal(loaded.stack[()], frames(6))
+
+
+def test_chunk_writes_must_be_aligned(hdf_path):
+    exp = Experiment()
+
+    with exp.dumper(hdf_path):
+        exp.stack.write_chunks(frames(2))
+        with pytest.raises(ValueError, match="not aligned"):
+            exp.stack.write_chunks(frames(2), start=1)
+
+
+def test_chunk_writes_unsupported_filter(hdf_path):
+    class Other(H5Group):
+        lzf: Lzf = Lzf()
+
+    exp = Other()
+
+    with pytest.raises(ValueError, match="not supported"):
+        with exp.dumper(hdf_path):
+            exp.lzf.write_chunks(np.zeros((4, 8), dtype=np.int32))
+
+
+def test_chunk_writes_checks(hdf_path):
+    class Fixed(H5Dataset, shape=(6, 8), dtype=H5Int32, chunks=(2, 8)):
+        pass
+
+    class Contiguous(H5Dataset, shape=(6, 8), dtype=H5Int32):
+        pass
+
+    class Names(H5Dataset, shape=(6,), dtype=str, chunks=(2,)):
+        pass
+
+    class Checked(H5Group):
+        fixed: Fixed = Fixed()
+        contiguous: Contiguous = Contiguous()
+        names: Names = Names()
+        stack: Stack = Stack()
+
+    exp = Checked()
+
+    with exp.dumper(hdf_path, partial=True):
+        with pytest.raises(ValueError, match="do not fill whole chunks"):
+            exp.fixed.write_chunks(np.zeros((3, 8), dtype=np.int32))
+        with pytest.raises(ValueError, match="outside the dataset shape"):
+            exp.fixed.write_chunks(np.zeros((8, 8), dtype=np.int32))
+        with pytest.raises(ValueError, match="need a chunked dataset"):
+            exp.contiguous.write_chunks(np.zeros((6, 8), dtype=np.int32))
+        with pytest.raises(ValueError, match="need a numeric dtype"):
+            exp.names.write_chunks(np.array(["a", "b"]))
+        with pytest.raises(ValueError, match="Frame shape"):
+            exp.stack.write_chunks(np.zeros((2, 20, 20), dtype=np.uint16))
+
+    with pytest.raises(ValueError, match="inside H5Group.dumper"):
+        Stack().write_chunks(frames(2))
+    with pytest.raises(ValueError, match="data_"):
+        Stack(data_=frames(2)).write_chunks(frames(2))
@@ -0,0 +1,73 @@
+from h5pydantic import H5Group, H5Dataset, H5Int32
+
+import numpy as np
+
+import pytest
+
+
+class Frames(H5Dataset, shape=(3, 2, 4), dtype=H5Int32):
+    pass
+
+
+class Experiment(H5Group):
+    frames: Frames = Frames()
+
+
+def test_write_from_and_read_into(hdf_path):
+    exp = Experiment()
+    data = np.arange(24, dtype=np.int32).reshape((3, 2, 4))
+
+    with exp.dumper(hdf_path):
+        exp.frames.write_from(np.zeros((3, 2, 4), dtype=np.int32))
+        exp.frames.write_from(data[1], dest_sel=np.s_[1])
+        exp.frames.write_from(data, source_sel=np.s_[2], dest_sel=np.s_[2])
+
+    with Experiment.load(hdf_path) as loaded:
+        frame = np.empty((2, 4), dtype=np.int32)
+        for i in range(3):
+            assert loaded.frames.read_into(frame, source_sel=np.s_[i]) is frame
+            assert np.array_equal(frame, data[i] if i else np.zeros((2, 4)))
+
+        whole = np.empty((3, 2, 4), dtype=np.int32)
+        loaded.frames.read_into(whole)
+        assert np.array_equal(whole[1:], data[1:])
+
+
+def test_read_into_checks_buffer(hdf_path):
+    Experiment(frames=Frames(data_=np.zeros((3, 2, 4), dtype=np.int32))).dump(hdf_path)
+
+    with Experiment.load(hdf_path) as loaded:
+        with pytest.raises(ValueError, match="dtype"):
+            loaded.frames.read_into(np.empty((3, 2, 4), dtype=np.float64))
+
+        with pytest.raises(ValueError, match="shape"):
+            loaded.frames.read_into(np.empty((2, 4), dtype=np.int32))
+
+        with pytest.raises(ValueError, match="contiguous"):
+            loaded.frames.read_into(np.empty((3, 2, 8), dtype=np.int32)[:, :, ::2])
+
+        readonly = np.empty((3, 2, 4), dtype=np.int32)
+        readonly.flags.writeable = False
+        with pytest.raises(ValueError, match="writeable"):
+            loaded.frames.read_into(readonly)
+
+
+def test_direct_io_needs_a_file_dataset(hdf_path):
+    class Names(H5Dataset, shape=(2,), dtype=str):
+        pass
+
+    class Named(H5Group):
+        names: Names
+
+    buffer = np.empty((3, 2, 4), dtype=np.int32)
+    with pytest.raises(ValueError, match="read_into needs a dataset"):
+        Frames().read_into(buffer)
+    with pytest.raises(ValueError, match="write_from needs a dataset"):
+        Frames().write_from(buffer)
+    with pytest.raises(ValueError, match="data_"):
+        Frames(data_=buffer).write_from(buffer)
+
+    Named(names=Names(data_=["a", "b"])).dump(hdf_path)
+    with Named.load(hdf_path) as loaded:
+        with pytest.raises(ValueError, match="string datasets"):
+            loaded.names.read_into(np.empty(2, dtype=object))
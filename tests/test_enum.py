@@ -1,5 +1,7 @@
 from h5pydantic import H5Dataset, H5Group, H5Int64
 
+import h5py
+
 import numpy as np
 
 from enum import Enum
@@ -59,3 +61,100 @@ def test_dataset_enum_works(hdf_path):
     with Experiment.load(hdf_path) as loaded:
         assert exp == loaded
         assert np.array_equal(modes_array, loaded.modes[()])
+
+
+def test_enum_type_is_built_once(hdf_path):
+    class Experiment(H5Group):
+        before: ScanningMode
+        after: ScanningMode
+
+    Experiment(before=ScanningMode.FLYSCAN, after=ScanningMode.INSTANTANEOUS).dump(hdf_path)
+
+    with h5py.File(hdf_path, "r") as h5file:
+        before = h5file.attrs.get_id("before").get_type()
+        assert before.get_class() == h5py.h5t.ENUM
+        assert before.get_nmembers() == 3
+        assert before.enum_nameof(3) == b"FLYSCAN"
+        assert h5file.attrs.get_id("after").get_type() == before
+
+
+def test_committed_enum_type(hdf_path):
+    class Experiment(H5Group):
+        before: ScanningMode
+        after: ScanningMode
+
+    exp = Experiment(before=ScanningMode.FLYSCAN, after=ScanningMode.STEPANDSHOOT)
+    exp.dump(hdf_path, commit_enums=True)
+
+    with h5py.File(hdf_path, "r") as h5file:
+        committed = h5file[f"/_h5pydantic/enums/{__name__}.ScanningMode"]
+        assert isinstance(committed, h5py.Datatype)
+        assert h5file.attrs.get_id("before").get_type().committed()
+        assert h5file.attrs.get_id("after").get_type().committed()
+
+    with Experiment.load(hdf_path) as loaded:
+        assert loaded == exp
+
+
+def test_committed_enum_type_dumped_again(hdf_path):
+    class Experiment(H5Group):
+        scan: ScanningMode
+
+    with Experiment(scan=ScanningMode.FLYSCAN).dumper(hdf_path, commit_enums=True):
+        pass
+
+    # The datatype already committed to the file is used again.
+    Experiment(scan=ScanningMode.STEPANDSHOOT).dump(hdf_path, mode="a", commit_enums=True)
+    with h5py.File(hdf_path, "r") as h5file:
+        assert list(h5file["/_h5pydantic/enums"]) == [f"{__name__}.ScanningMode"]
+        assert h5file.attrs.get_id("scan").get_type().committed()
+
+    with Experiment.load(hdf_path, mode="r+") as loaded:
+        assert loaded.scan is ScanningMode.STEPANDSHOOT
+        loaded.scan = ScanningMode.INSTANTANEOUS
+        loaded.save()
+
+    with Experiment.load(hdf_path) as loaded:
+        assert loaded.scan is ScanningMode.INSTANTANEOUS
+
+
+def test_committed_enum_types_of_the_same_name(hdf_path):
+    class Local(H5Int64, Enum):
+        FAST = 10
+        SLOW = 20
+
+    # As if defined in another module.
+    Local.__module__, Local.__qualname__ = "other", ScanningMode.__qualname__
+
+    class Experiment(H5Group):
+        scan: ScanningMode
+        local: Local
+
+    exp = Experiment(scan=ScanningMode.FLYSCAN, local=Local.SLOW)
+    exp.dump(hdf_path, commit_enums=True)
+
+    with h5py.File(hdf_path, "r") as h5file:
+        assert len(h5file["/_h5pydantic/enums"]) == 2
+
+    with Experiment.load(hdf_path) as loaded:
+        assert loaded.scan is ScanningMode.FLYSCAN
+        assert loaded.local is Local.SLOW
+
+
+def test_committed_enum_type_mismatch_fails(hdf_path):
+    class Experiment(H5Group):
+        scan: ScanningMode
+
+    Experiment(scan=ScanningMode.FLYSCAN).dump(hdf_path, commit_enums=True)
+
+    class Changed(H5Int64, Enum):
+        FLYSCAN = 4
+
+    Changed.__qualname__ = ScanningMode.__qualname__
+
+    class ChangedExperiment(H5Group):
+        scan: Changed
+
+    exp = ChangedExperiment(scan=Changed.FLYSCAN)
+    with pytest.raises(ValueError, match="does not match the members"):
+        exp.dump(hdf_path, mode="a", commit_enums=True)
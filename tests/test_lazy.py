@@ -0,0 +1,156 @@
+from h5pydantic import H5Group, H5Dataset, H5Int32, H5Int64
+
+from pydantic import Field, ValidationError
+
+import numpy as np
+
+import pytest
+
+from typing import Annotated
+
+
+class Image(H5Dataset, shape=(2, 2), dtype=H5Int32):
+    pass
+
+
+class Acquisition(H5Group):
+    energy: float
+    image: Image
+
+
+class Experiment(H5Group):
+    name: str
+    acquisitions: list[Acquisition] = []
+
+
+@pytest.fixture
+def experiment(hdf_path):
+    exp = Experiment(name="lazy", acquisitions=[Acquisition(energy=float(i), image=Image(data_=np.full((2, 2), i)))
+                                                for i in range(5)])
+    exp.dump(hdf_path)
+    return exp
+
+
+def test_lazy_load_defers_children(hdf_path, experiment, monkeypatch):
+    loaded_paths = []
+    load = Acquisition._load.__func__
+
+    def counting_load(cls, h5file, prefix, lazy=False, mmap=False):
+        loaded_paths.append(str(prefix))
+        return load(cls, h5file, prefix, lazy, mmap)
+
+    monkeypatch.setattr(Acquisition, "_load", classmethod(counting_load))
+
+    with Experiment.load(hdf_path, lazy=True) as loaded:
+        assert loaded.name == "lazy"
+        assert len(loaded.acquisitions) == 5
+        assert loaded_paths == []
+
+        assert loaded.acquisitions[3].energy == 3.0
+        assert loaded_paths == ["/acquisitions/3"]
+
+        assert loaded.acquisitions[3] is loaded.acquisitions[-2]
+        assert loaded_paths == ["/acquisitions/3"]
+
+
+def test_lazy_load_equals_eager_load(hdf_path, experiment):
+    with Experiment.load(hdf_path, lazy=True) as loaded:
+        assert loaded == experiment
+        assert loaded.model_dump_json() == experiment.model_dump_json()
+        assert np.array_equal(loaded.acquisitions[4].image[()], np.full((2, 2), 4))
+
+
+def test_lazy_list_iteration(hdf_path, experiment):
+    with Experiment.load(hdf_path, lazy=True) as loaded:
+        assert [acquisition.energy for acquisition in loaded.acquisitions] == [0.0, 1.0, 2.0, 3.0, 4.0]
+        assert [acquisition.energy for acquisition in loaded.acquisitions[1:3]] == [1.0, 2.0]
+
+
+def test_lazy_load_validates_attributes(hdf_path, experiment):
+    class Strict(H5Group):
+        name: H5Int64
+        acquisitions: list[Acquisition] = []
+
+    with pytest.raises(ValueError):
+        Strict.load(hdf_path, lazy=True)
+
+    class Short(H5Group):
+        name: Annotated[str, Field(max_length=2)]
+        acquisitions: list[Acquisition] = []
+
+    with pytest.raises(ValidationError) as info:
+        Short.load(hdf_path, lazy=True)
+    assert info.value.errors()[0]["ctx"] == {"max_length": 2}
+
+
+def test_lazy_load_private_attributes(hdf_path, experiment):
+    with Experiment.load(hdf_path, lazy=True) as loaded:
+        assert loaded._h5dirty == set()
+        with pytest.raises(AttributeError, match="_missing"):
+            loaded._missing
+
+
+def test_lazy_list_methods(hdf_path, experiment):
+    with Experiment.load(hdf_path, lazy=True) as loaded:
+        acquisitions = loaded.acquisitions
+        # The underlying list, without loading.
+        assert list.__repr__(acquisitions) == "[<unloaded>, <unloaded>, <unloaded>, <unloaded>, <unloaded>]"
+        third = experiment.acquisitions[3]
+
+        assert [acquisition.energy for acquisition in reversed(acquisitions)] == [4.0, 3.0, 2.0, 1.0, 0.0]
+        assert third in acquisitions
+        assert Acquisition(energy=9.0, image=Image(data_=np.zeros((2, 2)))) not in acquisitions
+        assert acquisitions.index(third) == 3
+        assert acquisitions.count(third) == 1
+
+        copy = acquisitions.copy()
+        assert type(copy) is list
+        assert copy == experiment.acquisitions
+        assert acquisitions == experiment.acquisitions
+        assert acquisitions != experiment.acquisitions[:4]
+        assert repr(acquisitions) == repr(experiment.acquisitions)
+
+        assert acquisitions + [] == experiment.acquisitions
+        assert [] + acquisitions == experiment.acquisitions
+        assert acquisitions * 2 == 2 * acquisitions == experiment.acquisitions * 2
+        assert acquisitions <= experiment.acquisitions and acquisitions >= experiment.acquisitions
+        assert not (acquisitions < experiment.acquisitions or acquisitions > experiment.acquisitions)
+
+
+@pytest.mark.parametrize("change", [
+    lambda acquisitions: acquisitions.pop(0),
+    lambda acquisitions: acquisitions.remove(acquisitions[0]),
+    lambda acquisitions: acquisitions.insert(0, acquisitions[0]),
+    lambda acquisitions: acquisitions.append(acquisitions[0]),
+    lambda acquisitions: acquisitions.extend([acquisitions[0]]),
+    lambda acquisitions: acquisitions.__iadd__([acquisitions[0]]),
+    lambda acquisitions: acquisitions.__imul__(2),
+    lambda acquisitions: acquisitions.__setitem__(slice(0, 1), []),
+    lambda acquisitions: acquisitions.__delitem__(0),
+    lambda acquisitions: acquisitions.reverse(),
+    lambda acquisitions: acquisitions.sort(key=lambda acquisition: -acquisition.energy),
+])
+def test_lazy_list_changes(hdf_path, experiment, change):
+    with Experiment.load(hdf_path, lazy=True) as loaded:
+        acquisitions = loaded.acquisitions
+        expected = list(experiment.acquisitions)
+        assert change(acquisitions) == change(expected)
+        assert list.__eq__(acquisitions, expected)
+
+
+def test_lazy_load_copy(hdf_path, experiment):
+    with Experiment.load(hdf_path, lazy=True) as loaded:
+        copy = loaded.model_copy()
+        assert copy.acquisitions == experiment.acquisitions
+        assert loaded.acquisitions == experiment.acquisitions
+        assert loaded.model_dump() == experiment.model_dump()
+
+        copy.name = "copy"
+        assert loaded._h5dirty == set()
+
+        # Models which weren't loaded or dumped don't track assignments, nor do their copies.
+        assert Experiment(name="new").model_copy()._h5dirty is None
+
+        updated = loaded.model_copy(update={"acquisitions": []})
+        assert updated.acquisitions == []
+        assert updated.model_dump() == {"name": "lazy", "acquisitions": []}
@@ -0,0 +1,77 @@
+from h5pydantic import H5Group, H5Dataset, H5Int32
+
+import numpy as np
+
+import pytest
+
+
+class Dark(H5Dataset, shape=(3, 4), dtype=H5Int32):
+    pass
+
+
+class Chunked(H5Dataset, shape=(3, 4), dtype=H5Int32, chunks=True, compression="gzip"):
+    pass
+
+
+class Calibration(H5Group):
+    dark: Dark
+    flat: Chunked
+
+
+@pytest.fixture
+def calibration_path(hdf_path):
+    data = np.arange(12, dtype=np.int32).reshape((3, 4))
+    Calibration(dark=Dark(data_=data), flat=Chunked(data_=data)).dump(hdf_path)
+    return hdf_path
+
+
+def test_as_memmap(calibration_path):
+    with Calibration.load(calibration_path) as loaded:
+        dark = loaded.dark.as_memmap()
+        assert isinstance(dark, np.memmap)
+        assert not dark.flags.writeable
+        assert np.array_equal(dark[1], [4, 5, 6, 7])
+
+        # Chunked and compressed datasets fall back to a read.
+        flat = loaded.flat.as_memmap()
+        assert not isinstance(flat, np.memmap)
+        assert not flat.flags.writeable
+        assert np.array_equal(flat, dark)
+
+
+def test_load_mmap(calibration_path):
+    with Calibration.load(calibration_path, mmap=True) as loaded:
+        assert isinstance(loaded.dark[1:], np.memmap)
+        assert np.array_equal(loaded.dark[1:], [[4, 5, 6, 7], [8, 9, 10, 11]])
+        assert not isinstance(loaded.flat[1:], np.memmap)
+        assert np.array_equal(loaded.flat[1:], loaded.dark[1:])
+
+
+def test_load_mmap_is_per_load(calibration_path):
+    with Calibration.load(calibration_path, mmap=True):
+        with Calibration.load(calibration_path) as loaded:
+            assert not isinstance(loaded.dark[1:], np.memmap)
+
+    with Calibration.load(calibration_path, lazy=True, mmap=True) as loaded:
+        assert isinstance(loaded.dark[1:], np.memmap)
+
+
+def test_as_memmap_of_loaded_memmap(calibration_path):
+    with Calibration.load(calibration_path, mmap=True) as loaded:
+        assert loaded.dark.as_memmap() is loaded.dark.as_memmap()
+
+
+def test_as_memmap_unwritten(hdf_path):
+    with Calibration(dark=Dark(), flat=Chunked()).dumper(hdf_path, partial=True):
+        pass
+
+    # Without storage, there is nothing to map, so the fill values are read.
+    with Calibration.load(hdf_path) as loaded:
+        dark = loaded.dark.as_memmap()
+        assert not isinstance(dark, np.memmap)
+        assert np.array_equal(dark, np.zeros((3, 4)))
+
+
+def test_as_memmap_needs_a_file():
+    with pytest.raises(ValueError, match="Can only memory map"):
+        Dark().as_memmap()
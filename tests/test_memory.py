@@ -0,0 +1,84 @@
+from h5pydantic import H5Group, H5Dataset, H5Int32, H5Int64
+from h5pydantic.image import _BufferFile
+
+from enum import Enum
+
+import h5py
+
+import io
+
+import numpy as np
+
+import pytest
+
+
+class Data(H5Dataset, shape=(3,), dtype=H5Int32):
+    pass
+
+
+class Message(H5Group):
+    sequence: H5Int64
+    data: Data
+
+
+def message() -> Message:
+    return Message(sequence=7, data=Data(data_=np.arange(3, dtype=np.int32)))
+
+
+def test_dumps_and_load_bytes():
+    image = message().dumps()
+    assert image.startswith(b"\x89HDF")
+
+    for source in (image, memoryview(image), bytearray(image)):
+        with Message.load(source) as loaded:
+            assert loaded.sequence == 7
+            assert np.array_equal(loaded.data[()], [0, 1, 2])
+
+
+def test_dump_and_load_file_like():
+    buffer = io.BytesIO()
+    message().dump(buffer)
+
+    buffer.seek(0)
+    with Message.load(buffer) as loaded:
+        assert loaded.sequence == 7
+        assert np.array_equal(loaded.data[()], [0, 1, 2])
+
+
+def test_load_bytes_is_read_only():
+    with pytest.raises(ValueError, match="read-only"):
+        Message.load(message().dumps(), mode="r+")
+
+
+def test_dumps_marks_model_clean():
+    msg = message()
+    msg.dumps()
+    msg.sequence = 8
+    msg.dumps()
+    assert msg._h5dirty == set()
+
+
+def test_dumps_options():
+    class Mode(H5Int64, Enum):
+        FAST = 1
+
+    class Run(H5Group):
+        mode: Mode
+        data: Data = Data()
+
+    # A partial dump may leave datasets unwritten.
+    image = Run(mode=Mode.FAST).dumps(partial=True, commit_enums=True)
+    with h5py.File(io.BytesIO(image), "r") as h5file:
+        assert len(h5file["/_h5pydantic/enums"]) == 1
+    with Run.load(image) as loaded:
+        assert loaded.mode is Mode.FAST
+
+
+def test_buffer_file():
+    image = _BufferFile(b"0123456789")
+    assert image.readable() and image.seekable()
+    assert image.seek(4) == 4
+    assert image.seek(2, io.SEEK_CUR) == 6
+    assert image.read(2) == b"67"
+    assert image.seek(-1, io.SEEK_END) == 9
+    assert image.read() == b"9"
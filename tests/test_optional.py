@@ -1,5 +1,8 @@
 from h5pydantic import H5Group, H5Int64
-from typing import Optional
+
+import logging
+
+from typing import Optional, Union
 
 
 class Inner(H5Group):
@@ -50,6 +53,19 @@ def test_optional_group_not_saved():
     pass
 
 
+def test_optional_fields_default_to_none(hdf_path):
+    class Defaults(H5Group):
+        magic: Optional[H5Int64]
+        group: Optional[Inner]
+
+    assert Defaults() == Defaults(magic=None, group=None)
+
+    Defaults().dump(hdf_path)
+    with Defaults.load(hdf_path) as loaded:
+        assert loaded.magic is None
+        assert loaded.group is None
+
+
 def test_optional_dataset_not_saved():
     pass
 
@@ -66,8 +82,23 @@ def test_optional_enum_saved():
     pass
 
 
-def test_optional_list_container_not_saved():
-    pass
+def test_optional_list_container_not_saved(hdf_path, caplog):
+    class Other(H5Group):
+        twice: str
+
+    class Lists(H5Group):
+        numbers: Optional[list[int]] = None
+        inners: Optional[list[Inner]] = None
+        either: Optional[Union[Inner, Other]] = None
+
+    Lists().dump(hdf_path)
+    for lazy in (False, True):
+        with caplog.at_level(logging.INFO, logger="h5pydantic_logger"):
+            with Lists.load(hdf_path, lazy=lazy) as loaded:
+                assert loaded == Lists()
+        assert [record.getMessage() for record in caplog.records] == [
+            f"Optional field {key} not present in this file" for key in ("numbers", "inners", "either")]
+        caplog.clear()
 
 
 def test_optional_list_container_saved():
@@ -0,0 +1,111 @@
+from h5pydantic import H5Group, H5Dataset, H5Int32, H5Int64
+from h5pydantic.plan import _AttributePlan, _AttributeListPlan, _NodePlan, _NodeListPlan, _UnionPlan
+from h5pydantic.types import H5Type
+
+from pydantic import Field, ValidationError
+
+import h5py
+
+import numpy as np
+
+from pathlib import PurePosixPath
+from typing import Annotated, Optional, Union
+
+import pytest
+
+
+class Data(H5Dataset, shape=(2,), dtype=H5Int32):
+    pass
+
+
+class Inner(H5Group):
+    value: H5Int64
+
+
+class Outer(H5Group):
+    number: H5Int64
+    numbers: list[int] = []
+    inner: Inner
+    inners: list[Inner] = []
+    data: Optional[Data] = None
+
+
+class Derived(Outer):
+    extra: float
+
+
+def test_plan_kinds():
+    kinds = [type(plan) for plan in Outer._h5plan()]
+
+    assert kinds == [_AttributePlan, _AttributeListPlan, _NodePlan, _NodeListPlan, _NodePlan]
+
+
+def test_plan_kinds_of_unions():
+    class Unions(H5Group):
+        node: Union[Inner, Data]
+        value: Union[H5Int64, str]
+
+    assert [type(plan) for plan in Unions._h5plan()] == [_UnionPlan, _AttributePlan]
+
+
+def test_annotated_fields(hdf_path):
+    class Annotations(H5Group):
+        count: Optional[Annotated[H5Int64, Field(ge=0)]]
+        inner: Annotated[Inner, Field(description="inner")]
+        inners: list[Annotated[Inner, Field(description="inners")]] = []
+
+    with pytest.raises(ValidationError):
+        Annotations(count=-1, inner=Inner(value=1))
+
+    Annotations(count=2, inner=Inner(value=3), inners=[Inner(value=4)]).dump(hdf_path)
+    with Annotations.load(hdf_path) as loaded:
+        assert loaded.count == 2
+        assert loaded.inner.value == 3
+        assert loaded.inners == [Inner(value=4)]
+        assert [type(plan) for plan in Annotations._h5plan()] == [_AttributePlan, _NodePlan, _NodeListPlan]
+
+
+def test_plan_is_compiled_once_per_class():
+    assert Outer._h5plan() is Outer._h5plan()
+    assert [plan.key for plan in Derived._h5plan()][-1] == "extra"
+    assert len(Outer._h5plan()) == 5
+
+
+def test_attribute_list_roundtrip(hdf_path):
+    outer = Outer(number=1, numbers=[1, 2, 3], inner=Inner(value=2), inners=[Inner(value=3), Inner(value=4)])
+
+    outer.dump(hdf_path)
+
+    with Outer.load(hdf_path) as loaded:
+        assert loaded == outer
+
+
+def test_attribute_plan_dump(hdf_path):
+    plan = Outer._h5plan()[0]
+
+    with h5py.File(hdf_path, "w") as h5file:
+        h5file.attrs["number"] = "replaced"
+        plan.dump(5, h5file, h5file, PurePosixPath("/"))
+        assert h5file.attrs["number"] == 5
+        assert h5file.attrs["number"].dtype == np.int64
+
+
+def test_only_batched_plans_give_attributes():
+    plans = {plan.key: plan for plan in Outer._h5plan()}
+
+    assert plans["number"].batched
+    assert not plans["inner"].batched
+    with pytest.raises(NotImplementedError, match="inner: Only batched fields"):
+        plans["inner"].attr(Inner(value=1))
+
+
+def test_attribute_without_numpy_type(hdf_path):
+    class Opaque(str, H5Type):
+        h5pyid = h5py.h5t.STRING
+        numpy = np.s_
+
+    class Holder(H5Group):
+        value: Opaque
+
+    with pytest.raises(ValueError, match="value: .*Opaque.* has no numpy type"):
+        Holder(value="opaque").dump(hdf_path)
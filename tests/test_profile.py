@@ -0,0 +1,158 @@
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+
+import logging
+
+import h5pydantic
+from h5pydantic import H5Group, H5Dataset, H5Int32, H5Int64
+
+import numpy as np
+
+import pytest
+
+
+class Frames(H5Dataset, shape=(4, 3), dtype=H5Int32):
+    exposure: H5Int64 = 1
+
+
+class Detector(H5Group):
+    distance: H5Int64
+    frames: Frames
+
+
+class Experiment(H5Group):
+    energy: H5Int64
+    detector: Detector
+
+
+def test_profile(tmp_path):
+    path = tmp_path / "exp.hdf"
+    exp = Experiment(energy=12, detector=Detector(distance=200, frames=Frames()))
+
+    with h5pydantic.profile() as stats:
+        with exp.dumper(path):
+            exp.detector.frames[0] = np.arange(3, dtype=np.int32)
+
+        with Experiment.load(path) as loaded:
+            loaded.detector.frames[:2]
+
+    assert set(stats.seconds["dump"]) == {"/", "/detector", "/detector/frames"}
+    assert set(stats.seconds["load"]) == {"/", "/detector", "/detector/frames"}
+    assert stats.seconds["load"]["/"] >= stats.seconds["load"]["/detector"]
+    assert 0 < stats.validation_seconds < stats.total_seconds
+    assert stats.opens == 3
+    assert stats.attribute_writes == 3
+    assert stats.attribute_reads == 3
+    assert stats.bytes_written == {"/detector/frames": 12}
+    assert stats.bytes_read == {"/detector/frames": 24}
+
+    assert stats.as_dict()["bytes_read"] == {"/detector/frames": 24}
+    samples = dict(line.rsplit(" ", 1) for line in stats.folded().splitlines())
+    assert set(samples) == {"dump;/", "dump;/;detector", "dump;/;detector;frames",
+                            "load;/", "load;/;detector", "load;/;detector;frames"}
+
+
+def test_profile_disabled(tmp_path):
+    path = tmp_path / "exp.hdf"
+    with h5pydantic.profile() as stats:
+        pass
+
+    Experiment(energy=12, detector=Detector(distance=200, frames=Frames(data_=np.zeros((4, 3))))).dump(path)
+    Experiment.load(path).close()
+    assert stats.as_dict()["seconds"] == {}
+    assert stats.opens == 0
+
+
+def test_profile_not_nested():
+    with h5pydantic.profile():
+        with pytest.raises(RuntimeError):
+            h5pydantic.profile().__enter__()
+
+
+def test_profile_strings(tmp_path):
+    class Names(H5Dataset, shape=(2,), dtype=str):
+        pass
+
+    class Catalog(H5Group):
+        names: Names
+
+    path = tmp_path / "catalog.hdf"
+    with h5pydantic.profile() as stats:
+        catalog = Catalog(names=Names(data_=["ab", "cde"]))
+        assert catalog.names[1] == "cde"
+        catalog.dump(path)
+        with Catalog.load(path) as loaded:
+            loaded.names[()]
+            loaded.names[1]
+
+    assert stats.bytes_written == {"/names": 5}
+    assert stats.bytes_read == {"/names": 8}
+
+
+def test_profile_lazy_validation(tmp_path):
+    path = tmp_path / "exp.hdf"
+    Experiment(energy=12, detector=Detector(distance=200, frames=Frames(data_=np.zeros((4, 3))))).dump(path)
+
+    with h5pydantic.profile() as stats:
+        Experiment.load(path, lazy=True).close()
+
+    assert 0 < stats.validation_seconds < stats.total_seconds
+
+
+def test_profile_threads(tmp_path):
+    path = tmp_path / "exp.hdf"
+    Experiment(energy=12, detector=Detector(distance=200, frames=Frames(data_=np.zeros((4, 3))))).dump(path)
+
+    def load(_):
+        with Experiment.load(path) as loaded:
+            loaded.detector.frames[()]
+
+    with h5pydantic.profile() as stats:
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(load, range(40)))
+
+    assert stats.opens == 3 * 40
+    assert stats.attribute_reads == 3 * 40
+    assert stats.bytes_read == {"/detector/frames": 48 * 40}
+    assert stats.total_seconds >= stats.seconds["load"]["/"]
+
+
+def test_profile_dataset_io(tmp_path, caplog):
+    class Stacked(H5Dataset, shape=(3,), dtype=H5Int32, list_layout="stack"):
+        pass
+
+    class Appended(H5Dataset, shape=(-1, 3), dtype=H5Int32, chunks="frames"):
+        pass
+
+    class Compressed(H5Dataset, shape=(4, 3), dtype=H5Int32, chunks=(2, 3), compression="gzip"):
+        pass
+
+    class Mode(H5Int64, Enum):
+        A = 1
+
+    class Run(H5Group):
+        mode: Mode
+        counts: list[int]
+        stack: list[Stacked]
+        appended: Appended = Appended()
+        compressed: Compressed = Compressed()
+        frames: Frames = Frames()
+
+    path = tmp_path / "run.hdf"
+    run = Run(mode=Mode.A, counts=[1, 2], stack=[Stacked(data_=np.zeros(3, dtype=np.int32)) for _ in range(2)])
+    with h5pydantic.profile() as stats:
+        with run.dumper(path):
+            run.appended.extend(np.zeros((2, 3), dtype=np.int32))
+            run.compressed.write_chunks(np.zeros((4, 3), dtype=np.int32), workers=1)
+            run.frames.write_from(np.zeros((4, 3), dtype=np.int32))
+
+        with caplog.at_level(logging.INFO, logger="h5pydantic_logger"):
+            with Run.load(path) as loaded:
+                loaded.frames.read_into(np.empty((4, 3), dtype=np.int32))
+
+    assert stats.bytes_written == {"/stack": 24, "/appended": 24, "/compressed": 48, "/frames": 48}
+    assert stats.bytes_read == {"/frames": 48}
+    # The mode, the counts and the exposure of the frames.
+    assert stats.attribute_writes == 3
+    assert stats.attribute_reads == 3
+    assert "VALIDATED Frames" in caplog.text
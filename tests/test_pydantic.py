@@ -1,8 +1,10 @@
-# Tests for hacky pydantic things we're doing.
+# Tests for the pydantic behaviour h5pydantic relies on.
 
 from h5pydantic import H5Group, H5Dataset
 
-from pydantic import StrictStr
+from pydantic import StrictStr, ValidationError
+
+import pytest
 
 class Experiment(H5Group):
     name: str
@@ -11,13 +13,20 @@ class Experiment(H5Group):
 class Foo(H5Group):
     name: StrictStr
 
-def test_coerce_str_to_strictstr():
-    exp = Experiment(name="foo")
+def test_str_is_not_coerced():
+    assert Experiment(name="foo").name == "foo"
+
+    with pytest.raises(ValidationError):
+        Experiment(name=1)
 
-    field = exp.__fields__["name"]
+    with pytest.raises(ValidationError):
+        Foo(name=1)
 
-    assert field.type_ is StrictStr
+
+def test_models_only_equal_models():
+    assert Experiment(name="foo") == Experiment(name="foo")
+    assert Experiment(name="foo") != Foo(name="foo")
+    assert Experiment(name="foo") != {"name": "foo"}
 
 # FIXME test other string types, like maxlen=10, annotated(SnakeCase) etc. are coerced.
 # FIXME test all this in a dataset fields, as well as a group
-
@@ -0,0 +1,281 @@
+import h5pydantic
+from h5pydantic import H5Group, H5Dataset, H5Int32, H5Int64, H5PartialDump
+
+from typing import Optional
+
+import h5py
+
+import numpy as np
+
+import pytest
+
+
+class Frames(H5Dataset, shape=(4, 3), dtype=H5Int32):
+    exposure: H5Int64 = 1
+
+
+class Detector(H5Group):
+    distance: H5Int64
+
+
+class Experiment(H5Group):
+    energy: H5Int64
+    comment: Optional[str] = None
+    detector: Detector
+    frames: Frames
+
+
+def dumped(path) -> Experiment:
+    exp = Experiment(energy=12, comment="first", detector=Detector(distance=200),
+                     frames=Frames(data_=np.zeros((4, 3), dtype=np.int32)))
+    exp.dump(path)
+    return exp
+
+
+def test_save_writes_assigned_fields(tmp_path):
+    path = tmp_path / "exp.hdf"
+    dumped(path)
+
+    with Experiment.load(path, mode="r+") as exp:
+        exp.energy = 13
+        exp.detector.distance = 250
+        exp.frames.exposure = 5
+        # Written behind the model's back, so only rewritten if save() writes unchanged fields.
+        exp._h5file.attrs["comment"] = "external"
+        exp.save()
+
+    with Experiment.load(path) as exp:
+        assert exp.energy == 13
+        assert exp.detector.distance == 250
+        assert exp.frames.exposure == 5
+        assert exp.comment == "external"
+
+
+def test_save_dataset_regions(tmp_path):
+    path = tmp_path / "exp.hdf"
+    dumped(path)
+
+    with Experiment.load(path, mode="r+") as exp:
+        exp.frames[1] = [1, 2, 3]
+        exp.save()
+
+    with Experiment.load(path) as exp:
+        assert np.array_equal(exp.frames[()], [[0, 0, 0], [1, 2, 3], [0, 0, 0], [0, 0, 0]])
+
+
+def test_save_replaced_nodes_and_removed_attributes(tmp_path):
+    path = tmp_path / "exp.hdf"
+    dumped(path)
+
+    with Experiment.load(path, mode="r+") as exp:
+        exp.comment = None
+        exp.detector = Detector(distance=300)
+        exp.frames = Frames(data_=np.ones((4, 3), dtype=np.int32), exposure=2)
+        exp.save()
+
+    with Experiment.load(path) as exp:
+        assert exp.comment is None
+        assert exp.detector.distance == 300
+        assert exp.frames.exposure == 2
+        assert np.array_equal(exp.frames[()], np.ones((4, 3)))
+
+
+def test_save_reassigned_loaded_datasets(tmp_path):
+    class Runs(H5Group):
+        frames: list[Frames]
+
+    path = tmp_path / "runs.hdf"
+    Runs(frames=[Frames(data_=np.full((4, 3), i, dtype=np.int32), exposure=i) for i in (1, 2)]).dump(path)
+
+    with Runs.load(path, mode="r+") as runs:
+        runs.frames = list(runs.frames) + [Frames(data_=np.full((4, 3), 9, dtype=np.int32))]
+        runs.save()
+
+    with Runs.load(path) as runs:
+        assert [frames[0, 0] for frames in runs.frames] == [1, 2, 9]
+        assert [frames.exposure for frames in runs.frames] == [1, 2, 1]
+
+    # Reordering moves the datasets along with their data.
+    with Runs.load(path, mode="r+") as runs:
+        runs.frames = runs.frames[::-1]
+        runs.save()
+
+    with Runs.load(path) as runs:
+        assert [frames[0, 0] for frames in runs.frames] == [9, 2, 1]
+
+
+def test_dump_loaded_model(tmp_path):
+    path = tmp_path / "exp.hdf"
+    dumped(path)
+    with h5py.File(path, "a") as h5file:
+        h5file["frames"][0, 0] = 5
+
+    with Experiment.load(path) as exp:
+        exp.dump(tmp_path / "copy.hdf")
+
+    with Experiment.load(tmp_path / "copy.hdf") as copy:
+        assert copy.frames[0, 0] == 5
+        assert copy.frames.exposure == 1
+
+
+def test_save_lazy(tmp_path):
+    path = tmp_path / "exp.hdf"
+    dumped(path)
+
+    with Experiment.load(path, lazy=True, mode="r+") as exp:
+        exp.energy = 14
+        exp.save()
+        assert set(exp._h5lazy) == {"detector", "frames"}
+
+    with Experiment.load(path) as exp:
+        assert exp.energy == 14
+        assert exp.detector.distance == 200
+
+
+def test_save_needs_writable_file(tmp_path):
+    path = tmp_path / "exp.hdf"
+    dumped(path)
+
+    with Experiment.load(path) as exp:
+        exp.energy = 13
+        with pytest.raises(ValueError, match="mode='r\\+'"):
+            exp.save()
+
+    with pytest.raises(ValueError, match="mode='r\\+'"):
+        Experiment(energy=1, detector=Detector(distance=1), frames=Frames()).save()
+
+
+def test_dump_append(tmp_path):
+    path = tmp_path / "exp.hdf"
+    exp = dumped(path)
+
+    with h5py.File(path, "r+") as h5file:
+        h5file.attrs["comment"] = "external"
+    exp.energy = 15
+    exp.dump(path, mode="a")
+
+    with Experiment.load(path) as loaded:
+        assert loaded.energy == 15
+        assert loaded.comment == "external"
+        assert np.array_equal(loaded.frames[()], np.zeros((4, 3)))
+
+
+def test_dump_append_new_file(tmp_path):
+    path = tmp_path / "exp.hdf"
+    Experiment(energy=1, detector=Detector(distance=2),
+               frames=Frames(data_=np.ones((4, 3), dtype=np.int32))).dump(path, mode="a")
+
+    with Experiment.load(path) as loaded:
+        assert loaded.detector.distance == 2
+        assert np.array_equal(loaded.frames[()], np.ones((4, 3)))
+
+
+def test_dump_append_other_file(tmp_path):
+    path = tmp_path / "exp.hdf"
+    dumped(path)
+
+    with Experiment.load(path) as exp:
+        exp.energy = 16
+        exp.dump(tmp_path / "copy.hdf", mode="a")
+
+    with Experiment.load(tmp_path / "copy.hdf") as copy:
+        assert copy.energy == 16
+        assert copy.comment == "first"
+        assert copy.detector.distance == 200
+        assert np.array_equal(copy.frames[()], np.zeros((4, 3)))
+
+
+def test_dump_append_same_file_by_another_path(tmp_path, monkeypatch):
+    path = tmp_path / "exp.hdf"
+    exp = dumped(path)
+
+    with h5py.File(path, "r+") as h5file:
+        h5file.attrs["comment"] = "external"
+    exp.energy = 17
+    monkeypatch.chdir(tmp_path)
+    exp.dump("exp.hdf", mode="a")
+
+    with Experiment.load(path) as loaded:
+        assert loaded.energy == 17
+        assert loaded.comment == "external"
+
+
+def test_dump_append_partial(tmp_path):
+    with pytest.raises(H5PartialDump):
+        Experiment(energy=1, detector=Detector(distance=2), frames=Frames()).dump(tmp_path / "exp.hdf", mode="a")
+
+
+def test_dump_unknown_mode(tmp_path):
+    with pytest.raises(ValueError, match="Unknown mode 'x'"):
+        Experiment(energy=1, detector=Detector(distance=2), frames=Frames()).dump(tmp_path / "exp.hdf", mode="x")
+
+
+def test_save_unassigned_fields(tmp_path):
+    class Runs(H5Group):
+        comment: Optional[str] = None
+        detectors: list[Detector]
+
+    path = tmp_path / "runs.hdf"
+    Runs(detectors=[Detector(distance=1)]).dump(path)
+
+    with Runs.load(path, mode="r+") as runs:
+        # Changes inside lists aren't tracked, but the elements are saved, and new ones dumped.
+        runs.detectors[0].distance = 2
+        runs.detectors.append(Detector(distance=3))
+        runs.save()
+
+    with Runs.load(path) as runs:
+        assert runs.comment is None
+        assert [detector.distance for detector in runs.detectors] == [2, 3]
+
+    with Runs.load(path, lazy=True, mode="r+") as runs:
+        assert len(runs.detectors) == 2
+        runs.comment = "lazy"
+        runs.save()
+        # Elements not loaded yet can't have changed.
+        assert list.__repr__(runs.detectors) == "[<unloaded>, <unloaded>]"
+
+
+def test_dump_append_lazy(tmp_path):
+    path = tmp_path / "exp.hdf"
+    dumped(path)
+
+    with Experiment.load(path, lazy=True) as exp:
+        pass
+    # The deferred fields aren't needed, as they are in the file already.
+    exp.energy = 18
+    exp.dump(path, mode="a")
+
+    with Experiment.load(path) as loaded:
+        assert loaded.energy == 18
+        assert loaded.detector.distance == 200
+
+
+def test_dump_loaded_stack_element(tmp_path):
+    class Frame(H5Dataset, shape=(3,), dtype=H5Int32, list_layout="stack"):
+        pass
+
+    class Stacked(H5Group):
+        frames: list[Frame]
+        first: Optional[Frame] = None
+
+    path = tmp_path / "stack.hdf"
+    Stacked(frames=[Frame(data_=np.full(3, i, dtype=np.int32)) for i in range(2)]).dump(path)
+
+    with Stacked.load(path, mode="r+") as stacked:
+        stacked.first = stacked.frames[1]
+        stacked.save()
+
+    with Stacked.load(path) as stacked:
+        assert stacked.first[()].tolist() == [1, 1, 1]
+
+
+def test_profile_dump_loaded_model(tmp_path):
+    path = tmp_path / "exp.hdf"
+    dumped(path)
+
+    with h5pydantic.profile() as stats:
+        with Experiment.load(path) as exp:
+            exp.dump(tmp_path / "copy.hdf")
+
+    assert stats.bytes_written == {"/frames": 48}
@@ -0,0 +1,221 @@
+from h5pydantic import H5Group, H5Dataset, H5Int32, H5Int64, H5VirtualDataset
+
+import h5py
+
+import numpy as np
+
+import pickle
+
+import pytest
+
+from typing import Optional
+
+
+class Frame(H5Dataset, shape=(2, 3), dtype=H5Int32, list_layout="stack"):
+    pass
+
+
+class Experiment(H5Group):
+    scan: H5Int64
+    frames: list[Frame]
+
+
+def frames(count: int) -> list[np.ndarray]:
+    return [np.full((2, 3), i, dtype=np.int32) for i in range(count)]
+
+
+def test_stack_roundtrip(tmp_path):
+    path = tmp_path / "stack.hdf"
+    Experiment(scan=1, frames=[Frame(data_=frame) for frame in frames(5)]).dump(path)
+
+    with h5py.File(path, "r") as h5file:
+        assert h5file["frames"].shape == (5, 2, 3)
+        assert h5file["frames"].chunks is not None
+
+    with Experiment.load(path) as exp:
+        assert len(exp.frames) == 5
+        assert np.array_equal(exp.frames[3][()], frames(5)[3])
+        assert exp.frames[3][1, 2] == 3
+        assert np.array_equal(exp.frames[4][:, 0], [4, 4])
+
+        stack = exp.stacked("frames")
+        assert isinstance(stack, h5py.Dataset)
+        assert np.array_equal(stack[1:3, 0, 0], [1, 2])
+
+    assert Experiment.validate_file(path) == []
+
+
+def test_stack_lazy(tmp_path):
+    path = tmp_path / "stack.hdf"
+    Experiment(scan=1, frames=[Frame(data_=frame) for frame in frames(3)]).dump(path)
+
+    with Experiment.load(path, lazy=True) as exp:
+        assert set(exp._h5lazy) == {"frames"}
+        assert isinstance(exp.stacked("frames"), h5py.Dataset)
+        assert exp._h5lazy == {}
+        assert np.array_equal(exp.frames[2][()], frames(3)[2])
+
+
+def test_stack_dumper(tmp_path):
+    path = tmp_path / "stack.hdf"
+    exp = Experiment(scan=1, frames=[Frame() for _ in range(3)])
+    with exp.dumper(path):
+        for (i, frame) in enumerate(frames(3)):
+            exp.frames[i][()] = frame
+        exp.frames[0][0, 0] = 7
+
+    with Experiment.load(path) as loaded:
+        assert np.array_equal(loaded.stacked("frames")[:, 1, 1], [0, 1, 2])
+        assert loaded.frames[0][0, 0] == 7
+
+
+def test_stack_not_in_file():
+    exp = Experiment(scan=1, frames=[Frame(data_=frame) for frame in frames(2)])
+    assert np.array_equal(exp.stacked("frames"), np.stack(frames(2)))
+    assert exp.stacked("frames").shape == (2, 2, 3)
+
+    with pytest.raises(ValueError, match="not a list stored as a stack"):
+        exp.stacked("scan")
+
+
+def test_stack_mismatch(tmp_path):
+    path = tmp_path / "stack.hdf"
+    with h5py.File(path, "w") as h5file:
+        h5file.attrs["scan"] = 1
+        h5file["frames"] = np.zeros((4, 3, 3), dtype=np.int32)
+
+    with pytest.raises(ValueError, match="Shape"):
+        Experiment.load(path)
+    assert [mismatch.kind for mismatch in Experiment.validate_file(path)] == ["shape", "layout"]
+
+
+def test_stack_needs_fixed_shape_without_attributes():
+    with pytest.raises(ValueError):
+        class Appendable(H5Dataset, shape=(-1, 3), dtype=H5Int32, list_layout="stack"):
+            pass
+
+    with pytest.raises(TypeError, match="without attributes"):
+        class WithAttribute(H5Dataset, shape=(3,), dtype=H5Int32, list_layout="stack"):
+            exposure: H5Int64
+
+
+def test_stack_detach_and_reopen(tmp_path):
+    path = tmp_path / "stack.hdf"
+    Experiment(scan=1, frames=[Frame(data_=frame) for frame in frames(3)]).dump(path)
+
+    with Experiment.load(path) as exp:
+        pass
+    detached = pickle.loads(pickle.dumps(exp._detach()))
+    with detached.reopen(path):
+        assert np.array_equal(detached.frames[2][()], frames(3)[2])
+
+
+def test_stack_element_limits(tmp_path):
+    path = tmp_path / "stack.hdf"
+    Experiment(scan=1, frames=[Frame(data_=frame) for frame in frames(2)]).dump(path)
+
+    with Experiment.load(path) as exp:
+        with pytest.raises(ValueError, match="stacked list"):
+            exp.frames[0].read_into(np.empty((2, 3), dtype=np.int32))
+
+
+def test_stack_save_keeps_loaded_elements(tmp_path):
+    path = tmp_path / "stack.hdf"
+    Experiment(scan=1, frames=[Frame(data_=frame) for frame in frames(2)]).dump(path)
+
+    with Experiment.load(path, mode="r+") as exp:
+        exp.frames = list(exp.frames) + [Frame(data_=np.full((2, 3), 9, dtype=np.int32))]
+        exp.save()
+
+    with Experiment.load(path) as loaded:
+        assert loaded.stacked("frames")[:, 0, 0].tolist() == [0, 1, 9]
+
+
+def test_stack_dump_loaded_model(tmp_path):
+    path = tmp_path / "stack.hdf"
+    Experiment(scan=1, frames=[Frame(data_=frame) for frame in frames(3)]).dump(path)
+
+    with Experiment.load(path) as exp:
+        exp.dump(tmp_path / "copy.hdf")
+
+    with Experiment.load(tmp_path / "copy.hdf") as copy:
+        assert copy.stacked("frames")[:, 1, 2].tolist() == [0, 1, 2]
+
+
+def test_stack_partial_and_empty(tmp_path):
+    path = tmp_path / "stack.hdf"
+    exp = Experiment(scan=1, frames=[Frame(data_=frames(2)[1]), Frame()])
+    exp.dump(path, partial=True)
+
+    with Experiment.load(path) as loaded:
+        assert loaded.stacked("frames")[:, 0, 0].tolist() == [1, 0]
+
+    empty = Experiment(scan=1, frames=[])
+    assert empty.stacked("frames").shape == (0, 2, 3)
+    empty.dump(path)
+    with Experiment.load(path) as loaded:
+        assert loaded.frames == []
+
+
+@pytest.mark.parametrize("chunks,stored", [(None, ((1 << 20) // 24, 2, 3)), ((1, 3), (1, 1, 3)), ("frames", (1, 1, 3)),
+                                           (True, True)])
+def test_stack_chunks(tmp_path, chunks, stored):
+    class Chunked(H5Dataset, shape=(2, 3), dtype=H5Int32, list_layout="stack", chunks=chunks):
+        pass
+
+    class Chunks(H5Group):
+        frames: list[Chunked]
+
+    path = tmp_path / "stack.hdf"
+    Chunks(frames=[Chunked(data_=frame) for frame in frames(2)]).dump(path)
+    with h5py.File(path, "r") as h5file:
+        assert h5file["frames"].chunks == stored or (stored is True and h5file["frames"].chunks)
+
+
+def test_stack_stored_otherwise(tmp_path):
+    path = tmp_path / "stack.hdf"
+    with h5py.File(path, "w") as h5file:
+        h5file.attrs["scan"] = 1
+        h5file.create_group("frames")
+
+    with pytest.raises(ValueError, match="not a dataset"):
+        Experiment.load(path)
+    assert [mismatch.kind for mismatch in Experiment.validate_file(path)] == ["node"]
+
+    with h5py.File(path, "w") as h5file:
+        h5file.attrs["scan"] = 1
+        h5file["frames"] = np.zeros((4, 6), dtype=np.int32)
+
+    with pytest.raises(ValueError, match="Dimensions"):
+        Experiment.load(path)
+
+
+def test_optional_stack(tmp_path):
+    class Optionally(H5Group):
+        frames: Optional[list[Frame]] = None
+
+    path = tmp_path / "stack.hdf"
+    Optionally().dump(path)
+    with Optionally.load(path) as loaded:
+        assert loaded.frames is None
+    assert Optionally.validate_file(path) == []
+
+    with Optionally.load(path, mode="r+") as loaded:
+        loaded.frames = [Frame(data_=frame) for frame in frames(2)]
+        loaded.save()
+        loaded.frames = [Frame(data_=frame) for frame in frames(3)]
+        loaded.save()
+
+    with Optionally.load(path) as loaded:
+        assert loaded.stacked("frames").shape == (3, 2, 3)
+
+    # Appending to a file the model wasn't loaded from writes the whole tree over it.
+    Optionally(frames=[Frame(data_=frame) for frame in frames(1)]).dump(path, mode="a")
+    with Optionally.load(path) as loaded:
+        assert loaded.stacked("frames").shape == (1, 2, 3)
+
+
+def test_virtual_stack_fails():
+    with pytest.raises(ValueError, match="list_layout='stack'"):
+        class Virtual(H5VirtualDataset, shape=(2, 3), dtype=H5Int32, list_layout="stack"):
+            pass
@@ -0,0 +1,126 @@
+from h5pydantic import H5Group, H5Dataset, H5Int32
+
+import h5py
+
+import numpy as np
+
+import pytest
+
+
+class Frames(H5Dataset, shape=(4, 8, 8), dtype=H5Int32, chunks="frames", compression="gzip",
+             compression_opts=6, shuffle=True, fletcher32=True):
+    pass
+
+
+class Experiment(H5Group):
+    frames: Frames = Frames()
+
+
+def test_storage_options_are_written(hdf_path):
+    exp = Experiment()
+
+    with exp.dumper(hdf_path):
+        exp.frames[()] = np.arange(4 * 8 * 8).reshape((4, 8, 8))
+
+    with h5py.File(hdf_path, "r") as h5file:
+        dset = h5file["frames"]
+        assert dset.chunks == (1, 8, 8)
+        assert dset.compression == "gzip"
+        assert dset.compression_opts == 6
+        assert dset.shuffle
+        assert dset.fletcher32
+
+    with Experiment.load(hdf_path) as loaded:
+        assert np.array_equal(loaded.frames[2], np.arange(128, 192).reshape((8, 8)))
+
+
+def test_storage_layout_mismatch_fails(hdf_path):
+    class Lzf(H5Dataset, shape=(4, 8, 8), dtype=H5Int32, compression="lzf"):
+        pass
+
+    class LzfExperiment(H5Group):
+        frames: Lzf = Lzf()
+
+    class Unshuffled(H5Dataset, shape=(4, 8, 8), dtype=H5Int32, shuffle=False):
+        pass
+
+    class UnshuffledExperiment(H5Group):
+        frames: Unshuffled = Unshuffled()
+
+    exp = Experiment()
+    exp.dump(hdf_path, partial=True)
+
+    with pytest.raises(ValueError, match="compression"):
+        LzfExperiment.load(hdf_path)
+    with pytest.raises(ValueError, match="shuffle"):
+        UnshuffledExperiment.load(hdf_path)
+
+
+@pytest.mark.parametrize("storage,stored,match", [
+    ({"chunks": True}, {}, "chunked, H5 data is contiguous"),
+    ({"chunks": (2, 8, 8)}, {"chunks": (1, 8, 8)}, "chunks"),
+    ({"compression": 32000}, {"compression": "gzip"}, "filter 32000 not found"),
+    ({"compression": "gzip", "compression_opts": 4}, {"compression": "gzip", "compression_opts": 6}, "compression_opts"),
+    ({"scaleoffset": 0}, {}, "scaleoffset"),
+])
+def test_storage_layout_mismatches(hdf_path, storage, stored, match):
+    class Stored(H5Dataset, shape=(4, 8, 8), dtype=H5Int32, **storage):
+        pass
+
+    class StoredExperiment(H5Group):
+        frames: Stored = Stored()
+
+    with h5py.File(hdf_path, "w") as h5file:
+        h5file.create_dataset("frames", data=np.zeros((4, 8, 8), dtype=np.int32), **stored)
+
+    with pytest.raises(ValueError, match=match):
+        StoredExperiment.load(hdf_path)
+    assert [mismatch.kind for mismatch in StoredExperiment.validate_file(hdf_path)] == ["layout"]
+
+
+def test_storage_compression_filter_ids(hdf_path):
+    # The gzip filter is number 1.
+    class Deflated(H5Dataset, shape=(4, 8, 8), dtype=H5Int32, compression=1):
+        pass
+
+    class DeflatedExperiment(H5Group):
+        frames: Deflated = Deflated()
+
+    with h5py.File(hdf_path, "w") as h5file:
+        h5file.create_dataset("frames", data=np.zeros((4, 8, 8), dtype=np.int32), compression="gzip")
+
+    assert DeflatedExperiment.validate_file(hdf_path) == []
+
+
+def test_storage_options_not_set_are_not_checked(hdf_path):
+    class Plain(H5Dataset, shape=(4, 8, 8), dtype=H5Int32):
+        pass
+
+    class PlainExperiment(H5Group):
+        frames: Plain = Plain()
+
+    exp = Experiment()
+    with exp.dumper(hdf_path):
+        exp.frames[()] = np.ones((4, 8, 8))
+
+    assert PlainExperiment.validate_file(hdf_path) == []
+    with PlainExperiment.load(hdf_path) as loaded:
+        assert loaded.frames[0, 0, 0] == 1
+
+
+def test_frames_chunking_needs_frames():
+    with pytest.raises(ValueError, match="at least two dimensions"):
+        class Line(H5Dataset, shape=(10,), dtype=H5Int32, chunks="frames"):
+            pass
+
+
+def test_chunks_must_match_shape():
+    with pytest.raises(ValueError, match="same number of dimensions"):
+        class Image(H5Dataset, shape=(10, 10), dtype=H5Int32, chunks=(10,)):
+            pass
+
+
+def test_compression_opts_needs_compression():
+    with pytest.raises(ValueError, match="compression_opts given without compression"):
+        class Image(H5Dataset, shape=(10, 10), dtype=H5Int32, compression_opts=4):
+            pass
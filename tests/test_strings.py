@@ -0,0 +1,81 @@
+from h5pydantic import H5Group, H5Dataset
+
+import h5py
+
+import numpy as np
+
+import pytest
+
+
+class Names(H5Dataset, shape=(3,), dtype=str):
+    pass
+
+
+class FixedNames(H5Dataset, shape=(3,), dtype=str, string_length=8, string_encoding="ascii", string_array="U"):
+    pass
+
+
+class Experiment(H5Group):
+    names: Names = Names()
+    fixed: FixedNames = FixedNames()
+
+
+def test_string_slices_are_numpy_arrays(hdf_path):
+    exp = Experiment()
+
+    with exp.dumper(hdf_path):
+        exp.names[()] = ["alpha", "béta", "gamma"]
+        exp.fixed[()] = ["a", "bb", "ccc"]
+
+    with h5py.File(hdf_path, "r") as h5file:
+        assert h5py.check_string_dtype(h5file["names"].dtype) == ("utf-8", None)
+        assert h5py.check_string_dtype(h5file["fixed"].dtype) == ("ascii", 8)
+
+    with Experiment.load(hdf_path) as loaded:
+        names = loaded.names[:]
+        assert isinstance(names.dtype, np.dtypes.StringDType)
+        assert names.tolist() == ["alpha", "béta", "gamma"]
+        assert loaded.names[1] == "béta"
+
+        fixed = loaded.fixed[1:]
+        assert fixed.dtype == np.dtype("U3")
+        assert fixed.tolist() == ["bb", "ccc"]
+
+
+def test_strings_must_fit(hdf_path):
+    exp = Experiment()
+
+    with exp.dumper(hdf_path):
+        with pytest.raises(ValueError, match="string_length"):
+            exp.fixed[()] = ["a", "b", "too long for eight"]
+
+        with pytest.raises(ValueError, match="ascii"):
+            exp.fixed[()] = ["a", "b", "é"]
+
+        exp.names[()] = ["a", "b", "c"]
+        exp.fixed[()] = ["a", "b", "c"]
+
+
+def test_string_layout_mismatch_fails(hdf_path):
+    Experiment(names=Names(data_=["a", "b", "c"]), fixed=FixedNames(data_=["a", "b", "c"])).dump(hdf_path)
+
+    class LongerNames(H5Dataset, shape=(3,), dtype=str, string_length=16, string_encoding="ascii"):
+        pass
+
+    class Other(H5Group):
+        fixed: LongerNames
+
+    with pytest.raises(ValueError, match="length 16 ascii strings"):
+        Other.load(hdf_path)
+
+
+def test_string_options_need_str():
+    with pytest.raises(ValueError, match="string_length is only for dtype=str"):
+        class Numbers(H5Dataset, shape=(3,), dtype=float, string_length=8):
+            pass
+
+
+def test_string_length_must_be_positive():
+    with pytest.raises(ValueError, match="string_length must be positive"):
+        class Empty(H5Dataset, shape=(3,), dtype=str, string_length=0):
+            pass
@@ -0,0 +1,79 @@
+from h5pydantic import H5Group, H5Dataset, H5Int32
+
+import h5py
+
+import numpy as np
+
+import pytest
+
+
+class Frames(H5Dataset, shape=(-1, 4), dtype=H5Int32, chunks="frames"):
+    pass
+
+
+class Experiment(H5Group):
+    count: H5Int32 = 0
+    frames: Frames = Frames()
+
+
+def test_swmr_reader_follows_writer(hdf_path):
+    exp = Experiment(count=3)
+
+    with exp.dumper(hdf_path, swmr=True):
+        exp.frames.append(np.arange(4))
+
+        with Experiment.load(hdf_path, swmr=True) as live:
+            assert live.count == 3
+            assert [frame.tolist() for frame in live.frames.new_frames()] == [[0, 1, 2, 3]]
+            assert list(live.frames.new_frames()) == []
+
+            exp.frames.extend(np.ones((2, 4)))
+            # Writes are flushed, and storage only covers the frames written.
+            assert live.frames.refresh() == (3, 4)
+            assert [frame.tolist() for frame in live.frames.new_frames()] == [[1] * 4, [1] * 4]
+
+    with h5py.File(hdf_path, "r") as h5file:
+        assert h5file["frames"].shape == (3, 4)
+
+
+
+def test_swmr_reader_follows_list_elements(hdf_path):
+    class Runs(H5Group):
+        runs: list[Frames] = []
+
+    exp = Runs(runs=[Frames(), Frames()])
+
+    with exp.dumper(hdf_path, partial=True, swmr=True):
+        exp.runs[1].append(np.arange(4))
+
+        with Runs.load(hdf_path, swmr=True) as live:
+            assert live.runs[1].refresh() == (1, 4)
+            assert live.runs[0].refresh() == (0, 4)
+
+            exp.runs[1].append(np.ones(4))
+            exp.runs[1].append(np.ones(4))
+            # Storage only covers the frames written, as for datasets outside lists.
+            assert live.runs[1].refresh() == (3, 4)
+            assert [frame.tolist() for frame in live.runs[1].new_frames()] == [[0, 1, 2, 3], [1] * 4, [1] * 4]
+
+
+def test_new_frames_stopped_early(hdf_path):
+    exp = Experiment()
+
+    with exp.dumper(hdf_path, swmr=True):
+        exp.frames.extend(np.arange(12).reshape(3, 4))
+
+        with Experiment.load(hdf_path, swmr=True) as live:
+            assert next(live.frames.new_frames()).tolist() == [0, 1, 2, 3]
+            # The frames not yet yielded are given by the next call.
+            assert [frame[0] for frame in live.frames.new_frames()] == [4, 8]
+
+
+def test_new_frames_checks():
+    class Scalar(H5Dataset, shape=(), dtype=H5Int32):
+        pass
+
+    with pytest.raises(ValueError, match="scalar dataset"):
+        next(Scalar().new_frames())
+    with pytest.raises(ValueError, match="refresh needs a dataset"):
+        Frames().refresh()
@@ -0,0 +1,128 @@
+from h5pydantic import H5Group, H5Int32
+
+import h5py
+
+import numpy as np
+
+from typing import Optional
+
+import pytest
+
+
+class Position(H5Group, list_layout="table"):
+    motor: str
+    step: H5Int32
+    value: float
+
+
+class Reading(H5Group, list_layout="columns"):
+    step: H5Int32
+    value: float
+
+
+class Scan(H5Group):
+    positions: list[Position] = []
+    readings: list[Reading] = []
+
+
+@pytest.fixture
+def scan():
+    return Scan(positions=[Position(motor=f"m{i}", step=i, value=i / 2) for i in range(10)],
+                readings=[Reading(step=i, value=i * 2.0) for i in range(5)])
+
+
+def test_table_layout(hdf_path, scan):
+    scan.dump(hdf_path)
+
+    with h5py.File(hdf_path, "r") as h5file:
+        assert isinstance(h5file["positions"], h5py.Dataset)
+        assert h5file["positions"].shape == (10,)
+        assert h5file["positions"].dtype.names == ("motor", "step", "value")
+        assert set(h5file["readings"].keys()) == {"step", "value"}
+
+    with Scan.load(hdf_path) as loaded:
+        assert loaded == scan
+        assert isinstance(loaded.positions[3], Position)
+        assert loaded.positions[3].motor == "m3"
+
+
+def test_table_columns(hdf_path, scan):
+    scan.dump(hdf_path)
+
+    with Scan.load(hdf_path) as loaded:
+        columns = loaded.columns("positions")
+        assert np.array_equal(columns["step"], np.arange(10))
+        assert columns["step"].dtype == np.int32
+        assert list(columns["motor"]) == [f"m{i}" for i in range(10)]
+        assert np.array_equal(loaded.columns("readings")["value"], np.arange(5) * 2.0)
+
+        loaded.readings = loaded.readings + [Reading(step=5, value=10.0)]
+        assert np.array_equal(loaded.columns("readings")["step"], np.arange(6))
+
+
+def test_table_columns_lazy(hdf_path, scan):
+    scan.dump(hdf_path)
+
+    with Scan.load(hdf_path, lazy=True) as loaded:
+        assert set(loaded._h5lazy) == {"positions", "readings"}
+        columns = loaded.columns("positions")
+        assert "positions" not in loaded._h5lazy
+        assert np.array_equal(columns["value"], np.arange(10) / 2)
+        # The columns read from the file are kept, rather than made again from the elements.
+        assert loaded.columns("positions") is columns
+        assert loaded.positions == scan.positions
+
+
+def test_table_columns_not_loaded(scan):
+    assert np.array_equal(scan.columns("readings")["step"], np.arange(5))
+
+
+def test_optional_table(hdf_path, scan):
+    class Optionally(H5Group):
+        positions: Optional[list[Position]] = None
+
+    Optionally().dump(hdf_path)
+    for lazy in (False, True):
+        with Optionally.load(hdf_path, lazy=lazy) as loaded:
+            assert loaded.positions is None
+
+    # Appending to a file the model wasn't loaded from writes the table over it.
+    Optionally(positions=scan.positions).dump(hdf_path, mode="a")
+    Optionally(positions=scan.positions[:2]).dump(hdf_path, mode="a")
+    with Optionally.load(hdf_path) as loaded:
+        assert loaded.positions == scan.positions[:2]
+
+
+def test_empty_table(hdf_path):
+    Scan().dump(hdf_path)
+
+    with Scan.load(hdf_path) as loaded:
+        assert loaded.positions == []
+        assert loaded.readings == []
+
+
+def test_table_needs_scalars():
+    with pytest.raises(TypeError, match="needs non-optional scalar attributes"):
+        class Nested(H5Group, list_layout="table"):
+            position: Position
+
+    with pytest.raises(TypeError, match="needs non-optional scalar attributes"):
+        class Maybe(H5Group, list_layout="columns"):
+            value: Optional[float] = None
+
+
+def test_unknown_list_layout():
+    with pytest.raises(ValueError, match="Unknown list_layout 'rows'"):
+        class Rows(H5Group, list_layout="rows"):
+            value: float
+
+
+def test_columns_needs_table(scan):
+    class Plain(H5Group):
+        value: float
+
+    class Container(H5Group):
+        plains: list[Plain] = []
+
+    with pytest.raises(ValueError, match="not a list stored as a table"):
+        Container().columns("plains")
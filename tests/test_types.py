@@ -1,7 +1,15 @@
-from h5pydantic.types import H5Int32, H5Int64, _pytype_to_h5type
+from h5pydantic import H5Group
+from h5pydantic.types import H5Int32, H5Int64, H5List, H5String, _pytype_to_h5type, _pytype_to_numpy
+
+from pydantic import PydanticSchemaGenerationError, ValidationError
 
 import h5py
 
+import numpy as np
+
+from enum import Enum
+from typing import Literal
+
 import pytest
 
 def test_integer_minimum_works(tmp_path):
@@ -41,3 +49,33 @@ def test_outside_integer_maximum_fails(tmp_path):
 def test_unknown_pytypes():
     with pytest.raises(ValueError):
         _pytype_to_h5type(tuple)
+
+
+def test_known_pytypes():
+    assert _pytype_to_h5type(H5Int32) is h5py.h5t.NATIVE_INT32
+    assert _pytype_to_h5type(float) is float
+    assert h5py.check_string_dtype(_pytype_to_h5type(str)).encoding == "utf-8"
+
+
+def test_validation_of_other_types():
+    class Strings(H5Group):
+        name: H5String
+
+    assert Strings(name="name").name == "name"
+    with pytest.raises(ValidationError):
+        Strings(name=1)
+
+    # Types without a builtin equivalent are left to pydantic.
+    with pytest.raises(PydanticSchemaGenerationError):
+        class Lists(H5Group):
+            values: H5List
+
+
+def test_literal_and_enum_pytypes():
+    class Mode(H5Int32, Enum):
+        FAST = 1
+
+    assert h5py.check_string_dtype(_pytype_to_h5type(Literal["a", "b"])).encoding == "utf-8"
+    with pytest.raises(ValueError, match="all be of one type"):
+        _pytype_to_h5type(Literal["a", 1])
+    assert _pytype_to_numpy(Mode) == np.int32
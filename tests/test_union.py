@@ -0,0 +1,152 @@
+from h5pydantic import H5Group, H5Dataset, H5Int32, H5Int64
+from h5pydantic.types import H5Float64
+
+import h5py
+
+import numpy as np
+
+from typing import Literal, Union
+
+import pytest
+
+
+class Small(H5Dataset, shape=(2, 2), dtype=H5Int32):
+    pass
+
+
+class Large(H5Dataset, shape=(4, 4), dtype=H5Int32):
+    pass
+
+
+class Stack(H5Dataset, shape=(-1, 2, 2), dtype=H5Int32):
+    pass
+
+
+class Experiment(H5Group):
+    image: Union[Small, Large, Stack]
+
+
+@pytest.mark.parametrize("klass,shape", [(Small, (2, 2)), (Large, (4, 4)), (Stack, (3, 2, 2))])
+def test_union_resolved_on_shape(hdf_path, klass, shape):
+    data = np.arange(np.prod(shape), dtype=np.int32).reshape(shape)
+    Experiment(image=klass(data_=data)).dump(hdf_path)
+
+    with Experiment.load(hdf_path) as loaded:
+        assert type(loaded.image) is klass
+        assert np.array_equal(loaded.image[()], data)
+
+
+def test_union_does_not_read_data(hdf_path, monkeypatch):
+    Experiment(image=Large(data_=np.zeros((4, 4), dtype=np.int32))).dump(hdf_path)
+
+    reads = []
+    monkeypatch.setattr(h5py.Dataset, "__getitem__", lambda self, key: reads.append(key))
+
+    with Experiment.load(hdf_path) as loaded:
+        assert type(loaded.image) is Large
+    assert reads == []
+
+
+def test_union_resolved_on_dtype(hdf_path):
+    class Ints(H5Dataset, shape=(2,), dtype=H5Int64):
+        pass
+
+    class Floats(H5Dataset, shape=(2,), dtype=H5Float64):
+        pass
+
+    class Values(H5Group):
+        values: Union[Ints, Floats]
+
+    Values(values=Floats(data_=np.array([1.5, 2.5]))).dump(hdf_path)
+
+    with Values.load(hdf_path) as loaded:
+        assert type(loaded.values) is Floats
+
+
+def test_union_resolved_on_discriminator(hdf_path):
+    class Dark(H5Dataset, shape=(2, 2), dtype=H5Int32):
+        kind: Literal["dark"] = "dark"
+
+    class Flat(H5Dataset, shape=(2, 2), dtype=H5Int32):
+        kind: Literal["flat"] = "flat"
+
+    class Calibration(H5Group):
+        frame: Union[Dark, Flat]
+
+    Calibration(frame=Flat(data_=np.ones((2, 2), dtype=np.int32))).dump(hdf_path)
+
+    with Calibration.load(hdf_path) as loaded:
+        assert type(loaded.frame) is Flat
+
+    # As a fixed length string, h5py reads the tag as bytes, which still picks Flat.
+    with h5py.File(hdf_path, "r+") as h5file:
+        h5file["frame"].attrs["kind"] = np.bytes_(b"flat")
+    assert Calibration.validate_file(hdf_path) == []
+
+    # An unknown tag falls back to the shape, which both match, so the first is picked.
+    with h5py.File(hdf_path, "r+") as h5file:
+        h5file["frame"].attrs["kind"] = "bright"
+    with pytest.raises(ValueError, match="Input should be 'dark'"):
+        Calibration.load(hdf_path)
+
+
+def test_union_no_match(hdf_path):
+    class Other(H5Group):
+        image: Union[Small, Stack]
+
+    Experiment(image=Large(data_=np.zeros((4, 4), dtype=np.int32))).dump(hdf_path)
+
+    with pytest.raises(TypeError, match="Could not find suitable data model"):
+        Other.load(hdf_path)
+
+
+class Sample(H5Group):
+    mass: float
+
+
+class Blank(H5Group):
+    label: str
+    image: Small
+
+
+class Holder(H5Group):
+    content: Union[Sample, Blank]
+
+
+@pytest.mark.parametrize("content", [Sample(mass=1.5),
+                                     Blank(label="empty", image=Small(data_=np.ones((2, 2), dtype=np.int32)))])
+def test_union_of_groups(hdf_path, content):
+    Holder(content=content).dump(hdf_path)
+
+    assert Holder.validate_file(hdf_path) == []
+    with Holder.load(hdf_path) as loaded:
+        assert type(loaded.content) is type(content)
+        assert loaded == Holder(content=content)
+
+
+def test_union_of_groups_no_match(hdf_path):
+    Holder(content=Sample(mass=1.5)).dump(hdf_path)
+
+    with h5py.File(hdf_path, "r+") as h5file:
+        del h5file["content"].attrs["mass"]
+
+    with pytest.raises(TypeError, match="Could not find suitable data model in Union to match group"):
+        Holder.load(hdf_path)
+    assert [(mismatch.path, mismatch.kind) for mismatch in Holder.validate_file(hdf_path)] == [("/content", "node")]
+
+
+@pytest.mark.parametrize("binned_kind", [Literal["frame", "binned"], str])
+def test_union_without_distinct_tags_falls_back_to_shape(hdf_path, binned_kind):
+    class Raw(H5Dataset, shape=(2, 2), dtype=H5Int32):
+        kind: Literal["frame"] = "frame"
+
+    class Binned(H5Dataset, shape=(1, 1), dtype=H5Int32):
+        kind: binned_kind = "frame"
+
+    class Acquisition(H5Group):
+        frame: Union[Raw, Binned]
+
+    Acquisition(frame=Raw(data_=np.ones((2, 2), dtype=np.int32))).dump(hdf_path)
+
+    with Acquisition.load(hdf_path) as loaded:
+        assert type(loaded.frame) is Raw
@@ -0,0 +1,284 @@
+from h5pydantic import H5Group, H5Dataset, H5Int32, H5Int64, H5Mismatch
+
+from enum import Enum
+
+import h5py
+
+import numpy as np
+
+import pytest
+
+from typing import Literal, Optional, Union
+
+
+class Mode(H5Int64, Enum):
+    fast = 1
+    slow = 2
+
+
+class Frames(H5Dataset, shape=(2, 3), dtype=H5Int32):
+    pass
+
+
+class Detector(H5Group):
+    name: str
+    frames: Frames
+
+
+class Experiment(H5Group):
+    count: H5Int64
+    mode: Mode
+    detectors: list[Detector]
+
+
+def experiment() -> Experiment:
+    return Experiment(count=2, mode=Mode.slow,
+                      detectors=[Detector(name=f"d{i}", frames=Frames(data_=np.zeros((2, 3), dtype=np.int32)))
+                                 for i in range(2)])
+
+
+def test_valid_file(hdf_path):
+    experiment().dump(hdf_path)
+
+    assert Experiment.validate_file(hdf_path) == []
+
+
+def test_all_mismatches_are_reported(hdf_path):
+    experiment().dump(hdf_path)
+
+    with h5py.File(hdf_path, "r+") as h5file:
+        del h5file.attrs["count"]
+        h5file.attrs.modify("mode", 7)
+        del h5file["detectors/0/frames"]
+        h5file["detectors/0/frames"] = np.zeros((2, 4), dtype=np.float64)
+        del h5file["detectors/1"].attrs["name"]
+
+    mismatches = Experiment.validate_file(hdf_path)
+
+    assert sorted((mismatch.path, mismatch.kind) for mismatch in mismatches) == [
+        ("/@count", "missing"),
+        ("/@mode", "value"),
+        ("/detectors/0/frames", "dtype"),
+        ("/detectors/0/frames", "shape"),
+        ("/detectors/1@name", "missing"),
+    ]
+    assert all(isinstance(mismatch, H5Mismatch) for mismatch in mismatches)
+
+
+class Position(H5Group, list_layout="table"):
+    motor: str
+    step: H5Int32
+
+
+class Reading(H5Group, list_layout="columns"):
+    step: H5Int32
+    value: float
+
+
+class Frame(H5Dataset, shape=(2, 3), dtype=H5Int32, list_layout="stack"):
+    pass
+
+
+class Small(H5Dataset, shape=(2, 2), dtype=H5Int32):
+    pass
+
+
+class Large(H5Dataset, shape=(4, 4), dtype=H5Int32):
+    pass
+
+
+class Scan(H5Group):
+    positions: list[Position]
+    readings: list[Reading]
+    frames: list[Frame]
+    image: Union[Small, Large]
+    note: Optional[str] = None
+    extra: Optional[Detector] = None
+
+
+def scan() -> Scan:
+    return Scan(positions=[Position(motor=f"m{i}", step=i) for i in range(3)],
+                readings=[Reading(step=i, value=i / 2) for i in range(3)],
+                frames=[Frame(data_=np.zeros((2, 3), dtype=np.int32)) for _ in range(2)],
+                image=Small(data_=np.zeros((2, 2), dtype=np.int32)))
+
+
+def test_optional_fields_absent(hdf_path):
+    scan().dump(hdf_path)
+
+    assert Scan.validate_file(hdf_path) == []
+
+
+def test_table_and_union_mismatches(hdf_path):
+    scan().dump(hdf_path)
+
+    with h5py.File(hdf_path, "r+") as h5file:
+        positions = h5file["positions"][()]
+        del h5file["positions"]
+        h5file["positions"] = positions[["motor"]]
+        del h5file["readings/value"]
+        h5file["readings/value"] = np.zeros(3, dtype=np.int64)
+        del h5file["image"]
+        h5file["image"] = np.zeros((3, 3), dtype=np.int32)
+
+    mismatches = Scan.validate_file(hdf_path)
+
+    assert sorted((mismatch.path, mismatch.kind) for mismatch in mismatches) == [
+        ("/image", "dtype"),
+        ("/positions", "missing"),
+        ("/readings", "dtype"),
+    ]
+    assert any("Column step not found" in mismatch.message for mismatch in mismatches)
+    assert any("Could not find suitable data model in Union" in mismatch.message for mismatch in mismatches)
+
+
+def test_node_kind_mismatches(hdf_path):
+    scan().dump(hdf_path)
+
+    with h5py.File(hdf_path, "r+") as h5file:
+        for name in ("positions", "frames", "image"):
+            del h5file[name]
+            h5file.create_group(name)
+        del h5file["readings"]
+        h5file["readings"] = np.zeros(3)
+
+    mismatches = Scan.validate_file(hdf_path)
+
+    assert sorted((mismatch.path, mismatch.kind) for mismatch in mismatches) == [
+        ("/frames", "node"),
+        ("/image", "node"),
+        ("/positions", "node"),
+        ("/readings", "node"),
+    ]
+
+
+def test_stack_mismatches(hdf_path):
+    scan().dump(hdf_path)
+
+    with h5py.File(hdf_path, "r+") as h5file:
+        del h5file["frames"]
+        h5file["frames"] = np.zeros((2, 3, 3), dtype=np.int32)
+
+    mismatches = Scan.validate_file(hdf_path)
+
+    # The stack is chunked, the replacement isn't.
+    assert sorted((mismatch.path, mismatch.kind) for mismatch in mismatches) == [("/frames", "layout"),
+                                                                                ("/frames", "shape")]
+
+
+def test_list_mismatches(hdf_path):
+    experiment().dump(hdf_path)
+
+    with h5py.File(hdf_path, "r+") as h5file:
+        h5file.move("detectors/1", "detectors/3")
+        h5file.create_group("detectors/extra")
+
+    mismatches = Experiment.validate_file(hdf_path)
+
+    assert [(mismatch.path, mismatch.kind) for mismatch in mismatches] == [("/detectors", "node")]
+
+    with h5py.File(hdf_path, "r+") as h5file:
+        del h5file["detectors"]
+        h5file["detectors"] = np.zeros(2)
+
+    mismatches = Experiment.validate_file(hdf_path)
+
+    assert [(mismatch.path, mismatch.kind) for mismatch in mismatches] == [("/detectors", "node")]
+    assert "is a Dataset, not a group" in mismatches[0].message
+
+
+def test_attribute_and_missing_node_mismatches(hdf_path):
+    class Tagged(H5Group):
+        kind: Literal["raw"] = "raw"
+        source: Literal["detector", "simulation"] = "simulation"
+        count: H5Int64
+        counts: list[int]
+        label: str
+        mode: Mode
+        detectors: list[Detector]
+        frames: Frames
+
+    Tagged(count=1, counts=[1, 2], label="x", mode=Mode.fast, detectors=experiment().detectors,
+           frames=Frames(data_=np.zeros((2, 3), dtype=np.int32))).dump(hdf_path)
+
+    with h5py.File(hdf_path, "r+") as h5file:
+        h5file.attrs.modify("kind", "processed")
+        h5file.attrs.create("count", 1.5)
+        # Strings of any encoding are valid.
+        h5file.attrs.create("label", "x", dtype=h5py.string_dtype("ascii", 1))
+        del h5file.attrs["mode"]
+        del h5file["detectors"]
+        del h5file["frames"]
+
+    mismatches = Tagged.validate_file(hdf_path)
+
+    assert sorted((mismatch.path, mismatch.kind) for mismatch in mismatches) == [
+        ("/@count", "dtype"),
+        ("/@kind", "value"),
+        ("/@mode", "missing"),
+        ("/detectors", "missing"),
+        ("/frames", "missing"),
+    ]
+
+
+def test_dataset_dtype_mismatches(hdf_path):
+    experiment().dump(hdf_path)
+
+    with h5py.File(hdf_path, "r+") as h5file:
+        del h5file["detectors/0/frames"]
+        h5file.create_dataset("detectors/0/frames", shape=(2, 3), dtype=h5py.string_dtype())
+        del h5file["detectors/1/frames"]
+        h5file["detectors/1/frames"] = np.zeros((2, 3), dtype=[("x", np.int32)])
+
+    mismatches = Experiment.validate_file(hdf_path)
+
+    assert sorted((mismatch.path, mismatch.kind) for mismatch in mismatches) == [("/detectors/0/frames", "dtype"),
+                                                                                ("/detectors/1/frames", "dtype")]
+    messages = sorted(mismatch.message for mismatch in mismatches)
+    assert "(string)" in messages[0]
+    assert "Compound" in messages[1]
+
+
+def test_group_and_dataset_swapped(hdf_path):
+    experiment().dump(hdf_path)
+
+    with h5py.File(hdf_path, "r+") as h5file:
+        del h5file["detectors/0/frames"]
+        h5file.create_group("detectors/0/frames")
+        del h5file["detectors/1"]
+        h5file["detectors/1"] = np.zeros(2)
+
+    mismatches = Experiment.validate_file(hdf_path)
+
+    # The fields of a group stored as a dataset aren't there either.
+    assert sorted((mismatch.path, mismatch.kind) for mismatch in mismatches) == [
+        ("/detectors/0/frames", "node"),
+        ("/detectors/1", "node"),
+        ("/detectors/1/frames", "missing"),
+        ("/detectors/1@name", "missing"),
+    ]
+    with pytest.raises(ValueError, match="is a dataset, H5 object is Group"):
+        Experiment.load(hdf_path)
+
+
+def test_missing_nodes(hdf_path):
+    scan().dump(hdf_path)
+
+    with h5py.File(hdf_path, "r+") as h5file:
+        del h5file["positions"]
+        del h5file["image"]
+
+    mismatches = Scan.validate_file(hdf_path)
+
+    assert sorted((mismatch.path, mismatch.kind) for mismatch in mismatches) == [("/image", "missing"),
+                                                                                ("/positions", "missing")]
+
+
+def test_attributes_of_unstored_types_match_anything(hdf_path):
+    class Counted(H5Group):
+        count: int
+
+    with h5py.File(hdf_path, "w") as h5file:
+        h5file.attrs["count"] = np.uint8(3)
+
+    assert Counted.validate_file(hdf_path) == []
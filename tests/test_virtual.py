@@ -0,0 +1,98 @@
+from h5pydantic import H5Group, H5Dataset, H5Int32, H5VirtualDataset
+
+import h5py
+
+import numpy as np
+
+import pytest
+
+
+class Stack(H5VirtualDataset, shape=(-1, 2, 3), dtype=H5Int32):
+    pass
+
+
+class Scan(H5Group):
+    stack: Stack
+
+
+class Frames(H5Dataset, shape=(-1, 2, 3), dtype=H5Int32):
+    pass
+
+
+class Part(H5Group):
+    frames: Frames
+
+
+@pytest.fixture
+def parts(tmp_path):
+    for i, count in enumerate([2, 3]):
+        Part(frames=Frames(data_=np.full((count, 2, 3), i, dtype=np.int32))).dump(tmp_path / f"part{i}.hdf")
+    return [(f"part{i}.hdf", "/frames") for i in range(2)]
+
+
+def test_virtual_dataset_stacks_sources(tmp_path, parts):
+    Scan(stack=Stack(sources_=parts)).dump(tmp_path / "scan.hdf")
+
+    with h5py.File(tmp_path / "scan.hdf", "r") as h5file:
+        assert h5file["stack"].is_virtual
+
+    with Scan.load(tmp_path / "scan.hdf") as loaded:
+        assert loaded.stack[()].shape == (5, 2, 3)
+        assert loaded.stack[:, 0, 0].tolist() == [0, 0, 1, 1, 1]
+        assert loaded.stack.sources() == parts
+
+
+def test_virtual_dataset_checks_sources(tmp_path, parts):
+    class Wide(H5VirtualDataset, shape=(-1, 2, 4), dtype=H5Int32):
+        pass
+
+    class WideScan(H5Group):
+        stack: Wide
+
+    with pytest.raises(ValueError, match="does not match stacked shape"):
+        WideScan(stack=Wide(sources_=parts)).dump(tmp_path / "scan.hdf")
+
+
+def test_virtual_dataset_must_be_virtual(hdf_path):
+    class Copied(H5Group):
+        stack: Frames
+
+    Copied(stack=Frames(data_=np.zeros((5, 2, 3), dtype=np.int32))).dump(hdf_path)
+
+    with pytest.raises(ValueError, match="H5 data is not"):
+        Scan.load(hdf_path)
+
+
+@pytest.mark.parametrize("sources,error,match", [
+    ([], ValueError, "no sources to stack"),
+    ([("part0.hdf", "/")], ValueError, "is a Group, not a dataset"),
+    ([("floats.hdf", "/frames")], ValueError, "data type float64 does not match"),
+    ([("part0.hdf", "/frames"), ("wide.hdf", "/frames")], ValueError, "does not stack with the frames"),
+    ([("missing.hdf", "/frames")], FileNotFoundError, "missing.hdf"),
+])
+def test_virtual_dataset_source_errors(tmp_path, parts, sources, error, match):
+    with h5py.File(tmp_path / "floats.hdf", "w") as h5file:
+        h5file["frames"] = np.zeros((2, 2, 3))
+    with h5py.File(tmp_path / "wide.hdf", "w") as h5file:
+        h5file["frames"] = np.zeros((2, 2, 4), dtype=np.int32)
+
+    with pytest.raises(error, match=match):
+        Scan(stack=Stack(sources_=sources)).dump(tmp_path / "scan.hdf")
+
+
+def test_virtual_dataset_config_errors():
+    with pytest.raises(ValueError, match="don't have storage options"):
+        class Compressed(H5VirtualDataset, shape=(-1, 2, 3), dtype=H5Int32, compression="gzip"):
+            pass
+
+    with pytest.raises(ValueError, match="at least one dimension"):
+        class Scalar(H5VirtualDataset, shape=(), dtype=H5Int32):
+            pass
+
+
+def test_virtual_dataset_replaced(tmp_path, parts):
+    Scan(stack=Stack(sources_=parts)).dump(tmp_path / "scan.hdf")
+    Scan(stack=Stack(sources_=parts[:1])).dump(tmp_path / "scan.hdf", mode="a")
+
+    with Scan.load(tmp_path / "scan.hdf") as loaded:
+        assert loaded.stack[()].shape == (2, 2, 3)